@@ -1,4 +1,6 @@
 """Pack the modules contained in the command directory."""
 import app.controller.command.parser as parser
+import app.controller.command.executor as executor
 
 CommandParser = parser.CommandParser
+CommandExecutor = executor.CommandExecutor
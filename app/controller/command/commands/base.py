@@ -1,6 +1,7 @@
 """Define the abstract base class for a command parser."""
 from abc import ABC, abstractmethod
 from app.controller import ResponseTuple
+from typing import Callable, Optional
 
 
 class Command(ABC):
@@ -12,6 +13,15 @@ class Command(ABC):
     @abstractmethod
     def handle(self,
                _command: str,
-               user_id: str) -> ResponseTuple:
-        """Handle a command."""
+               user_id: str,
+               progress: Optional[Callable[[str], None]] = None) \
+            -> ResponseTuple:
+        """
+        Handle a command.
+
+        :param _command: the command itself
+        :param user_id: Slack ID of user who called command
+        :param progress: function that long running commands can call with
+                         progress updates, if the caller can show them
+        """
         pass
@@ -5,6 +5,7 @@ from app.controller.command.commands.base import Command
 from argparse import ArgumentParser, _SubParsersAction
 from app.model import User, Permissions
 from app.controller import ResponseTuple
+from typing import Iterable, Iterator
 
 
 class KarmaCommand(Command):
@@ -60,7 +61,7 @@ class KarmaCommand(Command):
                                  help="slack id of user karma to view")
         return subparsers
 
-    def handle(self, command, user_id):
+    def handle(self, command, user_id, progress=None):
         """Handle command by splitting into substrings."""
         logging.info('Handling karma Command')
         command_arg = shlex.split(command)
@@ -95,11 +96,10 @@ class KarmaCommand(Command):
                    amount: int) -> ResponseTuple:
         """Manually sets a user's karma."""
         try:
-            user = self.facade.retrieve(User, user_id)
+            user = self.facade.retrieve(User, user_id, cached=True)
             if user.permissions_level == Permissions.admin:
-                user = self.facade.retrieve(User, slack_id)
-                user.karma = amount
-                self.facade.store(user)
+                user = self.facade.update(User, slack_id,
+                                          set_values={'karma': amount})
                 return f"set {user.name}'s karma to {amount}", 200
             else:
                 return self.permission_error, 200
@@ -111,14 +111,18 @@ class KarmaCommand(Command):
                      reset_all: bool) -> ResponseTuple:
         """Reset all users' karma."""
         try:
-            user = self.facade.retrieve(User, user_id)
+            user = self.facade.retrieve(User, user_id, cached=True)
             if not user.permissions_level == Permissions.admin:
                 return self.permission_error, 200
             if reset_all:
-                user_list = self.facade.query(User, [])
-                for user in user_list:
-                    user.karma = self.karma_default_amount
-                    self.facade.store(user)
+                def reset_karma(users: Iterable[User]) -> Iterator[User]:
+                    """Reset the karma of users as they are read."""
+                    for user in users:
+                        user.karma = self.karma_default_amount
+                        yield user
+
+                self.facade.bulk_store(
+                    reset_karma(self.facade.query_iter(User)))
                 return (
                     "reset all users karma to"
                     f"{self.karma_default_amount}",
@@ -134,7 +138,7 @@ class KarmaCommand(Command):
                     slack_id: str) -> ResponseTuple:
         """Allow user to view how much karma someone has."""
         try:
-            user = self.facade.retrieve(User, slack_id)
+            user = self.facade.retrieve(User, slack_id, cached=True)
             return f"{user.name} has {user.karma} karma", 200
         except LookupError:
             return self.lookup_error, 200
@@ -6,6 +6,7 @@ from app.controller.command.commands.base import Command
 from app.controller import ResponseTuple
 from db.facade import DBFacade
 from app.model import User
+from typing import Callable, Optional
 
 
 class MentionCommand(Command):
@@ -24,7 +25,11 @@ class MentionCommand(Command):
         self.parser.add_argument("Mention")
         self.facade = db_facade
 
-    def handle(self, command: str, user_id: str) -> ResponseTuple:
+    def handle(self,
+               command: str,
+               user_id: str,
+               progress: Optional[Callable[[str], None]] = None) \
+            -> ResponseTuple:
         """Handle command by splitting into substrings."""
         logging.debug('Handling Mention Command')
         command_arg = shlex.split(command)
@@ -41,9 +46,8 @@ class MentionCommand(Command):
         if giver_id == receiver_id:
             return "cannot give karma to self", 200
         try:
-            user = self.facade.retrieve(User, receiver_id)
-            user.karma += self.karma_add_amount
-            self.facade.store(user)
+            user = self.facade.update(User, receiver_id,
+                                      add={'karma': self.karma_add_amount})
             return f"gave {self.karma_add_amount} karma to {user.name}", 200
         except LookupError:
             return self.lookup_error, 200
@@ -7,7 +7,7 @@ from app.controller import ResponseTuple
 from app.controller.command.commands.base import Command
 from db.facade import DBFacade
 from app.model import Project, User, Team, Permissions
-from typing import Dict
+from typing import Callable, Dict, Optional
 
 
 class ProjectCommand(Command):
@@ -136,7 +136,9 @@ class ProjectCommand(Command):
 
     def handle(self,
                command: str,
-               user_id: str) -> ResponseTuple:
+               user_id: str,
+               progress: Optional[Callable[[str], None]] = None) \
+            -> ResponseTuple:
         """Handle command by splitting into substrings and giving to parser."""
         logging.debug("Handling ProjectCommand")
         command_arg = shlex.split(command)
@@ -200,7 +202,7 @@ class ProjectCommand(Command):
                  otherwise return projects' information
         """
         logging.debug("Handling project list subcommand")
-        projects = self.facade.query(Project)
+        projects = self.facade.query(Project, fields=['display_name'])
         if not projects:
             logging.info("No projects found in database")
             return "No Projects Exist!", 200
@@ -261,7 +263,7 @@ class ProjectCommand(Command):
 
         team = team_list[0]
         try:
-            user = self.facade.retrieve(User, user_id)
+            user = self.facade.retrieve(User, user_id, cached=True)
 
             if not (user_id in team.team_leads or
                     user.permissions_level is Permissions.admin):
@@ -298,7 +300,7 @@ class ProjectCommand(Command):
         try:
             project = self.facade.retrieve(Project, project_id)
             team = self.facade.retrieve(Team, project.github_team_id)
-            user = self.facade.retrieve(User, user_id)
+            user = self.facade.retrieve(User, user_id, cached=True)
 
             if not (user_id in team.team_leads or
                     user.permissions_level is Permissions.admin):
@@ -374,7 +376,7 @@ class ProjectCommand(Command):
                 return error, 200
 
             team = team_list[0]
-            user = self.facade.retrieve(User, user_id)
+            user = self.facade.retrieve(User, user_id, cached=True)
 
             if not (user_id in team.team_leads or
                     user.permissions_level is Permissions.admin):
@@ -412,7 +414,7 @@ class ProjectCommand(Command):
         try:
             project = self.facade.retrieve(Project, project_id)
             team = self.facade.retrieve(Team, project.github_team_id)
-            user = self.facade.retrieve(User, user_id)
+            user = self.facade.retrieve(User, user_id, cached=True)
 
             if project.github_team_id != "" and not force:
                 logging.error("Project is assigned to team with "
@@ -9,7 +9,7 @@ from interface.github import GithubAPIException, GithubInterface
 from interface.slack import SlackAPIError
 from app.model import Team, User
 from utils.slack_parse import check_permissions
-from typing import Any, List
+from typing import Any, Callable, List, Optional
 
 
 class TeamCommand(Command):
@@ -20,6 +20,9 @@ class TeamCommand(Command):
     permission_error = "You do not have the sufficient " \
                        "permission level for this command!"
     lookup_error = "Lookup error: Object not found!"
+    # Maximum number of progress updates sent while adding members; Slack
+    # only accepts 5 messages per response URL
+    PROGRESS_UPDATES = 3
 
     def __init__(self,
                  db_facade: DBFacade,
@@ -173,8 +176,17 @@ class TeamCommand(Command):
 
     def handle(self,
                command: str,
-               user_id: str) -> ResponseTuple:
-        """Handle command by splitting into substrings and giving to parser."""
+               user_id: str,
+               progress: Optional[Callable[[str], None]] = None) \
+            -> ResponseTuple:
+        """
+        Handle command by splitting into substrings and giving to parser.
+
+        :param command: the command itself
+        :param user_id: Slack ID of user who called command
+        :param progress: function called with progress updates from long
+                         running commands
+        """
         logging.debug("Handling TeamCommand")
         command_arg = shlex.split(command)
         args = None
@@ -208,7 +220,7 @@ class TeamCommand(Command):
                 "channel": args.channel,
                 "lead": args.lead
             }
-            return self.create_helper(param_list, user_id)
+            return self.create_helper(param_list, user_id, progress)
 
         elif args.which == "add":
             param_list = {
@@ -253,11 +265,11 @@ class TeamCommand(Command):
         :return: error message if lookup error or no teams,
                  otherwise return teams' information
         """
-        teams = self.facade.query(Team)
-        if not teams:
+        teams = self.facade.query_iter(Team,
+                                       fields=['display_name', 'platform'])
+        attachment = [team.get_basic_attachment() for team in teams]
+        if not attachment:
             return "No Teams Exist!", 200
-        attachment = [team.get_basic_attachment() for
-                      team in teams]
         return {'attachments': attachment}, 200
 
     def view_helper(self, team_name) -> ResponseTuple:
@@ -273,7 +285,11 @@ class TeamCommand(Command):
             return self.lookup_error, 200
         return {'attachments': [teams[0].get_attachment()]}, 200
 
-    def create_helper(self, param_list, user_id) -> ResponseTuple:
+    def create_helper(self,
+                      param_list,
+                      user_id,
+                      progress: Optional[Callable[[str], None]] = None) \
+            -> ResponseTuple:
         """
         Create team and calls GitHub API to create the team in GitHub.
 
@@ -283,11 +299,13 @@ class TeamCommand(Command):
 
         :param param_list: List of parameters for creating team
         :param user_id: Slack ID of user who called command
+        :param progress: function called with progress updates while channel
+                         members are added
         :return: error message if team created unsuccessfully otherwise returns
                  success message
         """
         try:
-            command_user = self.facade.retrieve(User, user_id)
+            command_user = self.facade.retrieve(User, user_id, cached=True)
             if not check_permissions(command_user, None):
                 return self.permission_error, 200
             msg = f"New team created: {param_list['team_name']}, "
@@ -299,17 +317,12 @@ class TeamCommand(Command):
             if param_list["platform"] is not None:
                 msg += f"platform: {param_list['platform']}, "
                 team.platform = param_list['platform']
+            summary = ""
             if param_list["channel"] is not None:
                 msg += "added channel, "
-                for member_id in self.sc.get_channel_users(
-                        param_list["channel"]):
-                    try:
-                        member = self.facade.retrieve(User, member_id)
-                        self.gh.add_team_member(member.github_username,
-                                                team_id)
-                        team.add_member(member.github_id)
-                    except LookupError:
-                        pass
+                summary = self.add_channel_members(team,
+                                                   param_list["channel"],
+                                                   progress)
             else:
                 self.gh.add_team_member(command_user.github_username, team_id)
                 team.add_member(command_user.github_id)
@@ -324,7 +337,7 @@ class TeamCommand(Command):
                 team.add_team_lead(command_user.github_id)
 
             self.facade.store(team)
-            return msg, 200
+            return msg + summary, 200
         except GithubAPIException as e:
             logging.error(f"Team creation error with {e.data}")
             return f"Team creation unsuccessful with the" \
@@ -337,6 +350,65 @@ class TeamCommand(Command):
             return f"Team creation unsuccessful with the" \
                    f" following error: {e.error}", 200
 
+    def add_channel_members(self,
+                            team: Team,
+                            channel: str,
+                            progress: Optional[Callable[[str], None]]) -> str:
+        """
+        Add every member of a channel to a team.
+
+        Members are looked up in a single database call, and added on
+        GitHub several at a time (see
+        :meth:`interface.github.GithubInterface.add_team_members`). Members
+        that couldn't be added on GitHub are left out of the team.
+
+        :param team: team to add members to
+        :param channel: Slack ID of the channel
+        :param progress: function called with progress updates, at most
+                         ``PROGRESS_UPDATES`` times
+        :return: summary of which members were added
+        :raises SlackAPIError: if the channel's members couldn't be listed
+        """
+        member_ids = list(self.sc.get_channel_users(channel))
+        members = self.facade.bulk_retrieve(User, member_ids)
+        total = len(members)
+        # Report progress after each (1 / (PROGRESS_UPDATES + 1)) of members
+        step = max(total // (self.PROGRESS_UPDATES + 1), 1)
+        done = 0
+
+        def member_done(username: str, error: Optional[str]) -> None:
+            """Report progress as members are added on GitHub."""
+            nonlocal done
+            done += 1
+            if progress is not None and done % step == 0 and \
+                    done < total and done // step <= self.PROGRESS_UPDATES:
+                try:
+                    progress(f"Added {done} of {total} channel members "
+                             f"to {team.github_team_name}...")
+                except Exception:
+                    # Members are being added either way
+                    logging.exception("Failed to post progress update")
+
+        errors = self.gh.add_team_members(
+            [member.github_username for member in members],
+            team.github_team_id,
+            member_done)
+        added = 0
+        for member in members:
+            if member.github_username not in errors:
+                team.add_member(member.github_id)
+                added += 1
+
+        summary = f"\nAdded {added} of {total} " \
+            "channel members on GitHub."
+        unregistered = len(member_ids) - total
+        if unregistered > 0:
+            summary += f" {unregistered} channel members aren't " \
+                "registered with rocket."
+        if errors:
+            summary += f" Failed to add: {', '.join(sorted(errors))}."
+        return summary
+
     def add_helper(self, param_list, user_id) -> ResponseTuple:
         """
         Add user to team.
@@ -351,7 +423,7 @@ class TeamCommand(Command):
                  message
         """
         try:
-            command_user = self.facade.retrieve(User, user_id)
+            command_user = self.facade.retrieve(User, user_id, cached=True)
             teams = self.facade.query(Team, [('github_team_name',
                                               param_list['team_name'])])
             if len(teams) != 1:
@@ -390,7 +462,7 @@ class TeamCommand(Command):
                  otherwise returns success message
         """
         try:
-            command_user = self.facade.retrieve(User, user_id)
+            command_user = self.facade.retrieve(User, user_id, cached=True)
             teams = self.facade.query(Team, [('github_team_name',
                                               param_list['team_name'])])
             if len(teams) != 1:
@@ -433,7 +505,7 @@ class TeamCommand(Command):
                  team edited unsuccessfully, otherwise return success message
         """
         try:
-            command_user = self.facade.retrieve(User, user_id)
+            command_user = self.facade.retrieve(User, user_id, cached=True)
             teams = self.facade.query(Team, [('github_team_name',
                                               param_list['team_name'])])
             if len(teams) != 1:
@@ -467,7 +539,7 @@ class TeamCommand(Command):
                  lead demoted unsuccessfully, otherwise return success message
         """
         try:
-            command_user = self.facade.retrieve(User, user_id)
+            command_user = self.facade.retrieve(User, user_id, cached=True)
             teams = self.facade.query(Team, [('github_team_name',
                                               param_list['team_name'])])
             if len(teams) != 1:
@@ -513,7 +585,7 @@ class TeamCommand(Command):
                  team deleted unsuccessfully, otherwise return success message
         """
         try:
-            command_user = self.facade.retrieve(User, user_id)
+            command_user = self.facade.retrieve(User, user_id, cached=True)
             teams = self.facade.query(Team, [('github_team_name',
                                               team_name)])
             if len(teams) != 1:
@@ -546,7 +618,7 @@ class TeamCommand(Command):
         num_deleted = 0
         modified = []
         try:
-            command_user = self.facade.retrieve(User, user_id)
+            command_user = self.facade.retrieve(User, user_id, cached=True)
             if not check_permissions(command_user, None):
                 return self.permission_error, 200
             local_teams: List[Team] = self.facade.query(Team)
@@ -564,9 +636,10 @@ class TeamCommand(Command):
                     modified.append(local_team_dict[local_id].get_attachment())
 
             # add teams to db that are in github but not in local database
+            to_store = []
             for remote_id in remote_team_dict:
                 if remote_id not in local_team_dict:
-                    self.facade.store(remote_team_dict[remote_id])
+                    to_store.append(remote_team_dict[remote_id])
                     num_added += 1
                     modified.append(remote_team_dict[remote_id]
                                     .get_attachment())
@@ -574,15 +647,16 @@ class TeamCommand(Command):
                     # and finally, if a local team differs, update it
                     old_team = local_team_dict[remote_id]
                     new_team = remote_team_dict[remote_id]
-                    if old_team.github_team_name != new_team.github_team_name\
-                            or old_team.members != new_team.members:
+                    if old_team.diff(new_team, ['github_team_name',
+                                                'members']):
 
                         # update the old team, to retain additional parameters
                         old_team.github_team_name = new_team.github_team_name
                         old_team.members = new_team.members
-                        self.facade.store(old_team)
+                        to_store.append(old_team)
                         num_changed += 1
                         modified.append(old_team.get_attachment())
+            self.facade.bulk_store(to_store)
         except GithubAPIException as e:
             logging.error("team refresh unsuccessful due to github error")
             return "Refresh teams was unsuccessful with " \
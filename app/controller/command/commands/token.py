@@ -8,6 +8,7 @@ from datetime import datetime, timedelta
 from db.facade import DBFacade
 from app.model import User, Permissions
 from utils.slack_msg_fmt import wrap_code_block
+from typing import Callable, Optional
 
 
 class TokenCommand(Command):
@@ -38,11 +39,13 @@ class TokenCommand(Command):
 
     def handle(self,
                _command: str,
-               user_id: str) -> ResponseTuple:
+               user_id: str,
+               progress: Optional[Callable[[str], None]] = None) \
+            -> ResponseTuple:
         """Handle request for token."""
         logging.debug("Handling token command")
         try:
-            user = self.facade.retrieve(User, user_id)
+            user = self.facade.retrieve(User, user_id, cached=True)
             if user.permissions_level == Permissions.member:
                 return self.permission_error, 200
         except LookupError:
@@ -5,10 +5,11 @@ import shlex
 from argparse import ArgumentParser, _SubParsersAction
 from app.controller import ResponseTuple
 from app.controller.command.commands.base import Command
+from db import ConditionFailedError
 from db.facade import DBFacade
 from interface.github import GithubAPIException, GithubInterface
 from app.model import User, Permissions
-from typing import Dict, cast
+from typing import Callable, Dict, Optional, cast
 from utils.slack_parse import escape_email
 
 
@@ -122,7 +123,9 @@ class UserCommand(Command):
 
     def handle(self,
                command: str,
-               user_id: str) -> ResponseTuple:
+               user_id: str,
+               progress: Optional[Callable[[str], None]] = None) \
+            -> ResponseTuple:
         """Handle command by splitting into substrings and giving to parser."""
         logging.debug("Handling UserCommand")
         command_arg = shlex.split(command)
@@ -186,7 +189,7 @@ class UserCommand(Command):
         msg = ""
         if param_list["member"] is not None:
             try:
-                admin_user = self.facade.retrieve(User, user_id)
+                admin_user = self.facade.retrieve(User, user_id, cached=True)
                 if admin_user.permissions_level != Permissions.admin:
                     return self.permission_error, 200
                 else:
@@ -254,7 +257,7 @@ class UserCommand(Command):
                  deletion message if user is deleted.
         """
         try:
-            user_command = self.facade.retrieve(User, user_id)
+            user_command = self.facade.retrieve(User, user_id, cached=True)
             if user_command.permissions_level == Permissions.admin:
                 self.facade.delete(User, slack_id)
                 return self.delete_text + slack_id, 200
@@ -279,9 +282,9 @@ class UserCommand(Command):
         """
         try:
             if slack_id is None:
-                user = self.facade.retrieve(User, user_id)
+                user = self.facade.retrieve(User, user_id, cached=True)
             else:
-                user = self.facade.retrieve(User, slack_id)
+                user = self.facade.retrieve(User, slack_id, cached=True)
 
             return {'attachments': [user.get_attachment()]}, 200
         except LookupError:
@@ -298,13 +301,9 @@ class UserCommand(Command):
                           already added in the database
         :return: ``"User added!", 200`` or error message if user exists in db
         """
-        # Try to look up and avoid overwriting if we are not using force
-        if not use_force:
-            try:
-                self.facade.retrieve(User, user_id)
-                return 'User already exists; to overwrite user, add `-f`', 200
-            except LookupError:
-                pass
-
-        self.facade.store(User(user_id))
+        # Avoid overwriting the user if we are not using force
+        try:
+            self.facade.store(User(user_id), if_not_exists=not use_force)
+        except ConditionFailedError:
+            return 'User already exists; to overwrite user, add `-f`', 200
         return 'User added!', 200
@@ -0,0 +1,152 @@
+"""Run Rocket 2 commands on a bounded pool of worker threads."""
+from app.controller import ResponseTuple
+from app.controller.command.parser import CommandParser
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Dict
+import atexit
+import logging
+import time
+
+
+class CommandStats:
+    """Timing statistics for a single command."""
+
+    def __init__(self) -> None:
+        """Initialize all statistics to 0."""
+        self.count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.exec_total = 0.0
+        self.exec_max = 0.0
+
+    def record(self, wait: float, exec_time: float) -> None:
+        """
+        Record a single run of the command.
+
+        :param wait: seconds the command spent queued
+        :param exec_time: seconds the command spent running
+        """
+        self.count += 1
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+        self.exec_total += exec_time
+        self.exec_max = max(self.exec_max, exec_time)
+
+    def to_dict(self) -> Dict[str, float]:
+        """
+        Convert the statistics to a dictionary.
+
+        :return: dictionary with the number of runs, and the average and
+                 maximum queue wait and execution times, in seconds
+        """
+        count = max(self.count, 1)
+        return {'count': self.count,
+                'wait_avg': self.wait_total / count,
+                'wait_max': self.wait_max,
+                'exec_avg': self.exec_total / count,
+                'exec_max': self.exec_max}
+
+
+class CommandExecutor:
+    """
+    Run commands in the background with a fixed number of worker threads.
+
+    Commands beyond the number of workers wait in a queue of bounded size.
+    Callers are told right away if their command has been queued, or if it
+    has been turned away because the queue is full.
+    """
+
+    queued_reply = "Rocket is busy right now. Your command has been queued " \
+        "and will run shortly."
+    full_reply = "Rocket is too busy to take your command right now. " \
+        "Please try again in a minute."
+
+    def __init__(self,
+                 parser: CommandParser,
+                 workers: int,
+                 queue_size: int) -> None:
+        """
+        Initialize the worker pool.
+
+        The pool is shut down when the interpreter exits.
+
+        :param parser: parser that handles every command
+        :param workers: maximum number of commands run at the same time
+        :param queue_size: maximum number of commands waiting for a worker
+        """
+        self.parser = parser
+        self.workers = workers
+        self.queue_size = queue_size
+        self.__pool = ThreadPoolExecutor(max_workers=workers,
+                                         thread_name_prefix='command')
+        self.__lock = Lock()
+        self.__pending = 0
+        self.__stats: Dict[str, CommandStats] = {}
+
+        atexit.register(self.shutdown)
+
+    def submit(self,
+               cmd_txt: str,
+               user: str,
+               response_url: str) -> ResponseTuple:
+        """
+        Run a command in the background.
+
+        :param cmd_txt: the command itself
+        :param user: slack ID of user who executed the command
+        :param response_url: URL the command's response is posted to
+        :return: tuple of the immediate response text and status code; the
+                 text is empty if the command started right away
+        """
+        name = self.parser.get_command_name(cmd_txt)
+        with self.__lock:
+            if self.__pending >= self.workers + self.queue_size:
+                logging.warning(f"Command queue full, rejected '{name}'")
+                return self.full_reply, 200
+            queued = self.__pending >= self.workers
+            self.__pending += 1
+
+        self.__pool.submit(self.__run, name, time.monotonic(),
+                           cmd_txt, user, response_url)
+        if queued:
+            logging.info(f"All command workers busy, queued '{name}'")
+            return self.queued_reply, 200
+        return "", 200
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get timing statistics for every command run so far.
+
+        :return: dictionary mapping command names to their statistics
+        """
+        with self.__lock:
+            return {name: stats.to_dict()
+                    for name, stats in self.__stats.items()}
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop accepting commands and shut down the worker pool.
+
+        :param wait: whether to wait for queued commands to finish first
+        """
+        self.__pool.shutdown(wait=wait)
+
+    def __run(self,
+              name: str,
+              submitted: float,
+              cmd_txt: str,
+              user: str,
+              response_url: str) -> None:
+        """Run a command on a worker thread and record its timings."""
+        started = time.monotonic()
+        try:
+            self.parser.handle_app_command(cmd_txt, user, response_url)
+        except Exception:
+            logging.exception(f"Command '{name}' failed")
+        finally:
+            finished = time.monotonic()
+            with self.__lock:
+                self.__pending -= 1
+                stats = self.__stats.setdefault(name, CommandStats())
+                stats.record(started - submitted, finished - started)
@@ -7,7 +7,7 @@ from app.controller.command.commands.token import TokenCommandConfig
 from db.facade import DBFacade
 from interface.slack import Bot
 from interface.github import GithubInterface
-from typing import Dict, Any
+from typing import Callable, Dict, Any, Optional
 import utils.slack_parse as util
 import logging
 from utils.slack_msg_fmt import wrap_slack_code
@@ -22,15 +22,22 @@ class CommandParser:
                  db_facade: DBFacade,
                  bot: Bot,
                  gh_interface: GithubInterface,
-                 token_config: TokenCommandConfig) -> None:
-        """Initialize the dictionary of command handlers."""
+                 token_config: TokenCommandConfig,
+                 session: Optional[requests.Session] = None) -> None:
+        """
+        Initialize the dictionary of command handlers.
+
+        :param session: session used to post responses; the ``requests``
+                        module is used if not given
+        """
         self.__commands: Dict[str, Command] = {}
         self.__facade = db_facade
+        self.__session: Any = session if session is not None else requests
         self.__bot = bot
         self.__github = gh_interface
         self.__commands["user"] = UserCommand(self.__facade, self.__github)
-        self.__commands["team"] = TeamCommand(self.__facade,
-                                              self.__github, self.__bot)
+        self.__commands["team"] = TeamCommand(self.__facade, self.__github,
+                                              self.__bot)
         self.__commands["token"] = TokenCommand(self.__facade, token_config)
         self.__commands["project"] = ProjectCommand(self.__facade)
         self.__commands["karma"] = KarmaCommand(self.__facade)
@@ -43,6 +50,9 @@ class CommandParser:
         """
         Handle a command call to rocket.
 
+        If a response URL is given, commands can post progress updates to it
+        while they run.
+
         :param cmd_txt: the command itself
         :param user: slack ID of user who executed the command
         :return: tuple where first element is the response text (or a
@@ -54,14 +64,21 @@ class CommandParser:
         cmd_txt = ''.join(map(util.regularize_char, cmd_txt))
         cmd_txt = util.escaped_id_to_id(cmd_txt)
         s = cmd_txt.split(' ', 1)
+
+        def post_progress(text: str) -> None:
+            """Post a progress update to the response URL."""
+            self.__session.post(url=response_url, json={'text': text})
+
+        progress: Optional[Callable[[str], None]] = \
+            post_progress if response_url != "" else None
         if s[0] == "help" or s[0] is None:
             logging.info("Help command was called")
             v = self.get_help()
         if s[0] in self.__commands:
-            v = self.__commands[s[0]].handle(cmd_txt, user)
+            v = self.__commands[s[0]].handle(cmd_txt, user, progress)
         elif is_slack_id(s[0]):
             logging.info("mention command activated")
-            v = self.__commands["mention"].handle(cmd_txt, user)
+            v = self.__commands["mention"].handle(cmd_txt, user, progress)
         else:
             logging.error("app command triggered incorrectly")
             v = self.get_help()
@@ -70,10 +87,28 @@ class CommandParser:
         else:
             response_data = v[0]
         if response_url != "":
-            requests.post(url=response_url, json=response_data)
+            self.__session.post(url=response_url, json=response_data)
         else:
             return v
 
+    def get_command_name(self, cmd_txt: str) -> str:
+        """
+        Get the name of the command that a call to rocket would run.
+
+        :param cmd_txt: the command itself
+        :return: name of the command, or ``"help"`` if the call would only
+                 display help
+        """
+        cmd_txt = ''.join(map(util.regularize_char, cmd_txt))
+        cmd_txt = util.escaped_id_to_id(cmd_txt)
+        name = cmd_txt.split(' ', 1)[0]
+        if name in self.__commands:
+            return name
+        elif is_slack_id(name):
+            return "mention"
+        else:
+            return "help"
+
     def get_help(self) -> ResponseTuple:
         """
         Get help messages and return a formatted string for messaging.
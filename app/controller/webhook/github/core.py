@@ -2,48 +2,221 @@
 import logging
 import hmac
 import hashlib
+import time
 from db.facade import DBFacade
-from typing import Dict, Any
+from threading import Lock
+from typing import Dict, Any, Iterable, Optional, Tuple
 from app.controller import ResponseTuple
 from config import Config
-from app.controller.webhook.github.events import MembershipEventHandler, \
-    OrganizationEventHandler, TeamEventHandler
+from app.controller.webhook.github.events import GitHubEventHandler, \
+    registered_handlers
+from app.controller.webhook.github.deliveries import DeliveryLog
+from app.controller.webhook.github.queue import WebhookQueue
+
+Route = Tuple[str, str]
+
+
+class RouteStats:
+    """Timing statistics for a single route."""
+
+    def __init__(self) -> None:
+        """Initialize all statistics to 0."""
+        self.count = 0
+        self.errors = 0
+        self.time_total = 0.0
+        self.time_max = 0.0
+
+    def record(self, elapsed: float, failed: bool) -> None:
+        """
+        Record a single event handled by the route.
+
+        :param elapsed: seconds spent handling the event
+        :param failed: whether handling the event raised an exception
+        """
+        self.count += 1
+        self.errors += failed
+        self.time_total += elapsed
+        self.time_max = max(self.time_max, elapsed)
+
+    def to_dict(self) -> Dict[str, float]:
+        """
+        Convert the statistics to a dictionary.
+
+        :return: dictionary with the number of events and errors, and the
+                 average and maximum handling times, in seconds
+        """
+        return {'count': self.count,
+                'errors': self.errors,
+                'time_avg': self.time_total / max(self.count, 1),
+                'time_max': self.time_max}
 
 
 class GitHubWebhookHandler:
-    """Encapsulate the handlers for all GitHub webhook events."""
+    """
+    Encapsulate the handlers for all GitHub webhook events.
+
+    Events are routed by their type (the ``X-GitHub-Event`` header) and
+    action. Events without a type are routed by action alone, to whichever
+    handler registered the action first.
+    """
+
+    def __init__(self,
+                 db_facade: DBFacade,
+                 config: Config,
+                 queue: Optional[WebhookQueue] = None,
+                 deliveries: Optional[DeliveryLog] = None) -> None:
+        """
+        Give handlers access to the database.
 
-    def __init__(self, db_facade: DBFacade, config: Config) -> None:
-        """Give handlers access to the database."""
+        :param queue: queue used to handle events in the background; events
+                      are handled before responding if not given. Handlers
+                      don't buffer writes when there is a queue, so that
+                      failed writes are retried by the queue
+        :param deliveries: log of handled deliveries, used to skip
+                           redeliveries; every delivery is handled if not
+                           given
+        """
         self.__secret = config.github_webhook_secret
-        self.__event_handlers = [
-            OrganizationEventHandler(db_facade),
-            TeamEventHandler(db_facade),
-            MembershipEventHandler(db_facade)
-        ]
+        self.__routes: Dict[Route, GitHubEventHandler] = {}
+        self.__action_routes: Dict[str, Route] = {}
+        self.__stats: Dict[Route, RouteStats] = {}
+        self.__stats_lock = Lock()
+        for handler_class in registered_handlers():
+            self.add_handler(handler_class(db_facade,
+                                           buffer_writes=queue is None))
+        self.__queue = queue
+        self.__deliveries = deliveries
+        if queue is not None:
+            queue.start(self.handle_payload)
+
+    def add_handler(self,
+                    event_handler: GitHubEventHandler,
+                    event_type: Optional[str] = None,
+                    actions: Optional[Iterable[str]] = None) -> None:
+        """
+        Route events to a handler, replacing any handler already routed to.
+
+        :param event_handler: the handler
+        :param event_type: type of event to route; the handler's own event
+                           type if not given
+        :param actions: actions to route; the handler's supported actions if
+                        not given
+        """
+        if event_type is None:
+            event_type = event_handler.event_type
+        if actions is None:
+            actions = event_handler.supported_action_list
+        for action in actions:
+            route = (event_type, action)
+            if route in self.__routes:
+                logging.warning(f"Replacing handler of {event_type} "
+                                f"event {action}")
+            self.__routes[route] = event_handler
+            self.__action_routes.setdefault(action, route)
+            self.__stats.setdefault(route, RouteStats())
+
+    def route_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get the statistics of every route.
+
+        :return: dictionary mapping ``"event.action"`` to the route's number
+                 of events and errors, and average and maximum handling time
+        """
+        with self.__stats_lock:
+            return {f"{event_type}.{action}": stats.to_dict()
+                    for (event_type, action), stats in self.__stats.items()}
 
     def handle(self,
                request_body: bytes,
                xhub_signature: str,
-               payload: Dict[str, Any]) -> ResponseTuple:
+               payload: Dict[str, Any],
+               delivery_id: Optional[str] = None,
+               event_type: Optional[str] = None) -> ResponseTuple:
         """
         Verify and handle the webhook event.
 
+        If the delivery has already been handled, or is being handled by
+        another process, it isn't handled again (see
+        :meth:`DeliveryLog.claim`).
+
         :param request_body: Byte string of the request body
         :param xhub_signature: Hashed signature to validate
+        :param delivery_id: ID of the delivery, from the
+                            ``X-GitHub-Delivery`` header
+        :param event_type: type of the event, from the ``X-GitHub-Event``
+                           header
         :return: appropriate ResponseTuple depending on the validity and type
-                 of webhook
+                 of webhook, or ``202`` if the event was queued
         """
         logging.debug(f"payload: {str(payload)}")
         if self.verify_hash(request_body, xhub_signature):
-            action = payload["action"]
-            for event_handler in self.__event_handlers:
-                if action in event_handler.supported_action_list:
-                    return event_handler.handle(payload)
-            return "Unsupported payload received", 500
+            deliveries = self.__deliveries
+            if deliveries is not None and delivery_id:
+                previous = deliveries.claim(delivery_id)
+                if previous is not None:
+                    return previous
+
+            try:
+                route = self.get_route(payload, event_type)
+                if self.__queue is not None and route is not None:
+                    self.__queue.submit(payload, route[0])
+                    response: ResponseTuple = ("Webhook queued", 202)
+                else:
+                    response = self.handle_payload(payload, event_type)
+            except BaseException:
+                # Let GitHub's redelivery of the event be handled
+                if deliveries is not None and delivery_id:
+                    deliveries.release(delivery_id)
+                raise
+            if deliveries is not None and delivery_id:
+                deliveries.put(delivery_id, response)
+            return response
         else:
             return "Hashed signature is not valid", 403
 
+    def handle_payload(self,
+                       payload: Dict[str, Any],
+                       event_type: Optional[str] = None) -> ResponseTuple:
+        """
+        Handle a verified webhook event.
+
+        :param payload: the event's payload
+        :param event_type: type of the event
+        :return: appropriate ResponseTuple depending on the type of webhook
+        """
+        route = self.get_route(payload, event_type)
+        if route is None:
+            return "Unsupported payload received", 500
+
+        start = time.perf_counter()
+        failed = True
+        try:
+            response = self.__routes[route].handle(payload)
+            failed = False
+            return response
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.__stats_lock:
+                self.__stats[route].record(elapsed, failed)
+
+    def get_route(self,
+                  payload: Dict[str, Any],
+                  event_type: Optional[str] = None) -> Optional[Route]:
+        """
+        Get the route of a webhook event.
+
+        :param payload: the event's payload
+        :param event_type: type of the event; the event is routed by action
+                           alone if not given
+        :return: tuple of the event type and action, or ``None`` if no
+                 handler supports the event
+        """
+        action = payload.get("action", "")
+        if event_type:
+            route = (event_type, action)
+            return route if route in self.__routes else None
+        return self.__action_routes.get(action)
+
     def verify_hash(self, request_body: bytes, xhub_signature: str):
         """
         Verify if a webhook event comes from GitHub.
@@ -0,0 +1,229 @@
+"""Remember which GitHub webhook deliveries have already been handled."""
+import json
+import logging
+import time
+
+from app.controller import ResponseTuple
+from boto3.dynamodb.conditions import Attr
+from botocore.exceptions import BotoCoreError, ClientError
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Optional, Tuple
+
+
+class DeliveryLog:
+    """
+    A bounded log of handled deliveries and the responses they got.
+
+    GitHub gives every delivery an ID (the ``X-GitHub-Delivery`` header),
+    which stays the same when a delivery is redelivered. Deliveries are
+    remembered in memory for ``ttl`` seconds, and if a DynamoDB table is
+    given, also in the table, so that a delivery handled by one process is
+    recognized by the others.
+
+    A delivery is :meth:`claim`-ed before it is handled, with a conditional
+    write to the table, so that when several processes get the same
+    delivery at once only one of them handles it. Errors reaching the table
+    are logged and otherwise ignored, since a missed duplicate only means
+    doing the work twice. All methods are thread-safe.
+    """
+
+    # Response to a delivery that is still being handled elsewhere
+    IN_PROGRESS: ResponseTuple = ("Webhook delivery already being handled",
+                                  202)
+
+    def __init__(self,
+                 max_size: int,
+                 ttl: float,
+                 table: Optional[Callable[[], Any]] = None,
+                 clock: Callable[[], float] = time.time) -> None:
+        """
+        Initialize the log.
+
+        :param max_size: maximum number of deliveries kept in memory
+        :param ttl: number of seconds a delivery is remembered for
+        :param table: function returning the DynamoDB table shared with
+                      other processes, keyed by ``delivery_id``; it is called
+                      whenever the table is used, so that each process uses
+                      its own connections. Deliveries are only kept in
+                      memory if not given
+        :param clock: function returning the current UNIX time, in seconds
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.table = table
+        self.duplicates = 0
+        self.__clock = clock
+        self.__lock = Lock()
+        # Deliveries claimed by this process but not handled yet have no
+        # response
+        self.__entries: \
+            'OrderedDict[str, Tuple[float, Optional[ResponseTuple]]]' = \
+            OrderedDict()
+
+    def __len__(self) -> int:
+        """Return the number of deliveries currently kept in memory."""
+        return len(self.__entries)
+
+    def get(self, delivery_id: str) -> Optional[ResponseTuple]:
+        """
+        Get the response to a delivery, if it has already been handled.
+
+        :param delivery_id: ID of the delivery
+        :return: the response the delivery got, or ``None`` if it hasn't
+                 been handled (or was handled too long ago)
+        """
+        now = self.__clock()
+        with self.__lock:
+            entry = self.__entries.get(delivery_id)
+            if entry is not None and entry[0] <= now:
+                del self.__entries[delivery_id]
+                entry = None
+
+        response = entry[1] if entry is not None else None
+        if response is None and self.table is not None:
+            response = self.__get_shared(delivery_id, now)
+
+        if response is not None:
+            with self.__lock:
+                self.duplicates += 1
+            logging.info(f"Webhook delivery {delivery_id} already handled")
+        return response
+
+    def claim(self, delivery_id: str) -> Optional[ResponseTuple]:
+        """
+        Claim a delivery before handling it, unless it has already been.
+
+        A claimed delivery must then be :meth:`put` once it's handled, or
+        :meth:`release`-d if it couldn't be.
+
+        :param delivery_id: ID of the delivery
+        :return: ``None`` if the delivery was claimed; otherwise the response
+                 it got, or :attr:`IN_PROGRESS` if it is still being handled
+        """
+        now = self.__clock()
+        expires = now + self.ttl
+        with self.__lock:
+            entry = self.__entries.get(delivery_id)
+            if entry is not None and entry[0] > now:
+                self.duplicates += 1
+                logging.info(f"Webhook delivery {delivery_id} already "
+                             "handled")
+                return entry[1] if entry[1] is not None else self.IN_PROGRESS
+            self.__remember_locked(delivery_id, expires, None)
+        if self.table is None:
+            return None
+
+        try:
+            self.table().put_item(
+                Item={'delivery_id': delivery_id, 'expires': int(expires)},
+                ConditionExpression=Attr('delivery_id').not_exists() |
+                Attr('expires').lte(int(now)))
+            return None
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') != \
+                    'ConditionalCheckFailedException':
+                logging.exception(f"Could not claim webhook delivery "
+                                  f"{delivery_id}")
+                return None
+        except BotoCoreError:
+            logging.exception(f"Could not claim webhook delivery "
+                              f"{delivery_id}")
+            return None
+
+        # Another process has claimed the delivery
+        with self.__lock:
+            self.duplicates += 1
+            if self.__entries.get(delivery_id, (0.0, None))[1] is None:
+                self.__entries.pop(delivery_id, None)
+        logging.info(f"Webhook delivery {delivery_id} already handled")
+        response = self.__get_shared(delivery_id, now)
+        return response if response is not None else self.IN_PROGRESS
+
+    def release(self, delivery_id: str) -> None:
+        """
+        Forget a claimed delivery that couldn't be handled.
+
+        A redelivery of it is then handled again.
+
+        :param delivery_id: ID of the delivery
+        """
+        with self.__lock:
+            self.__entries.pop(delivery_id, None)
+        if self.table is None:
+            return
+        try:
+            self.table().delete_item(
+                Key={'delivery_id': delivery_id},
+                ConditionExpression=Attr('response').not_exists())
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') != \
+                    'ConditionalCheckFailedException':
+                logging.exception(f"Could not release webhook delivery "
+                                  f"{delivery_id}")
+        except BotoCoreError:
+            logging.exception(f"Could not release webhook delivery "
+                              f"{delivery_id}")
+
+    def put(self, delivery_id: str, response: ResponseTuple) -> None:
+        """
+        Record the response to a delivery.
+
+        :param delivery_id: ID of the delivery
+        :param response: the response the delivery got
+        """
+        expires = self.__clock() + self.ttl
+        self.__remember(delivery_id, expires, response)
+        if self.table is None:
+            return
+        try:
+            self.table().put_item(Item={
+                'delivery_id': delivery_id,
+                'response': json.dumps(response[0]),
+                'status': response[1],
+                'expires': int(expires)
+            })
+        except (BotoCoreError, ClientError):
+            logging.exception(f"Could not record webhook delivery "
+                              f"{delivery_id}")
+
+    def __get_shared(self,
+                     delivery_id: str,
+                     now: float) -> Optional[ResponseTuple]:
+        """Get the response to a delivery from the shared table."""
+        if self.table is None:
+            return None
+        try:
+            item = self.table().get_item(
+                Key={'delivery_id': delivery_id},
+                ConsistentRead=True).get('Item')
+        except (BotoCoreError, ClientError):
+            logging.exception(f"Could not look up webhook delivery "
+                              f"{delivery_id}")
+            return None
+        # Deliveries claimed by another process have no response yet
+        if item is None or int(item['expires']) <= now or \
+                'response' not in item:
+            return None
+
+        response = (json.loads(item['response']), int(item['status']))
+        self.__remember(delivery_id, float(item['expires']), response)
+        return response
+
+    def __remember(self,
+                   delivery_id: str,
+                   expires: float,
+                   response: ResponseTuple) -> None:
+        """Keep a delivery in memory, evicting the oldest if full."""
+        with self.__lock:
+            self.__remember_locked(delivery_id, expires, response)
+
+    def __remember_locked(self,
+                          delivery_id: str,
+                          expires: float,
+                          response: Optional[ResponseTuple]) -> None:
+        """Keep a delivery in memory; must be called with the lock held."""
+        self.__entries[delivery_id] = (expires, response)
+        self.__entries.move_to_end(delivery_id)
+        while len(self.__entries) > self.max_size:
+            self.__entries.popitem(last=False)
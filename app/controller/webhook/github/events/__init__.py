@@ -1,4 +1,5 @@
 """Contain the handlers for each type of supported GitHub webhook."""
+import app.controller.webhook.github.events.base as base
 import app.controller.webhook.github.events.membership as membership
 import app.controller.webhook.github.events.organization as organization
 import app.controller.webhook.github.events.team as team
@@ -6,3 +7,6 @@ import app.controller.webhook.github.events.team as team
 MembershipEventHandler = membership.MembershipEventHandler
 OrganizationEventHandler = organization.OrganizationEventHandler
 TeamEventHandler = team.TeamEventHandler
+GitHubEventHandler = base.GitHubEventHandler
+register_handler = base.register_handler
+registered_handlers = base.registered_handlers
@@ -2,17 +2,32 @@
 from abc import ABC, abstractmethod
 from db.facade import DBFacade
 from app.controller import ResponseTuple
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Type
 
 
 class GitHubEventHandler(ABC):
     """Define the properties and methods needed for a GitHub event handler."""
 
-    def __init__(self, db_facade: DBFacade) -> None:
-        """Give handler access to the database facade."""
+    def __init__(self,
+                 db_facade: DBFacade,
+                 buffer_writes: bool = True) -> None:
+        """
+        Give handler access to the database facade.
+
+        :param buffer_writes: whether the handler may make some writes after
+                              :meth:`handle` returns; if false, every write
+                              is made (or has failed) by the time it returns
+        """
         self._facade = db_facade
+        self._buffer_writes = buffer_writes
         super().__init__()
 
+    @property
+    @abstractmethod
+    def event_type(self) -> str:
+        """Provide the type of GitHub event (``X-GitHub-Event``) handled."""
+        pass
+
     @property
     @abstractmethod
     def supported_action_list(self) -> List[str]:
@@ -23,3 +38,32 @@ class GitHubEventHandler(ABC):
     def handle(self, payload: Dict[str, Any]) -> ResponseTuple:
         """Handle a GitHub event."""
         pass
+
+
+# Classes of the handlers every GitHubWebhookHandler is made with
+_handler_classes: List[Type[GitHubEventHandler]] = []
+
+
+def register_handler(cls: Type[GitHubEventHandler]) \
+        -> Type[GitHubEventHandler]:
+    """
+    Register a class of GitHub event handler, for use as a class decorator.
+
+    Every :class:`GitHubWebhookHandler` made afterwards creates a handler of
+    the class, and routes the handler's event type and actions to it.
+
+    :param cls: class of the handler
+    :return: the class, unchanged
+    """
+    if cls not in _handler_classes:
+        _handler_classes.append(cls)
+    return cls
+
+
+def registered_handlers() -> List[Type[GitHubEventHandler]]:
+    """
+    Get the registered classes of GitHub event handler.
+
+    :return: list of classes, in the order they were registered
+    """
+    return list(_handler_classes)
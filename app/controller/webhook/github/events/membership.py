@@ -2,12 +2,46 @@
 import logging
 from app.model import User, Team
 from app.controller import ResponseTuple
+from db.facade import DBFacade
+from db.write_buffer import SetUpdateBuffer
 from typing import Dict, Any, List
-from app.controller.webhook.github.events.base import GitHubEventHandler
+from app.controller.webhook.github.events.base import \
+    GitHubEventHandler, register_handler
 
 
+@register_handler
 class MembershipEventHandler(GitHubEventHandler):
-    """Encapsulate the handler methods for GitHub membership events."""
+    """
+    Encapsulate the handler methods for GitHub membership events.
+
+    Adding many people to a team fires an event for each of them, so changes
+    to a team's members are buffered for ``WRITE_WINDOW`` seconds, and
+    written together, unless writes mustn't be buffered.
+    """
+
+    WRITE_WINDOW = 1.0
+
+    def __init__(self,
+                 db_facade: DBFacade,
+                 write_window: float = WRITE_WINDOW,
+                 buffer_writes: bool = True) -> None:
+        """
+        Give handler access to the database facade.
+
+        :param write_window: seconds to buffer changes to a team's members
+                             for; changes are written right away if ``0``
+        :param buffer_writes: if false, changes are written right away
+                              whatever ``write_window`` is, so that failing
+                              to write them fails the event
+        """
+        super().__init__(db_facade, buffer_writes)
+        self.writes = SetUpdateBuffer(db_facade,
+                                      write_window if buffer_writes else 0)
+
+    @property
+    def event_type(self) -> str:
+        """Provide the type of GitHub event handled."""
+        return "membership"
 
     @property
     def supported_action_list(self) -> List[str]:
@@ -46,9 +80,9 @@ class MembershipEventHandler(GitHubEventHandler):
         slack_ids_string = ""
         if len(member_list) == 1:
             slack_id = member_list[0].slack_id
-            if selected_team.has_member(github_id):
-                selected_team.discard_member(github_id)
-                self._facade.store(selected_team)
+            if self.is_member(selected_team, github_id):
+                self.writes.update(Team, selected_team.github_team_id,
+                                   remove={'members': {github_id}})
                 logging.info(f"deleted slack user {slack_id} "
                              f"from {team_name}")
                 slack_ids_string += f" {slack_id}"
@@ -76,8 +110,8 @@ class MembershipEventHandler(GitHubEventHandler):
                                          [('github_user_id', github_id)])
         slack_ids_string = ""
         if len(member_list) > 0:
-            selected_team.add_member(github_id)
-            self._facade.store(selected_team)
+            self.writes.update(Team, selected_team.github_team_id,
+                               add={'members': {github_id}})
             for member in member_list:
                 slack_id = member.slack_id
                 logging.info(f"user {github_username} added to {team_name}")
@@ -86,3 +120,15 @@ class MembershipEventHandler(GitHubEventHandler):
         else:
             logging.error(f"could not find user {github_id}")
             return f"could not find user {github_username}", 404
+
+    def is_member(self, team: Team, github_id: str) -> bool:
+        """
+        Check if a user is a member of a team, counting buffered changes.
+
+        :param team: the team, as last stored
+        :param github_id: Github ID of the user
+        :return: True if the user is (or is about to be) a member
+        """
+        pending = self.writes.pending(Team, team.github_team_id,
+                                      'members', github_id)
+        return team.has_member(github_id) if pending is None else pending
@@ -3,12 +3,19 @@ import logging
 from app.model import User
 from app.controller import ResponseTuple
 from typing import Dict, Any, List
-from app.controller.webhook.github.events.base import GitHubEventHandler
+from app.controller.webhook.github.events.base import \
+    GitHubEventHandler, register_handler
 
 
+@register_handler
 class OrganizationEventHandler(GitHubEventHandler):
     """Encapsulate the handler methods for GitHub organization events."""
 
+    @property
+    def event_type(self) -> str:
+        """Provide the type of GitHub event handled."""
+        return "organization"
+
     @property
     def supported_action_list(self) -> List[str]:
         """Provide a list of all actions this handler can handle."""
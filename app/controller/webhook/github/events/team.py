@@ -2,13 +2,21 @@
 import logging
 from app.model import Team
 from app.controller import ResponseTuple
+from db import ConditionFailedError
 from typing import Dict, Any, List
-from app.controller.webhook.github.events.base import GitHubEventHandler
+from app.controller.webhook.github.events.base import \
+    GitHubEventHandler, register_handler
 
 
+@register_handler
 class TeamEventHandler(GitHubEventHandler):
     """Encapsulate the handler methods for GitHub team events."""
 
+    @property
+    def event_type(self) -> str:
+        """Provide the type of GitHub event handled."""
+        return "team"
+
     @property
     def supported_action_list(self) -> List[str]:
         """Provide a list of all actions this handler can handle."""
@@ -64,15 +72,16 @@ class TeamEventHandler(GitHubEventHandler):
         """Help team function if payload action is created."""
         logging.debug(f"team created event triggered: {str(payload)}")
         try:
-            team = self._facade.retrieve(Team, github_id)
-            logging.warning(f"team {github_team_name} with "
-                            f"id {github_id} already exists.")
-            team.github_team_name = github_team_name
-        except LookupError:
+            self._facade.store(Team(github_id, github_team_name, ""),
+                               if_not_exists=True)
             logging.debug(f"team {github_team_name} with "
                           f"id {github_id} added to organization.")
-            team = Team(github_id, github_team_name, "")
-        self._facade.store(team)
+        except ConditionFailedError:
+            logging.warning(f"team {github_team_name} with "
+                            f"id {github_id} already exists.")
+            self._facade.update(
+                Team, github_id,
+                set_values={'github_team_name': github_team_name})
         logging.info(f"team {github_team_name} with "
                      f"id {github_id} added to rocket db.")
         return f"created team with github id {github_id}", 200
@@ -84,8 +93,7 @@ class TeamEventHandler(GitHubEventHandler):
         """Help team function if payload action is deleted."""
         logging.debug(f"team deleted event triggered: {str(payload)}")
         try:
-            self._facade.retrieve(Team, github_id)
-            self._facade.delete(Team, github_id)
+            self._facade.delete(Team, github_id, if_exists=True)
             logging.info(f"team {github_team_name} with github "
                          f"id {github_id} removed from db")
             return f"deleted team with github id {github_id}", 200
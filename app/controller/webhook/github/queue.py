@@ -0,0 +1,510 @@
+"""Process GitHub webhook events in the background."""
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import time
+import zlib
+
+from abc import ABC, abstractmethod
+from queue import Queue
+from threading import Lock, Thread
+from typing import Any, Callable, Dict, List, Optional, Tuple, cast
+
+Payload = Dict[str, Any]
+
+
+class EventStore(ABC):
+    """Store of webhook events, some of which are dead letters."""
+
+    @abstractmethod
+    def add(self, payload: Payload) -> int:
+        """
+        Add an event that needs handling.
+
+        :param payload: the event's payload
+        :return: ID of the event
+        """
+        pass
+
+    @abstractmethod
+    def done(self, event_id: int) -> None:
+        """
+        Remove an event that has been handled.
+
+        :param event_id: ID of the event
+        """
+        pass
+
+    @abstractmethod
+    def dead(self, event_id: int, error: str) -> None:
+        """
+        Move an event that couldn't be handled to the dead letters.
+
+        :param event_id: ID of the event
+        :param error: why the event couldn't be handled
+        """
+        pass
+
+    @abstractmethod
+    def revive(self, event_id: int) -> None:
+        """
+        Move an event from the dead letters back to the pending events.
+
+        :param event_id: ID of the event
+        """
+        pass
+
+    @abstractmethod
+    def pending(self) -> List[Tuple[int, Payload]]:
+        """
+        Get every event that needs handling, oldest first.
+
+        :return: list of event IDs and payloads
+        """
+        pass
+
+    @abstractmethod
+    def claim(self) -> List[Tuple[int, Payload]]:
+        """
+        Take over the events that need handling but no process is handling.
+
+        These are events added (or revived) by processes that are no longer
+        running, or by this process before it started handling events. Only
+        one process can claim an event.
+
+        :return: list of event IDs and payloads, oldest first
+        """
+        pass
+
+    @abstractmethod
+    def dead_letters(self) -> List[Tuple[int, Payload, str]]:
+        """
+        Get every dead letter, oldest first.
+
+        :return: list of event IDs, payloads and errors
+        """
+        pass
+
+
+class MemoryEventStore(EventStore):
+    """
+    Store of webhook events that lives in memory.
+
+    Events are lost if the process exits before they are handled. All
+    methods are thread-safe.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty store."""
+        self.__lock = Lock()
+        self.__next_id = 1
+        self.__pending: Dict[int, Payload] = {}
+        self.__dead: Dict[int, Tuple[Payload, str]] = {}
+
+    def add(self, payload: Payload) -> int:
+        """Add an event that needs handling."""
+        with self.__lock:
+            event_id = self.__next_id
+            self.__next_id += 1
+            self.__pending[event_id] = payload
+            return event_id
+
+    def done(self, event_id: int) -> None:
+        """Remove an event that has been handled."""
+        with self.__lock:
+            self.__pending.pop(event_id, None)
+
+    def dead(self, event_id: int, error: str) -> None:
+        """Move an event that couldn't be handled to the dead letters."""
+        with self.__lock:
+            payload = self.__pending.pop(event_id, None)
+            if payload is not None:
+                self.__dead[event_id] = (payload, error)
+
+    def revive(self, event_id: int) -> None:
+        """Move an event from the dead letters back to the pending events."""
+        with self.__lock:
+            dead = self.__dead.pop(event_id, None)
+            if dead is not None:
+                self.__pending[event_id] = dead[0]
+
+    def pending(self) -> List[Tuple[int, Payload]]:
+        """Get every event that needs handling, oldest first."""
+        with self.__lock:
+            return sorted(self.__pending.items())
+
+    def claim(self) -> List[Tuple[int, Payload]]:
+        """
+        Take over the events that need handling but no process is handling.
+
+        Events in memory are only seen by this process, so every event that
+        needs handling is returned.
+        """
+        return self.pending()
+
+    def dead_letters(self) -> List[Tuple[int, Payload, str]]:
+        """Get every dead letter, oldest first."""
+        with self.__lock:
+            return [(event_id, payload, error) for event_id, (payload, error)
+                    in sorted(self.__dead.items())]
+
+
+class SQLiteEventStore(EventStore):
+    """
+    Store of webhook events in an SQLite database.
+
+    Events survive restarts, so events that were not yet handled when the
+    process exited are handled once it starts again. The database can be
+    shared by several processes on the same machine (e.g. gunicorn workers):
+    every event is owned by the process that added or claimed it, and the
+    events of processes that are no longer running can be claimed by
+    another. All methods are thread-safe.
+
+    The database is opened the first time it is used in each process, since
+    an SQLite connection must not be used across ``fork()``.
+    """
+
+    # Seconds to wait for another process to finish writing
+    BUSY_TIMEOUT = 30.0
+
+    def __init__(self, path: str) -> None:
+        """
+        Initialize the store, without opening the database yet.
+
+        :param path: path of the SQLite database file
+        """
+        self.path = path
+        self.__lock = Lock()
+        self.__pid: Optional[int] = None
+        self.__conn: Optional[sqlite3.Connection] = None
+
+    def add(self, payload: Payload) -> int:
+        """Add an event that needs handling."""
+        with self.__lock:
+            cursor = self.__connection().execute(
+                'INSERT INTO webhook_events (payload, owner) VALUES (?, ?)',
+                (json.dumps(payload), os.getpid()))
+            return cast(int, cursor.lastrowid)
+
+    def done(self, event_id: int) -> None:
+        """Remove an event that has been handled."""
+        with self.__lock:
+            self.__connection().execute(
+                'DELETE FROM webhook_events WHERE id = ?', (event_id,))
+
+    def dead(self, event_id: int, error: str) -> None:
+        """Move an event that couldn't be handled to the dead letters."""
+        with self.__lock:
+            self.__connection().execute(
+                'UPDATE webhook_events SET error = ? WHERE id = ?',
+                (error, event_id))
+
+    def revive(self, event_id: int) -> None:
+        """
+        Move an event from the dead letters back to the pending events.
+
+        Revived events are owned by this process; if it doesn't handle them
+        (e.g. it is a script that exits), the next process to :meth:`claim`
+        events does.
+        """
+        with self.__lock:
+            self.__connection().execute(
+                'UPDATE webhook_events SET error = NULL, owner = ? '
+                'WHERE id = ?', (os.getpid(), event_id))
+
+    def pending(self) -> List[Tuple[int, Payload]]:
+        """Get every event that needs handling, oldest first."""
+        with self.__lock:
+            rows = self.__connection().execute(
+                'SELECT id, payload FROM webhook_events '
+                'WHERE error IS NULL ORDER BY id').fetchall()
+        return [(event_id, json.loads(payload)) for event_id, payload in rows]
+
+    def claim(self) -> List[Tuple[int, Payload]]:
+        """
+        Take over the events that need handling but no process is handling.
+
+        The events are read and taken over in a single transaction, so that
+        processes claiming events at the same time never claim the same
+        event.
+        """
+        pid = os.getpid()
+        with self.__lock:
+            conn = self.__connection()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                rows = conn.execute(
+                    'SELECT id, payload, owner FROM webhook_events '
+                    'WHERE error IS NULL ORDER BY id').fetchall()
+                # Events owned by this process were added before it started
+                # handling events, or by an earlier process with the same ID
+                claimed = [(event_id, payload) for event_id, payload, owner
+                           in rows
+                           if owner == pid or not process_running(owner)]
+                conn.executemany(
+                    'UPDATE webhook_events SET owner = ? WHERE id = ?',
+                    [(pid, event_id) for event_id, _ in claimed])
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+        return [(event_id, json.loads(payload))
+                for event_id, payload in claimed]
+
+    def dead_letters(self) -> List[Tuple[int, Payload, str]]:
+        """Get every dead letter, oldest first."""
+        with self.__lock:
+            rows = self.__connection().execute(
+                'SELECT id, payload, error FROM webhook_events '
+                'WHERE error IS NOT NULL ORDER BY id').fetchall()
+        return [(event_id, json.loads(payload), error)
+                for event_id, payload, error in rows]
+
+    def __connection(self) -> sqlite3.Connection:
+        """
+        Get this process' connection to the database, opening it if needed.
+
+        Must be called with the lock held.
+        """
+        if self.__conn is None or self.__pid != os.getpid():
+            # A connection inherited from the parent process is abandoned,
+            # not closed, since closing it could affect the parent's
+            self.__pid = os.getpid()
+            self.__conn = sqlite3.connect(self.path,
+                                          timeout=self.BUSY_TIMEOUT,
+                                          check_same_thread=False,
+                                          isolation_level=None)
+            self.__conn.execute('PRAGMA journal_mode=WAL')
+            self.__conn.execute(
+                'CREATE TABLE IF NOT EXISTS webhook_events ('
+                'id INTEGER PRIMARY KEY AUTOINCREMENT, '
+                'payload TEXT NOT NULL, '
+                'error TEXT, '
+                'owner INTEGER)')
+        return self.__conn
+
+
+def process_running(pid: int) -> bool:
+    """
+    Check whether a process is running on this machine.
+
+    :param pid: ID of the process
+    :return: true if the process is running
+    """
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # The process exists, but belongs to another user
+        return True
+    return True
+
+
+class WebhookQueue:
+    """
+    Handle webhook events on a pool of background workers.
+
+    Events are saved to a store before being handled, and removed once they
+    have been. The store holds each event's type and payload, as a
+    dictionary with keys ``event`` and ``payload``. Each worker handles its
+    events one at a time, and all events for a team go to the same worker,
+    so events for a team are handled in the order they arrive. Events that
+    fail ``max_attempts`` times are moved to the store's dead letters, and
+    are only retried when asked to, with :meth:`retry_dead_letters`.
+
+    Threads don't survive ``fork()``, so the workers are started in each
+    process the first time it submits an event, rather than when the queue
+    is created; this way, the queue can be created before gunicorn forks its
+    workers (with ``--preload``). Each process then also claims the events
+    left in the store by processes that are no longer running.
+    """
+
+    def __init__(self,
+                 store: EventStore,
+                 workers: int,
+                 max_attempts: int = 3,
+                 backoff: float = 1.0) -> None:
+        """
+        Initialize the queue.
+
+        :param store: store events are saved to until they are handled
+        :param workers: number of worker threads
+        :param max_attempts: number of times an event is tried before it is
+                             moved to the dead letters
+        :param backoff: seconds to wait before the first retry of an event;
+                        the wait doubles on every retry
+        """
+        self.store = store
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.handled = 0
+        self.retried = 0
+        self.failed = 0
+        self.__lock = Lock()
+        self.__handler: Optional[Callable[[Payload, Optional[str]], Any]] = \
+            None
+        self.__pid: Optional[int] = None
+        self.__queues: List['Queue[Optional[Tuple[int, Payload]]]'] = []
+        self.__threads: List[Thread] = []
+
+    def start(self, handler: Callable[[Payload, Optional[str]], Any]) -> None:
+        """
+        Set the function that handles events.
+
+        The workers are only started once an event is submitted.
+
+        :param handler: function that handles an event's payload and type,
+                        raising an exception if it fails
+        """
+        self.__handler = handler
+
+    def submit(self,
+               payload: Payload,
+               event_type: Optional[str] = None) -> int:
+        """
+        Save an event and queue it to be handled.
+
+        :param payload: the event's payload
+        :param event_type: type of the event
+        :return: ID of the event
+        """
+        self.__start_workers()
+        event = {'event': event_type, 'payload': payload}
+        event_id = self.store.add(event)
+        self.__dispatch(event_id, event)
+        return event_id
+
+    def retry_dead_letters(self) -> int:
+        """
+        Queue every event in the dead letters to be handled again.
+
+        Dead letters are events that already failed ``max_attempts`` times,
+        so they are only retried when an operator asks to, e.g. once the
+        cause of the failures has been fixed.
+
+        :return: number of events queued
+        """
+        self.__start_workers()
+        dead_letters = self.store.dead_letters()
+        for event_id, event, _ in dead_letters:
+            self.store.revive(event_id)
+            self.__dispatch(event_id, event)
+        return len(dead_letters)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the queue's depth and counters.
+
+        :return: dictionary with the number of queued events, and the number
+                 of events handled, attempts retried, and events that failed
+        """
+        with self.__lock:
+            return {'queued': sum(q.qsize() for q in self.__queues),
+                    'handled': self.handled,
+                    'retried': self.retried,
+                    'failed': self.failed}
+
+    def shutdown(self) -> None:
+        """Stop the workers once they have handled their queued events."""
+        if self.__pid != os.getpid():
+            return
+        for q in self.__queues:
+            q.put(None)
+        for thread in self.__threads:
+            thread.join()
+        self.__queues = []
+        self.__threads = []
+        self.__pid = None
+
+    @staticmethod
+    def shard_key(payload: Payload) -> str:
+        """
+        Get the key that decides which worker handles an event.
+
+        :param payload: the event's payload
+        :return: the team's ID for team and membership events, otherwise the
+                 login of the user the event is about
+        """
+        if 'team' in payload:
+            return f"team:{payload['team'].get('id')}"
+        login = payload.get('membership', {}).get('user', {}).get('login')
+        return f"user:{login}"
+
+    def __start_workers(self) -> None:
+        """
+        Start the workers, if they aren't running in this process yet.
+
+        Once started, the workers resume handling the events claimed from
+        the store.
+        """
+        with self.__lock:
+            if self.__pid == os.getpid():
+                return
+            if self.__handler is None:
+                raise RuntimeError('Webhook queue has not been started')
+            # Workers inherited from the parent process aren't running here
+            self.__pid = os.getpid()
+            self.__queues = []
+            self.__threads = []
+            for i in range(self.workers):
+                q: 'Queue[Optional[Tuple[int, Payload]]]' = Queue()
+                thread = Thread(target=self.__run, args=(q, self.__handler),
+                                name=f'webhook-{i}', daemon=True)
+                self.__queues.append(q)
+                self.__threads.append(thread)
+                thread.start()
+            atexit.register(self.shutdown)
+
+            claimed = self.store.claim()
+            if claimed:
+                logging.info(f"Resuming {len(claimed)} webhook events")
+            for event_id, event in claimed:
+                self.__dispatch(event_id, event)
+
+    def __dispatch(self, event_id: int, event: Payload) -> None:
+        """Queue an event on the worker for its team."""
+        key = self.shard_key(event['payload'])
+        shard = zlib.crc32(key.encode()) % len(self.__queues)
+        self.__queues[shard].put((event_id, event))
+
+    def __run(self,
+              q: 'Queue[Optional[Tuple[int, Payload]]]',
+              handler: Callable[[Payload, Optional[str]], Any]) -> None:
+        """Handle the events on a worker's queue, until told to stop."""
+        while True:
+            item = q.get()
+            if item is None:
+                return
+            event_id, event = item
+            self.__handle(handler, event_id, event)
+
+    def __handle(self,
+                 handler: Callable[[Payload, Optional[str]], Any],
+                 event_id: int,
+                 event: Payload) -> None:
+        """Handle an event, retrying and then giving up if it fails."""
+        error = ''
+        for attempt in range(self.max_attempts):
+            try:
+                handler(event['payload'], event['event'])
+                self.store.done(event_id)
+                with self.__lock:
+                    self.handled += 1
+                return
+            except Exception as e:
+                error = repr(e)
+                logging.exception(f"Webhook event {event_id} failed")
+                if attempt + 1 < self.max_attempts:
+                    with self.__lock:
+                        self.retried += 1
+                    time.sleep(self.backoff * 2 ** attempt)
+
+        logging.error(f"Webhook event {event_id} failed "
+                      f"{self.max_attempts} times, moving to dead letters")
+        self.store.dead(event_id, error)
+        with self.__lock:
+            self.failed += 1
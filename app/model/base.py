@@ -1,12 +1,43 @@
 """Define the abstract base class for a data model."""
 from abc import ABC, abstractmethod
-from typing import Dict, Any, TypeVar, Type
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, \
+    TypeVar, Type
 
 T = TypeVar('T', bound='RocketModel')
 
 
 class RocketModel(ABC):
-    """Define the properties and methods needed for a data model."""
+    """
+    Define the properties and methods needed for a data model.
+
+    Models are read by the thousands when scanning a table, so they use
+    ``__slots__`` instead of a ``__dict__``, which makes them smaller and
+    faster to create. Every attribute of a model must be listed in its
+    ``__slots__``, in the order they should be printed in.
+
+    Models are equal if they are of the same type and all their attributes
+    are equal, and are hashed by their primary key (``KEY``), so that they
+    can be put in sets and used as dictionary keys. Don't change the key of a
+    model while it is in a set.
+    """
+
+    __slots__: Tuple[str, ...] = ()
+
+    # Name of the attribute that is the model's primary key
+    KEY = ''
+
+    # Function returning a tuple of the values of every attribute
+    _values: Callable[[Any], Tuple[Any, ...]]
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        """Prepare the function reading every attribute of a model."""
+        super().__init_subclass__(**kwargs)
+        getter = attrgetter(*cls.__slots__)
+        if len(cls.__slots__) == 1:
+            cls._values = staticmethod(lambda obj: (getter(obj),))
+        else:
+            cls._values = staticmethod(getter)
 
     @abstractmethod
     def get_attachment(self) -> Dict[str, Any]:
@@ -47,3 +78,36 @@ class RocketModel(ABC):
         :return: return true if this data model has no missing required fields
         """
         pass
+
+    def _fields(self) -> Dict[str, Any]:
+        """Return a dictionary of every attribute of this model."""
+        return dict(zip(self.__slots__, self._values(self)))
+
+    def diff(self: T,
+             other: T,
+             fields: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Get the attributes of this model that differ from another's.
+
+        :param other: model of the same type to compare with
+        :param fields: names of the attributes to compare; every attribute
+                       is compared if not given
+        :return: names of the attributes whose values differ
+        """
+        if fields is None:
+            return [attr for attr, a, b in zip(self.__slots__,
+                                               self._values(self),
+                                               other._values(other))
+                    if a != b]
+        return [attr for attr in fields
+                if getattr(self, attr) != getattr(other, attr)]
+
+    def __eq__(self, other: object) -> bool:
+        """Return true if the other model has the same attributes."""
+        # Attributes are compared in order, stopping at the first difference
+        return isinstance(other, type(self)) and \
+            self._values(self) == other._values(other)
+
+    def __hash__(self) -> int:
+        """Return a hash of this model's type and primary key."""
+        return hash((type(self), getattr(self, self.KEY)))
@@ -1,4 +1,6 @@
 """Represent a team project."""
+import sys
+from operator import attrgetter
 from typing import List, Dict, Any, TypeVar, Type
 import uuid
 from app.model.base import RocketModel
@@ -9,6 +11,22 @@ T = TypeVar('T', bound='Project')
 class Project(RocketModel):
     """Represent a team project with team ID and related fields and methods."""
 
+    __slots__ = ('project_id', 'github_team_id', 'github_urls',
+                 'display_name', 'short_description', 'long_description',
+                 'tags', 'website_url', 'medium_url', 'appstore_url',
+                 'playstore_url')
+    KEY = 'project_id'
+
+    # Attributes that are only stored if not empty, and their stored names
+    OPTIONAL_FIELDS = (('github_team_id', 'github_team_id'),
+                       ('display_name', 'display_name'),
+                       ('short_description', 'short_description'),
+                       ('long_description', 'long_description'),
+                       ('tags', 'tags'),
+                       ('website_url', 'website_url'),
+                       ('appstore_url', 'appstore_url'),
+                       ('playstore_url', 'playstore_url'))
+
     def __init__(self,
                  github_team_id: str,
                  github_urls: List[str]) -> None:
@@ -63,16 +81,20 @@ class Project(RocketModel):
         :param d: the dictionary (usually from DynamoDB)
         :return: a Project object
         """
-        p = cls(d['github_team_id'], d['github_urls'])
-        p.project_id = d['project_id']
-        p.display_name = d.get('display_name', '')
-        p.short_description = d.get('short_description', '')
-        p.long_description = d.get('long_description', '')
-        p.tags = d.get('tags', [])
-        p.website_url = d.get('website_url', '')
-        p.medium_url = d.get('medium_url', '')
-        p.appstore_url = d.get('appstore_url', '')
-        p.playstore_url = d.get('playstore_url', '')
+        # Skip __init__, which would generate a project ID for nothing
+        p = cls.__new__(cls)
+        get = d.get
+        p.project_id = sys.intern(d['project_id'])
+        p.github_team_id = sys.intern(d['github_team_id'])
+        p.github_urls = d['github_urls']
+        p.display_name = get('display_name', '')
+        p.short_description = get('short_description', '')
+        p.long_description = get('long_description', '')
+        p.tags = get('tags', [])
+        p.website_url = get('website_url', '')
+        p.medium_url = get('medium_url', '')
+        p.appstore_url = get('appstore_url', '')
+        p.playstore_url = get('playstore_url', '')
 
         return p
 
@@ -87,23 +109,13 @@ class Project(RocketModel):
         :param p: the Project object
         :return: a dictionary representing a project
         """
-        def place_if_filled(name: str, field: Any):
-            """Populate ``udict`` if ``field`` isn't empty."""
-            if field:
-                udict[name] = field
-
         udict = {
             'project_id': p.project_id,
             'github_urls': p.github_urls
         }
-        place_if_filled('github_team_id', p.github_team_id)
-        place_if_filled('display_name', p.display_name)
-        place_if_filled('short_description', p.short_description)
-        place_if_filled('long_description', p.long_description)
-        place_if_filled('tags', p.tags)
-        place_if_filled('website_url', p.website_url)
-        place_if_filled('appstore_url', p.appstore_url)
-        place_if_filled('playstore_url', p.playstore_url)
+        for name, field in zip(_OPTIONAL_NAMES, _get_optional(p)):
+            if field:
+                udict[name] = field
 
         return udict
 
@@ -122,14 +134,10 @@ class Project(RocketModel):
         return len(p.project_id) > 0 and\
             len(p.github_urls) > 0
 
-    def __eq__(self, other: object) -> bool:
-        """Return true if this project is equal to the other project."""
-        return isinstance(other, Project) and str(self) == str(other)
-
-    def __ne__(self, other: object) -> bool:
-        """Return true if this project isn't equal to the other project."""
-        return not (self == other)
-
     def __str__(self) -> str:
         """Return all fields of this project, JSON format."""
-        return str(self.__dict__)
+        return str(self._fields())
+
+
+_get_optional = attrgetter(*(attr for attr, _ in Project.OPTIONAL_FIELDS))
+_OPTIONAL_NAMES = tuple(name for _, name in Project.OPTIONAL_FIELDS)
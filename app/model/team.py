@@ -1,4 +1,6 @@
 """Represent a data model for a team."""
+import sys
+from operator import attrgetter
 from typing import Set, Dict, Any, TypeVar, Type
 from app.model.base import RocketModel
 
@@ -8,6 +10,16 @@ T = TypeVar('T', bound='Team')
 class Team(RocketModel):
     """Represent a team with related fields and methods."""
 
+    __slots__ = ('github_team_id', 'github_team_name', 'display_name',
+                 'platform', 'team_leads', 'members')
+    KEY = 'github_team_id'
+
+    # Attributes that are only stored if not empty, and their stored names
+    OPTIONAL_FIELDS = (('display_name', 'display_name'),
+                       ('platform', 'platform'),
+                       ('members', 'members'),
+                       ('team_leads', 'team_leads'))
+
     def __init__(self,
                  github_team_id: str,
                  github_team_name: str,
@@ -62,14 +74,15 @@ class Team(RocketModel):
         :param d: the dictionary representing a team
         :return: returns converted team model.
         """
-        team = cls(d['github_team_id'],
-                   d['github_team_name'],
-                   d.get('display_name', ''))
-        team.platform = d.get('platform', '')
-        team.team_leads = set(d.get('team_leads', []))
-        members = set(d.get('members', []))
-        for member in members:
-            team.add_member(member)
+        # Skip __init__, since every attribute is set below
+        team = cls.__new__(cls)
+        get = d.get
+        team.github_team_id = sys.intern(d['github_team_id'])
+        team.github_team_name = d['github_team_name']
+        team.display_name = get('display_name', '')
+        team.platform = get('platform', '')
+        team.team_leads = set(map(sys.intern, get('team_leads', ())))
+        team.members = set(map(sys.intern, get('members', ())))
         return team
 
     @classmethod
@@ -83,19 +96,13 @@ class Team(RocketModel):
         :param team: the team object
         :return: the dictionary representing the team
         """
-        def place_if_filled(name: str, field: Any) -> None:
-            """Populate ``tdict`` if ``field`` isn't empty."""
-            if field:
-                tdict[name] = field
-
         tdict = {
             'github_team_id': team.github_team_id,
             'github_team_name': team.github_team_name
         }
-        place_if_filled('display_name', team.display_name)
-        place_if_filled('platform', team.platform)
-        place_if_filled('members', team.members)
-        place_if_filled('team_leads', team.team_leads)
+        for name, field in zip(_OPTIONAL_NAMES, _get_optional(team)):
+            if field:
+                tdict[name] = field
 
         return tdict
 
@@ -114,14 +121,6 @@ class Team(RocketModel):
         return len(team.github_team_name) > 0 and\
             len(team.github_team_id) > 0
 
-    def __eq__(self, other: object) -> bool:
-        """Return true if this team has the same attributes as the other."""
-        return isinstance(other, Team) and str(self) == str(other)
-
-    def __ne__(self, other: object) -> bool:
-        """Return the opposite of what is returned in self.__eq__(other)."""
-        return not (self == other)
-
     def add_member(self, github_user_id: str) -> None:
         """Add a new member's Github ID to the team's set of members' IDs."""
         self.members.add(github_user_id)
@@ -152,4 +151,8 @@ class Team(RocketModel):
 
     def __str__(self) -> str:
         """Print information on the team class."""
-        return str(self.__dict__)
+        return str(self._fields())
+
+
+_get_optional = attrgetter(*(attr for attr, _ in Team.OPTIONAL_FIELDS))
+_OPTIONAL_NAMES = tuple(name for _, name in Team.OPTIONAL_FIELDS)
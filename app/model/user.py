@@ -1,4 +1,6 @@
 """Data model to represent an individual user."""
+import sys
+from operator import attrgetter
 from typing import Dict, Any, TypeVar, Type
 from app.model.permissions import Permissions
 from app.model.base import RocketModel
@@ -9,6 +11,22 @@ T = TypeVar('T', bound='User')
 class User(RocketModel):
     """Represent a user with related fields and methods."""
 
+    __slots__ = ('slack_id', 'name', 'email', 'github_username', 'github_id',
+                 'major', 'position', 'biography', 'image_url',
+                 'permissions_level', 'karma')
+    KEY = 'slack_id'
+
+    # Attributes that are only stored if not empty, and their stored names
+    OPTIONAL_FIELDS = (('email', 'email'),
+                       ('name', 'name'),
+                       ('github_username', 'github'),
+                       ('github_id', 'github_user_id'),
+                       ('major', 'major'),
+                       ('position', 'position'),
+                       ('biography', 'bio'),
+                       ('image_url', 'image_url'),
+                       ('karma', 'karma'))
+
     def __init__(self, slack_id: str) -> None:
         """Initialize the user with a given Slack ID."""
         self.slack_id = slack_id
@@ -57,24 +75,13 @@ class User(RocketModel):
         :param user: the user object
         :return: the dictionary representing the user
         """
-        def place_if_filled(name: str, field: Any) -> None:
-            """Populate ``udict`` if ``field`` isn't empty."""
-            if field:
-                udict[name] = field
-
         udict = {
             'slack_id': user.slack_id,
             'permission_level': user.permissions_level.name
         }
-        place_if_filled('email', user.email)
-        place_if_filled('name', user.name)
-        place_if_filled('github', user.github_username)
-        place_if_filled('github_user_id', user.github_id)
-        place_if_filled('major', user.major)
-        place_if_filled('position', user.position)
-        place_if_filled('bio', user.biography)
-        place_if_filled('image_url', user.image_url)
-        place_if_filled('karma', user.karma)
+        for name, field in zip(_OPTIONAL_NAMES, _get_optional(user)):
+            if field:
+                udict[name] = field
 
         return udict
 
@@ -86,18 +93,21 @@ class User(RocketModel):
         :param d: the dictionary representing a user
         :return: returns converted user model.
         """
-        user = cls(d['slack_id'])
-        user.email = d.get('email', '')
-        user.name = d.get('name', '')
-        user.github_username = d.get('github', '')
-        user.github_id = d.get('github_user_id', '')
-        user.major = d.get('major', '')
-        user.position = d.get('position', '')
-        user.biography = d.get('bio', '')
-        user.image_url = d.get('image_url', '')
-        user.permissions_level = Permissions[d.get('permission_level',
-                                                   'member')]
-        user.karma = int(d.get('karma', 1))
+        # Skip __init__, since every attribute is set below
+        user = cls.__new__(cls)
+        get = d.get
+        user.slack_id = sys.intern(d['slack_id'])
+        user.email = get('email', '')
+        user.name = get('name', '')
+        user.github_username = get('github', '')
+        user.github_id = sys.intern(get('github_user_id', ''))
+        user.major = get('major', '')
+        user.position = get('position', '')
+        user.biography = get('bio', '')
+        user.image_url = get('image_url', '')
+        user.permissions_level = Permissions[get('permission_level',
+                                                 'member')]
+        user.karma = int(get('karma', 1))
         return user
 
     @classmethod
@@ -114,15 +124,10 @@ class User(RocketModel):
         """
         return len(user.slack_id) > 0
 
-    def __eq__(self, other: object) -> bool:
-        """Return true if this user has the same attributes as the other."""
-        return isinstance(other, User) and\
-            str(self.__dict__) == str(other.__dict__)
-
-    def __ne__(self, other: object) -> bool:
-        """Return the opposite of what is returned in self.__eq__(other)."""
-        return not self == other
-
     def __str__(self) -> str:
         """Print information on the user class."""
-        return str(self.__dict__)
+        return str(self._fields())
+
+
+_get_optional = attrgetter(*(attr for attr, _ in User.OPTIONAL_FIELDS))
+_OPTIONAL_NAMES = tuple(name for _, name in User.OPTIONAL_FIELDS)
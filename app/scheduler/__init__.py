@@ -4,7 +4,8 @@ from flask import Flask
 from apscheduler.schedulers.background import BackgroundScheduler
 from .modules.random_channel import RandomChannelPromoter
 from .modules.base import ModuleBase
-from typing import Tuple, List
+from interface.slack_dispatcher import SlackDispatcher
+from typing import Tuple, List, Optional
 from config import Config
 
 
@@ -13,10 +14,17 @@ class Scheduler():
 
     def __init__(self,
                  scheduler: BackgroundScheduler,
-                 args: Tuple[Flask, Config]):
-        """Initialize scheduler class."""
+                 args: Tuple[Flask, Config],
+                 dispatcher: Optional[SlackDispatcher] = None):
+        """
+        Initialize scheduler class.
+
+        :param dispatcher: Slack dispatcher used by the modules; a new one is
+                           made if not given
+        """
         self.scheduler = scheduler
         self.args = args
+        self.dispatcher = dispatcher
         self.modules: List[ModuleBase] = []
 
         self.__init_periodic_tasks()
@@ -34,4 +42,4 @@ class Scheduler():
 
     def __init_periodic_tasks(self):
         """Add jobs that fire every interval."""
-        self.__add_job(RandomChannelPromoter(*self.args))
+        self.__add_job(RandomChannelPromoter(*self.args, self.dispatcher))
@@ -1,9 +1,10 @@
 """Feature random public channels."""
 from slack import WebClient
 from interface.slack import Bot
+from interface.slack_dispatcher import SlackDispatcher
 from random import choice
 from .base import ModuleBase
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from flask import Flask
 from config import Config
 import logging
@@ -16,11 +17,20 @@ class RandomChannelPromoter(ModuleBase):
 
     def __init__(self,
                  flask_app: Flask,
-                 config: Config):
-        """Initialize the object."""
+                 config: Config,
+                 dispatcher: Optional[SlackDispatcher] = None):
+        """
+        Initialize the object.
+
+        :param dispatcher: Slack dispatcher to use; a new one is made if not
+                           given
+        """
         self.default_channel = config.slack_announcement_channel
-        self.bot = Bot(WebClient(config.slack_api_token),
-                       config.slack_notification_channel)
+        if dispatcher is None:
+            dispatcher = SlackDispatcher(WebClient(config.slack_api_token))
+        self.bot = Bot(dispatcher.sc,
+                       config.slack_notification_channel,
+                       dispatcher)
 
     def get_job_args(self) -> Dict[str, Any]:
         """Get job configuration arguments for apscheduler."""
@@ -31,18 +41,15 @@ class RandomChannelPromoter(ModuleBase):
 
     def do_it(self):
         """Select and post random channels to #general."""
-        channels = self.bot.get_channels()
+        channels = [channel for channel in
+                    self.bot.get_channels(exclude_archived=True)
+                    if not channel.get('is_archived') and
+                    not channel.get('is_private')]
+        if not channels:
+            logging.error('No non-archived or non-private channels found')
+            return
 
-        # Find an appropriate random channel
         rand_channel = choice(channels)
-        checked = 0
-        while rand_channel['is_archived'] or rand_channel['is_private']:
-            rand_channel = choice(channels)
-            checked += 1
-            if checked > len(channels):
-                logging.error('No non-archived or non-private channels found')
-                return
-
         channel_id, channel_name = rand_channel['id'], rand_channel['name']
         self.bot.send_to_channel(f'Featured channel of the week: ' +
                                  f'<#{channel_id}|{channel_name}>!',
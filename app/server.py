@@ -1,6 +1,7 @@
 """Flask server instance."""
 from factory import make_command_parser, make_github_webhook_handler, \
-    make_slack_events_handler
+    make_slack_events_handler, make_dbfacade, make_http_session, \
+    make_slack_dispatcher
 from flask import Flask, request
 from logging.config import dictConfig
 from slackeventsapi import SlackEventAdapter
@@ -10,10 +11,9 @@ import structlog
 from flask_talisman import Talisman
 from config import Config
 from app.scheduler import Scheduler
+from app.controller.command import CommandExecutor
 from interface.slack import Bot
-from slack import WebClient
 from boto3.session import Session
-from threading import Thread
 
 config = Config()
 boto3_session = Session(aws_access_key_id=config.aws_access_keyid,
@@ -66,18 +66,28 @@ app = Flask(__name__)
 # HTTP security header middleware for Flask
 talisman = Talisman(app)
 talisman.force_https = False
-command_parser = make_command_parser(config)
-github_webhook_handler = make_github_webhook_handler(config)
-slack_events_handler = make_slack_events_handler(config)
+facade = make_dbfacade(config)
+http_session = make_http_session(config)
+slack_dispatcher = make_slack_dispatcher(config)
+command_parser = make_command_parser(config, facade=facade,
+                                     session=http_session,
+                                     dispatcher=slack_dispatcher)
+command_executor = CommandExecutor(command_parser,
+                                   config.command_workers,
+                                   config.command_queue_size)
+github_webhook_handler = make_github_webhook_handler(config, facade=facade)
+slack_events_handler = make_slack_events_handler(config, facade=facade,
+                                                 dispatcher=slack_dispatcher)
 slack_events_adapter = SlackEventAdapter(config.slack_signing_secret,
                                          "/slack/events",
                                          app)
 sched = Scheduler(BackgroundScheduler(timezone="America/Los_Angeles"),
-                  (app, config))
+                  (app, config), slack_dispatcher)
 sched.start()
 
-bot = Bot(WebClient(config.slack_api_token),
-          config.slack_notification_channel)
+bot = Bot(slack_dispatcher.sc,
+          config.slack_notification_channel,
+          slack_dispatcher)
 bot.send_to_channel('rocket2 has restarted successfully! :clap: :clap:',
                     config.slack_notification_channel)
 
@@ -102,9 +112,7 @@ def handle_commands():
         txt = request.form['text']
         uid = request.form['user_id']
         response_url = request.form['response_url']
-        Thread(target=command_parser.handle_app_command,
-               args=(txt, uid, response_url)).start()
-        return "", 200
+        return command_executor.submit(txt, uid, response_url)
     else:
         logging.error("Slack signature could not be verified")
         return "Slack signature could not be verified", 200
@@ -114,10 +122,12 @@ def handle_commands():
 def handle_github_webhook():
     """Handle GitHub webhooks."""
     xhub_signature = request.headers.get('X-Hub-Signature')
+    delivery_id = request.headers.get('X-GitHub-Delivery')
+    event_type = request.headers.get('X-GitHub-Event')
     request_data = request.get_data()
     request_json = request.get_json()
     msg = github_webhook_handler.handle(
-        request_data, xhub_signature, request_json)
+        request_data, xhub_signature, request_json, delivery_id, event_type)
     return msg
 
 
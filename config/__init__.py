@@ -34,6 +34,25 @@ class Config:
         'AWS_REGION': 'aws_region',
     }
 
+    # Map name of optional env variable to python variable and default value
+    OPTIONAL_ENV_NAMES = {
+        'AWS_SCAN_SEGMENTS': ('aws_scan_segments', 1),
+        'AWS_MAX_POOL_CONNECTIONS': ('aws_max_pool_connections', 25),
+        'AWS_SKIP_TABLE_CHECK': ('aws_skip_table_check', False),
+        'DB_CACHE_SIZE': ('db_cache_size', 0),
+        'DB_CACHE_TTL': ('db_cache_ttl', 30),
+        'COMMAND_WORKERS': ('command_workers', 8),
+        'COMMAND_QUEUE_SIZE': ('command_queue_size', 32),
+        'HTTP_TIMEOUT': ('http_timeout', 10.0),
+        'HTTP_RETRIES': ('http_retries', 3),
+        'GITHUB_WEBHOOK_ASYNC': ('github_webhook_async', False),
+        'GITHUB_WEBHOOK_WORKERS': ('github_webhook_workers', 4),
+        'GITHUB_WEBHOOK_QUEUE_DB': ('github_webhook_queue_db', ''),
+        'GITHUB_DELIVERY_TTL': ('github_delivery_ttl', 3600),
+        'AWS_DELIVERIES_TABLE': ('aws_deliveries_tablename', ''),
+        'SQLITE_DB': ('sqlite_db', ''),
+    }
+
     def __init__(self):
         """
         Load environmental variables into self.
@@ -54,11 +73,29 @@ class Config:
         if missing_config_fields:
             raise MissingConfigError(missing_config_fields)
 
+        for var_name, (var, default) in self.OPTIONAL_ENV_NAMES.items():
+            setattr(self, var, self._parse_optional(var_name, default))
+
         self.testing = self.testing == 'True'
         self.github_key = self.github_key\
             .replace('\\n', '\n')\
             .replace('\\-', '-')
 
+    def _parse_optional(self, var_name, default):
+        """
+        Load an optional environmental variable, casting to the default type.
+
+        :param var_name: name of the environmental variable
+        :param default: value to use if the variable isn't set
+        :return: the value of the variable, or the default value
+        """
+        data = os.environ.get(var_name)
+        if data is None:
+            return default
+        elif isinstance(default, bool):
+            return data == 'True'
+        return type(default)(data)
+
     def _set_attrs(self):
         """Add attributes so that mypy doesn't complain."""
         self.testing = ''
@@ -81,6 +118,21 @@ class Config:
         self.aws_teams_tablename = ''
         self.aws_projects_tablename = ''
         self.aws_region = ''
+        self.aws_scan_segments = 1
+        self.aws_max_pool_connections = 25
+        self.aws_skip_table_check = False
+        self.db_cache_size = 0
+        self.db_cache_ttl = 30
+        self.command_workers = 8
+        self.command_queue_size = 32
+        self.http_timeout = 10.0
+        self.http_retries = 3
+        self.github_webhook_async = False
+        self.github_webhook_workers = 4
+        self.github_webhook_queue_db = ''
+        self.github_delivery_ttl = 3600
+        self.aws_deliveries_tablename = ''
+        self.sqlite_db = ''
 
 
 class MissingConfigError(Exception):
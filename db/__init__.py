@@ -1,4 +1,6 @@
 """Pack the modules contained in the db directory."""
+import db.exceptions
 import db.facade
 
+ConditionFailedError = db.exceptions.ConditionFailedError
 DBFacade = db.facade.DBFacade
@@ -0,0 +1,130 @@
+"""In-process cache for models read from the database."""
+import copy
+import time
+
+from app.model import User, Team, Project
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, Optional, Tuple, Type, TypeVar, \
+    cast
+
+T = TypeVar('T', User, Team, Project)
+
+
+def model_key(obj: T) -> Tuple[Type[Any], str]:
+    """
+    Get the class and primary key of a model.
+
+    :param obj: a :class:`User`, :class:`Team` or :class:`Project`
+    :raise: TypeError if object is not a User, Team or Project
+    :return: tuple of the model's class and the model's primary key
+    """
+    if isinstance(obj, User):
+        return User, obj.slack_id
+    elif isinstance(obj, Team):
+        return Team, obj.github_team_id
+    elif isinstance(obj, Project):
+        return Project, obj.project_id
+    else:
+        raise TypeError('Type of object one of [User, Team, Project]')
+
+
+class ModelCache:
+    """
+    A least-recently-used cache of models, where entries expire after a TTL.
+
+    Entries are keyed by model class and primary key. Models are copied going
+    in and coming out of the cache, so callers are free to modify whatever
+    they get without affecting the cached version. All methods are
+    thread-safe.
+    """
+
+    def __init__(self,
+                 max_size: int,
+                 ttl: float,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        Initialize the cache.
+
+        :param max_size: maximum number of models to keep
+        :param ttl: number of seconds after which a model expires
+        :param clock: function returning the current time, in seconds
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.__clock = clock
+        self.__lock = Lock()
+        self.__entries: \
+            'OrderedDict[Tuple[Type[Any], str], Tuple[float, Any]]' = \
+            OrderedDict()
+
+    def __str__(self) -> str:
+        """Return a string representing this class."""
+        return "Model Cache"
+
+    def __len__(self) -> int:
+        """Return the number of models currently in the cache."""
+        return len(self.__entries)
+
+    def get(self, Model: Type[T], k: str) -> Optional[T]:
+        """
+        Get a copy of a cached model.
+
+        :param Model: class of the model to get
+        :param k: primary key of the model
+        :return: a copy of the model, or ``None`` if it isn't cached or has
+                 expired
+        """
+        with self.__lock:
+            entry = self.__entries.get((Model, k))
+            if entry is None or entry[0] <= self.__clock():
+                if entry is not None:
+                    del self.__entries[(Model, k)]
+                self.misses += 1
+                return None
+            self.__entries.move_to_end((Model, k))
+            self.hits += 1
+            return cast(T, copy.deepcopy(entry[1]))
+
+    def put(self, obj: T) -> None:
+        """
+        Add a copy of a model to the cache, replacing any previous version.
+
+        :param obj: the model to cache
+        """
+        key = model_key(obj)
+        entry = (self.__clock() + self.ttl, copy.deepcopy(obj))
+        with self.__lock:
+            self.__entries[key] = entry
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.max_size:
+                self.__entries.popitem(last=False)
+
+    def invalidate(self, Model: Type[T], k: str) -> None:
+        """
+        Remove a model from the cache, if it is there.
+
+        :param Model: class of the model to remove
+        :param k: primary key of the model
+        """
+        with self.__lock:
+            self.__entries.pop((Model, k), None)
+
+    def clear(self) -> None:
+        """Remove every model from the cache."""
+        with self.__lock:
+            self.__entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the cache's hit and miss counters.
+
+        :return: dictionary with the number of hits, misses, and models
+                 currently in the cache
+        """
+        with self.__lock:
+            return {'hits': self.hits,
+                    'misses': self.misses,
+                    'size': len(self.__entries)}
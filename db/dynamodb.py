@@ -1,16 +1,39 @@
 """DynamoDB."""
 import boto3
 import logging
+import os
+import random
+import time
 
-from boto3.dynamodb.conditions import Attr
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.config import Config as BotoConfig
+from concurrent.futures import ThreadPoolExecutor
 from functools import reduce
+from queue import Queue, Full
+from threading import Event, Lock
 from app.model import User, Team, Project
-from typing import Optional, Tuple, List, Type, TypeVar
+from db.exceptions import ConditionFailedError
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, \
+    Tuple, List, Set, Type, TypeVar, cast
 from config import Config
 
 T = TypeVar('T', User, Team, Project)
 
 
+def backoff_delay(attempt: int,
+                  base: float = 0.05,
+                  cap: float = 5.0) -> float:
+    """
+    Get how long to wait before retrying, using jittered exponential backoff.
+
+    :param attempt: number of attempts made so far, starting at 0
+    :param base: delay of the first attempt, in seconds
+    :param cap: maximum delay, in seconds
+    :return: random delay between 0 and the exponential delay, in seconds
+    """
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
 class DynamoDB:
     """
     Handles calls to database through API.
@@ -20,6 +43,21 @@ class DynamoDB:
     facade class.
     """
 
+    # Maximum number of items in a single batch write
+    BATCH_WRITE_SIZE = 25
+
+    # Maximum number of keys in a single batch read
+    BATCH_GET_SIZE = 100
+
+    # Maximum number of batch reads sent concurrently
+    BATCH_GET_WORKERS = 8
+
+    # Number of times unprocessed items of a batch request are retried
+    BATCH_RETRIES = 8
+
+    # Number of attempts botocore makes for throttled or failed requests
+    MAX_REQUEST_ATTEMPTS = 5
+
     class Const:
         """A bunch of static constants and functions."""
 
@@ -80,6 +118,54 @@ class DynamoDB:
             else:
                 raise TypeError('Table name does not correspond to anything')
 
+        def get_required_attrs(self, table_name: str) -> List[str]:
+            """
+            Get class attributes needed to create a model from an item.
+
+            These are always read, even if they aren't in a projection.
+
+            :param table_name: the table name
+            :raise: TypeError if table does not exist
+            :return: list of strings of required attributes
+            """
+            if table_name == self.users_table:
+                return ['slack_id']
+            elif table_name == self.teams_table:
+                return ['github_team_id', 'github_team_name']
+            elif table_name == self.projects_table:
+                return ['project_id', 'github_team_id', 'github_urls']
+            else:
+                raise TypeError('Table name does not correspond to anything')
+
+        def get_index_attrs(self, table_name: str) -> List[str]:
+            """
+            Get class attributes that have a global secondary index.
+
+            Queries matching on one of these attributes are served by the
+            index instead of scanning the whole table.
+
+            :param table_name: the table name
+            :raise: TypeError if table does not exist
+            :return: list of strings of indexed attributes
+            """
+            if table_name == self.users_table:
+                return ['github_user_id']
+            elif table_name == self.teams_table:
+                return ['github_team_name']
+            elif table_name == self.projects_table:
+                return []
+            else:
+                raise TypeError('Table name does not correspond to anything')
+
+        def get_index_name(self, attr: str) -> str:
+            """
+            Get the name of the global secondary index of an attribute.
+
+            :param attr: the indexed attribute
+            :return: name of the index
+            """
+            return f'{attr}-index'
+
     def __init__(self, config: Config) -> None:
         """Initialize facade using DynamoDB settings.
 
@@ -96,42 +182,94 @@ class DynamoDB:
         region_name:  The name of the region associated with the client.
         A list of different regions can be obtained online.
         endpoint_url: The complete URL to use for the constructed client.
+        config: Connection pool size and retry policy of the client.
+
+        Since creating a resource and checking the tables takes several
+        requests, this class should only be created once per process, and
+        shared by everything that needs it. The resource itself, and its
+        pool of connections, is created again the first time it is used in
+        a forked process (see :attr:`ddb`).
         """
         logging.info("Initializing DynamoDb")
         self.users_table = config.aws_users_tablename
         self.teams_table = config.aws_teams_tablename
         self.projects_table = config.aws_projects_tablename
+        self.scan_segments = max(1, int(config.aws_scan_segments))
         self.CONST = DynamoDB.Const(config)
 
+        # Enough connections for parallel scans and batch reads, on top of
+        # the requests made by the command and webhook threads
+        pool_size = max(int(config.aws_max_pool_connections),
+                        self.scan_segments + self.BATCH_GET_WORKERS)
+        boto_config = BotoConfig(
+            max_pool_connections=pool_size,
+            retries={'max_attempts': self.MAX_REQUEST_ATTEMPTS})
+
         if config.testing:
             logging.info("Connecting to local DynamoDb")
-            self.ddb = boto3.resource(service_name="dynamodb",
-                                      region_name="",
-                                      aws_access_key_id="",
-                                      aws_secret_access_key="",
-                                      endpoint_url="http://localhost:8000")
+            self.__resource_args: Dict[str, Any] = {
+                'service_name': "dynamodb",
+                'region_name': "",
+                'aws_access_key_id': "",
+                'aws_secret_access_key': "",
+                'endpoint_url': "http://localhost:8000",
+                'config': boto_config
+            }
         else:
             logging.info("Connecting to remote DynamoDb")
-            region_name = config.aws_region
-            access_key_id = config.aws_access_keyid
-            secret_access_key = config.aws_secret_key
-            self.ddb = boto3.resource(service_name='dynamodb',
-                                      region_name=region_name,
-                                      aws_access_key_id=access_key_id,
-                                      aws_secret_access_key=secret_access_key)
-
-        # Check for missing tables
-        if not self.check_valid_table(self.users_table):
-            self.__create_table(self.users_table)
-        if not self.check_valid_table(self.teams_table):
-            self.__create_table(self.teams_table)
-        if not self.check_valid_table(self.projects_table):
-            self.__create_table(self.projects_table)
+            self.__resource_args = {
+                'service_name': 'dynamodb',
+                'region_name': config.aws_region,
+                'aws_access_key_id': config.aws_access_keyid,
+                'aws_secret_access_key': config.aws_secret_key,
+                'config': boto_config
+            }
+        self.__resource_lock = Lock()
+        self.__resource_pid: Optional[int] = None
+        self.__resource: Any = None
+
+        # Indexed attributes of each table that can currently be queried
+        self.active_indexes: Dict[str, Set[str]] = {}
+
+        table_names = [self.users_table,
+                       self.teams_table,
+                       self.projects_table]
+        if config.aws_skip_table_check:
+            logging.info("Skipping check for missing tables and indexes")
+            for table_name in table_names:
+                self.active_indexes[table_name] = \
+                    set(self.CONST.get_index_attrs(table_name))
+            return
+
+        # Check for missing tables and indexes
+        for table_name in table_names:
+            description = self.__describe_table(table_name)
+            if description is None:
+                self.__create_table(table_name)
+            else:
+                self.__create_missing_indexes(table_name, description)
 
     def __str__(self) -> str:
         """Return a string representing this class."""
         return "DynamoDB"
 
+    @property
+    def ddb(self) -> Any:
+        """
+        Get this process' DynamoDB resource, creating it if needed.
+
+        A resource's pool of connections must not be shared across
+        ``fork()`` (e.g. by gunicorn workers forked from a preloaded app), so
+        every process creates its own the first time it is used.
+        """
+        pid = os.getpid()
+        if self.__resource_pid != pid:
+            with self.__resource_lock:
+                if self.__resource_pid != pid:
+                    self.__resource = boto3.resource(**self.__resource_args)
+                    self.__resource_pid = pid
+        return self.__resource
+
     def __create_table(self, table_name: str, key_type: str = 'S') -> None:
         """
         Create a table.
@@ -145,13 +283,18 @@ class DynamoDB:
         """
         logging.info(f"Creating table '{table_name}'")
         primary_key = self.CONST.get_key(table_name)
+        index_attrs = self.CONST.get_index_attrs(table_name)
+        table_args: Dict[str, Any] = {}
+        if index_attrs:
+            table_args['GlobalSecondaryIndexes'] = \
+                [self.__index_definition(attr) for attr in index_attrs]
         self.ddb.create_table(
             TableName=table_name,
             AttributeDefinitions=[
                 {
-                    'AttributeName': primary_key,
+                    'AttributeName': attr,
                     'AttributeType': key_type
-                },
+                } for attr in [primary_key] + index_attrs
             ],
             KeySchema=[
                 {
@@ -159,11 +302,127 @@ class DynamoDB:
                     'KeyType': 'HASH'
                 },
             ],
+            ProvisionedThroughput={
+                'ReadCapacityUnits': 1,
+                'WriteCapacityUnits': 1
+            },
+            **table_args
+        )
+        self.active_indexes[table_name] = set(index_attrs)
+
+    def __create_missing_indexes(self,
+                                 table_name: str,
+                                 description: Dict[str, Any]) -> None:
+        """
+        Create the global secondary indexes missing from an existing table.
+
+        Tables created before an index was declared are migrated here. Only
+        one index can be added per table update, and new indexes take a while
+        to backfill, so indexes that aren't active yet are not used by
+        :meth:`query` until they are seen active on a later start.
+
+        **Note**: This function should **not** be called externally, and should
+        only be called on initialization.
+
+        :param table_name: name of the table to migrate
+        :param description: description of the table, as returned by
+                            ``describe_table``
+        """
+        table = self.ddb.Table(table_name)
+        existing = {index['IndexName']: index['IndexStatus']
+                    for index in
+                    description.get('GlobalSecondaryIndexes', [])}
+        self.active_indexes[table_name] = set()
+        for attr in self.CONST.get_index_attrs(table_name):
+            index_name = self.CONST.get_index_name(attr)
+            if existing.get(index_name) == 'ACTIVE':
+                self.active_indexes[table_name].add(attr)
+            elif index_name not in existing and \
+                    all(status == 'ACTIVE' for status in existing.values()):
+                logging.info(f"Creating index '{index_name}' "
+                             f"on table '{table_name}'")
+                table.update(
+                    AttributeDefinitions=[
+                        {
+                            'AttributeName': attr,
+                            'AttributeType': 'S'
+                        },
+                    ],
+                    GlobalSecondaryIndexUpdates=[
+                        {'Create': self.__index_definition(attr)}
+                    ]
+                )
+                existing[index_name] = 'CREATING'
+
+    def __index_definition(self, attr: str) -> Dict[str, Any]:
+        """
+        Get the definition of the global secondary index of an attribute.
+
+        :param attr: the attribute to index
+        :return: index definition, as expected by ``create_table``
+        """
+        return {
+            'IndexName': self.CONST.get_index_name(attr),
+            'KeySchema': [
+                {
+                    'AttributeName': attr,
+                    'KeyType': 'HASH'
+                },
+            ],
+            'Projection': {
+                'ProjectionType': 'ALL'
+            },
+            'ProvisionedThroughput': {
+                'ReadCapacityUnits': 1,
+                'WriteCapacityUnits': 1
+            }
+        }
+
+    def expiring_table(self, table_name: str, key: str) -> Any:
+        """
+        Get a table whose items are deleted once their ``expires`` time passes.
+
+        The table is created if it doesn't exist, with a string primary key,
+        and DynamoDB's time to live enabled on the ``expires`` attribute.
+        DynamoDB deletes expired items lazily, so readers should still check
+        ``expires`` themselves.
+
+        :param table_name: name of the table
+        :param key: name of the table's primary key
+        :return: the table
+        """
+        table = self.ddb.Table(table_name)
+        if self.__describe_table(table_name) is not None:
+            return table
+
+        logging.info(f"Creating table '{table_name}'")
+        self.ddb.create_table(
+            TableName=table_name,
+            AttributeDefinitions=[
+                {
+                    'AttributeName': key,
+                    'AttributeType': 'S'
+                },
+            ],
+            KeySchema=[
+                {
+                    'AttributeName': key,
+                    'KeyType': 'HASH'
+                },
+            ],
             ProvisionedThroughput={
                 'ReadCapacityUnits': 1,
                 'WriteCapacityUnits': 1
             }
         )
+        table.wait_until_exists()
+        self.ddb.meta.client.update_time_to_live(
+            TableName=table_name,
+            TimeToLiveSpecification={
+                'Enabled': True,
+                'AttributeName': 'expires'
+            })
+        return table
 
     def check_valid_table(self, table_name: str) -> bool:
         """
@@ -172,20 +431,112 @@ class DynamoDB:
         :param table_name: table identifier
         :return: boolean value, true if table exists, false otherwise
         """
-        existing_tables = self.ddb.tables.all()
-        return any(map(lambda t: bool(t.name == table_name),
-                       existing_tables))
+        return self.__describe_table(table_name) is not None
+
+    def __describe_table(self, table_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Describe the table with ``table_name``.
 
-    def store(self, obj: T) -> bool:
+        :param table_name: table identifier
+        :return: description of the table, or ``None`` if it doesn't exist
+        """
+        client = self.ddb.meta.client
+        try:
+            resp = client.describe_table(TableName=table_name)
+            return cast(Dict[str, Any], resp['Table'])
+        except client.exceptions.ResourceNotFoundException:
+            return None
+
+    def store(self,
+              obj: T,
+              if_exists: bool = False,
+              if_not_exists: bool = False) -> bool:
         """
         Store object into the correct table.
 
         Object can be of type :class:`model.user.User`,
         :class:`model.team.Team`, or :class:`model.project.Project`.
 
+        The object can be stored only if an object with the same key already
+        exists (e.g. to avoid recreating an object that was just deleted), or
+        only if none does (e.g. to avoid overwriting an object). DynamoDB
+        checks the condition and writes the object atomically, in a single
+        request.
+
         :param obj: Object to store in database
+        :param if_exists: only store the object if it replaces another
+        :param if_not_exists: only store the object if it doesn't replace
+                              another
+        :raise: ConditionFailedError if the condition isn't met
         :return: True if object was stored, and false otherwise
         """
+        Model = self.__get_model(obj)
+
+        # Check if object is valid
+        if Model.is_valid(obj):  # type: ignore
+            table_name = self.CONST.get_table_name(Model)
+            table = self.ddb.Table(table_name)
+            d = Model.to_dict(obj)  # type: ignore
+            key = self.CONST.get_key(table_name)
+
+            logging.info(f"Storing obj {obj} in table {table_name}")
+            client = self.ddb.meta.client
+            try:
+                table.put_item(Item=d, **self.__existence_condition(
+                    key, if_exists, if_not_exists))
+            except client.exceptions.ConditionalCheckFailedException:
+                err_msg = f'{Model.__name__}(id={d[key]}) ' + \
+                    ('not found' if if_exists else 'already exists')
+                logging.info(err_msg)
+                raise ConditionFailedError(err_msg)
+            return True
+        return False
+
+    def bulk_store(self, objs: Iterable[T]) -> int:
+        """
+        Store many objects into their correct tables.
+
+        Objects are written in batches of up to 25 items per request. Invalid
+        objects are skipped. If the same object (same primary key) appears
+        more than once, the last one is the one stored.
+
+        :param objs: Objects to store in database
+        :raise: RuntimeError if some items still could not be written after
+                retrying
+        :return: number of (valid) objects stored
+        """
+        batches: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        num_stored = 0
+        for obj in objs:
+            Model = self.__get_model(obj)
+            if not Model.is_valid(obj):  # type: ignore
+                logging.warning(f"Not storing invalid obj {obj}")
+                continue
+
+            table_name = self.CONST.get_table_name(Model)
+            d = Model.to_dict(obj)  # type: ignore
+            batch = batches.setdefault(table_name, {})
+            batch[d[self.CONST.get_key(table_name)]] = \
+                {'PutRequest': {'Item': d}}
+            num_stored += 1
+            if len(batch) == self.BATCH_WRITE_SIZE:
+                self.__batch_write(table_name, list(batch.values()))
+                batch.clear()
+
+        for table_name, batch in batches.items():
+            if batch:
+                self.__batch_write(table_name, list(batch.values()))
+        logging.info(f"Stored {num_stored} obj(s)")
+        return num_stored
+
+    def __get_model(self, obj: T) -> Type[T]:
+        """
+        Get the class of an object that can be stored.
+
+        :param obj: Object to get the class of
+        :raise: RuntimeError if object is not a User, Team, or Project
+        :return: either ``User``, ``Team``, or ``Project``
+        """
         Model: Optional[Type[T]] = None
         if isinstance(obj, User):
             Model = User
@@ -196,26 +547,49 @@ class DynamoDB:
         else:
             logging.error(f"Cannot store object {str(obj)}")
             raise RuntimeError(f'Cannot store object{str(obj)}')
+        return cast(Type[T], Model)
 
-        # Check if object is valid
-        if Model.is_valid(obj):  # type: ignore
-            table_name = self.CONST.get_table_name(Model)
-            table = self.ddb.Table(table_name)
-            d = Model.to_dict(obj)  # type: ignore
+    def __batch_write(self,
+                      table_name: str,
+                      requests: List[Dict[str, Any]]) -> None:
+        """
+        Write a batch of put or delete requests to a table.
 
-            logging.info(f"Storing obj {obj} in table {table_name}")
-            table.put_item(Item=d)
-            return True
-        return False
+        Requests left unprocessed by DynamoDB (usually due to throttling) are
+        retried with jittered exponential backoff.
+
+        :param table_name: name of the table to write to
+        :param requests: up to 25 ``PutRequest`` or ``DeleteRequest`` dicts
+        :raise: RuntimeError if some requests are still unprocessed after
+                ``BATCH_RETRIES`` retries
+        """
+        request_items = {table_name: requests}
+        for attempt in range(self.BATCH_RETRIES + 1):
+            if attempt > 0:
+                time.sleep(backoff_delay(attempt - 1))
+            resp = self.ddb.batch_write_item(RequestItems=request_items)
+            request_items = resp.get('UnprocessedItems') or {}
+            if not request_items:
+                return
+            logging.warning(f"Retrying {len(request_items[table_name])} "
+                            f"unprocessed write(s) to table {table_name}")
+
+        err_msg = f'{len(request_items[table_name])} write(s) to table ' \
+            f'{table_name} could not be processed'
+        logging.error(err_msg)
+        raise RuntimeError(err_msg)
 
     def retrieve(self,
                  Model: Type[T],
-                 k: str) -> T:
+                 k: str,
+                 fields: Optional[List[str]] = None) -> T:
         """
         Retrieve a model from the database.
 
         :param Model: the actual class you want to retrieve
         :param k: retrieve based on this key (or ID)
+        :param fields: if given, only these attributes are read (see
+                       :meth:`query`)
         :raise: LookupError if key is not found
         :return: a model ``Model`` if key is found
         """
@@ -225,7 +599,8 @@ class DynamoDB:
             TableName=table_name,
             Key={
                 self.CONST.get_key(table_name): k
-            }
+            },
+            **self.__projection(table_name, fields)
         )
 
         if 'Item' in resp.keys():
@@ -235,34 +610,96 @@ class DynamoDB:
             logging.info(err_msg)
             raise LookupError(err_msg)
 
-    def bulk_retrieve(self, Model: Type[T], ks: List[str]) -> List[T]:
+    def bulk_retrieve(self,
+                      Model: Type[T],
+                      ks: List[str],
+                      ordered: bool = False,
+                      fields: Optional[List[str]] = None) -> List[T]:
         """
         Retrieve a list of models from the database.
 
-        Keys not found in the database will be skipped.
+        Keys not found in the database will be skipped. Duplicate keys are
+        only retrieved once. Keys are fetched in chunks of 100 (the most
+        DynamoDB allows per request), with chunks fetched concurrently.
 
         :param Model: the actual class you want to retrieve
         :param ks: retrieve based on this key (or ID)
+        :param ordered: if true, models are returned in the same order as
+                        their keys in ``ks``; otherwise, in no
+                        particular order
+        :param fields: if given, only these attributes are read (see
+                       :meth:`query`)
+        :raise: RuntimeError if some keys still could not be read after
+                retrying
         :return: a list of models ``Model``
         """
         table_name = self.CONST.get_table_name(Model)
-        resp = self.ddb.batch_get_item(
-            RequestItems={
-                table_name: {
-                    'Keys': [{self.CONST.get_key(table_name): k} for k in ks]
-                }
-            }
-        )
+        key = self.CONST.get_key(table_name)
+        unique_ks = list(dict.fromkeys(ks))
+        projection = self.__projection(table_name, fields)
+        chunks = [[{key: k} for k in unique_ks[i:i + self.BATCH_GET_SIZE]]
+                  for i in range(0, len(unique_ks), self.BATCH_GET_SIZE)]
+
+        items: List[Dict[str, Any]] = []
+        if len(chunks) == 1:
+            items = self.__batch_get(table_name, chunks[0], projection)
+        elif len(chunks) > 1:
+            workers = min(len(chunks), self.BATCH_GET_WORKERS)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for chunk_items in executor.map(
+                        lambda chunk: self.__batch_get(table_name, chunk,
+                                                       projection),
+                        chunks):
+                    items.extend(chunk_items)
+
+        models = list(map(Model.from_dict, items))
+        if ordered:
+            positions = {k: i for i, k in enumerate(unique_ks)}
+            items_models = sorted(zip(items, models),
+                                  key=lambda x: positions[x[0][key]])
+            models = [model for _, model in items_models]
+        return models
+
+    def __batch_get(self,
+                    table_name: str,
+                    keys: List[Dict[str, Any]],
+                    projection: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Read a batch of items from a table.
+
+        Keys left unprocessed by DynamoDB (usually due to throttling) are
+        retried with jittered exponential backoff.
 
-        if 'Responses' not in resp:
-            return []
+        :param table_name: name of the table to read from
+        :param keys: up to 100 unique primary keys of items to read
+        :param projection: projection arguments, from :meth:`__projection`
+        :raise: RuntimeError if some keys are still unprocessed after
+                ``BATCH_RETRIES`` retries
+        :return: list of the raw items found
+        """
+        items: List[Dict[str, Any]] = []
+        request_items = {table_name: {'Keys': keys, **projection}}
+        for attempt in range(self.BATCH_RETRIES + 1):
+            if attempt > 0:
+                time.sleep(backoff_delay(attempt - 1))
+            resp = self.ddb.batch_get_item(RequestItems=request_items)
+            items.extend(resp.get('Responses', {}).get(table_name, []))
+            request_items = resp.get('UnprocessedKeys') or {}
+            if not request_items:
+                return items
+            logging.warning(f"Retrying "
+                            f"{len(request_items[table_name]['Keys'])} "
+                            f"unprocessed read(s) from table {table_name}")
 
-        resp_models = resp['Responses'].get(table_name, [])
-        return list(map(Model.from_dict, resp_models))
+        err_msg = f"{len(request_items[table_name]['Keys'])} read(s) from " \
+            f"table {table_name} could not be processed"
+        logging.error(err_msg)
+        raise RuntimeError(err_msg)
 
     def query(self,
               Model: Type[T],
-              params: List[Tuple[str, str]] = []) -> List[T]:
+              params: List[Tuple[str, str]] = [],
+              fields: Optional[List[str]] = None) -> List[T]:
         """
         Query a table using a list of parameters.
 
@@ -289,30 +726,53 @@ class DynamoDB:
             teams = ddb.query(Team, [('members', 'abc123'),
                                      ('members', '231abc')])
 
+        If one of the parameters is on an attribute with a global secondary
+        index (see :meth:`DynamoDB.Const.get_index_attrs`), the index is
+        queried instead of scanning the whole table.
+
+        If ``fields`` is given, only those attributes (and the ones needed to
+        create a model, see :meth:`DynamoDB.Const.get_required_attrs`) are
+        read, and the other attributes of the models are left empty. Use this
+        to avoid reading large attributes that aren't needed.::
+
+            teams = ddb.query(Team, fields=['display_name'])
+
         :param Model: type of list elements you'd want
         :param params: list of tuples to match
+        :param fields: if given, only these attributes are read
         :return: a list of ``Model`` that fit the query parameters
         """
-        table_name = self.CONST.get_table_name(Model)
-        table = self.ddb.Table(table_name)
-        set_attrs = self.CONST.get_set_attrs(table_name)
-        if len(params) > 0:
-            def f(x):
-                if x[0] in set_attrs:
-                    return Attr(x[0]).contains(x[1])
-                else:
-                    return Attr(x[0]).eq(x[1])
+        return list(self.query_iter(Model, params, fields))
 
-            filter_expr = reduce(lambda a, x: a & x, map(f, params))
-            resp = table.scan(FilterExpression=filter_expr)
-        else:
-            resp = table.scan()
+    def query_iter(self,
+                   Model: Type[T],
+                   params: List[Tuple[str, str]] = [],
+                   fields: Optional[List[str]] = None) -> Iterator[T]:
+        """
+        Lazily query a table using a list of parameters.
 
-        return list(map(Model.from_dict, resp['Items']))
+        Works exactly like :meth:`query`, except that models are yielded one
+        page at a time as the scan progresses, so the whole table is never
+        held in memory at once.
+
+        :param Model: type of list elements you'd want
+        :param params: list of tuples to match
+        :param fields: if given, only these attributes are read
+        :return: an iterator of ``Model`` that fit the query parameters
+        """
+        table_name = self.CONST.get_table_name(Model)
+        indexed = self.active_indexes.get(table_name, set())
+        for i, (attr, value) in enumerate(params):
+            if attr in indexed:
+                rest = params[:i] + params[i + 1:]
+                return self.__index_query_models(Model, attr, value, rest,
+                                                 fields)
+        return self.__scan_models(Model, params, lambda a, x: a & x, fields)
 
     def query_or(self,
                  Model: Type[T],
-                 params: List[Tuple[str, str]] = []) -> List[T]:
+                 params: List[Tuple[str, str]] = [],
+                 fields: Optional[List[str]] = None) -> List[T]:
         """
         Query a table using a list of parameters.
 
@@ -345,39 +805,376 @@ class DynamoDB:
 
         :param Model: type of list elements you'd want
         :param params: list of tuples to match
+        :param fields: if given, only these attributes are read (see
+                       :meth:`query`)
         :return: a list of ``Model`` that fit the query parameters
         """
+        return list(self.__scan_models(Model, params, lambda a, x: a | x,
+                                       fields))
+
+    def __index_query_models(self,
+                             Model: Type[T],
+                             attr: str,
+                             value: str,
+                             params: List[Tuple[str, str]],
+                             fields: Optional[List[str]]) -> Iterator[T]:
+        """
+        Query a global secondary index, yielding the matching models.
+
+        :param Model: type of models to yield
+        :param attr: indexed attribute to match
+        :param value: value the indexed attribute must be equal to
+        :param params: list of tuples the models must also match
+        :param fields: if given, only these attributes are read
+        :return: an iterator of ``Model`` that fit the query parameters
+        """
         table_name = self.CONST.get_table_name(Model)
         table = self.ddb.Table(table_name)
+        query_args: Dict[str, Any] = {
+            'IndexName': self.CONST.get_index_name(attr),
+            'KeyConditionExpression': Key(attr).eq(str(value)),
+            **self.__projection(table_name, fields)
+        }
+        if len(params) > 0:
+            query_args['FilterExpression'] = \
+                self.__filter_expr(table_name, params, lambda a, x: a & x)
+
+        for page in self.__paginate(table.query, **query_args):
+            yield from map(Model.from_dict, page)
+
+    def __filter_expr(self,
+                      table_name: str,
+                      params: List[Tuple[str, str]],
+                      combine: Callable[[Any, Any], Any]) -> Any:
+        """
+        Build a filter expression out of a list of parameters.
+
+        :param table_name: name of the table the filter applies to
+        :param params: non-empty list of tuples to match
+        :param combine: function joining two conditions into one
+        :return: the filter expression
+        """
         set_attrs = self.CONST.get_set_attrs(table_name)
+
+        def f(x):
+            if x[0] in set_attrs:
+                return Attr(x[0]).contains(x[1])
+            else:
+                return Attr(x[0]).eq(x[1])
+
+        return reduce(combine, map(f, params))
+
+    def __projection(self,
+                     table_name: str,
+                     fields: Optional[List[str]]) -> Dict[str, Any]:
+        """
+        Build the arguments that make a read only return some attributes.
+
+        Attribute names are passed as placeholders, since many of them
+        (e.g. ``name``) are reserved words in DynamoDB expressions.
+
+        :param table_name: name of the table to read from
+        :param fields: attributes to read, or ``None`` to read all of them
+        :return: ``ProjectionExpression`` and ``ExpressionAttributeNames``
+                 arguments, or no arguments if ``fields`` is ``None``
+        """
+        if fields is None:
+            return {}
+        attrs = list(dict.fromkeys(
+            self.CONST.get_required_attrs(table_name) + list(fields)))
+        names = {f'#p{i}': attr for i, attr in enumerate(attrs)}
+        return {
+            'ProjectionExpression': ', '.join(names),
+            'ExpressionAttributeNames': names
+        }
+
+    def __scan_models(self,
+                      Model: Type[T],
+                      params: List[Tuple[str, str]],
+                      combine: Callable[[Any, Any], Any],
+                      fields: Optional[List[str]]) -> Iterator[T]:
+        """
+        Scan a table, yielding the models matching the parameters.
+
+        :param Model: type of models to yield
+        :param params: list of tuples to match
+        :param combine: function joining two conditions into one
+        :param fields: if given, only these attributes are read
+        :return: an iterator of ``Model`` that fit the query parameters
+        """
+        table_name = self.CONST.get_table_name(Model)
+        scan_args = self.__projection(table_name, fields)
         if len(params) > 0:
-            def f(x):
-                if x[0] in set_attrs:
-                    return Attr(x[0]).contains(x[1])
+            scan_args['FilterExpression'] = \
+                self.__filter_expr(table_name, params, combine)
+
+        for page in self.__scan_pages(table_name, **scan_args):
+            yield from map(Model.from_dict, page)
+
+    def __scan_pages(self,
+                     table_name: str,
+                     **scan_args: Any) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Scan an entire table, yielding one page of items at a time.
+
+        If ``self.scan_segments`` is greater than 1, the table is split into
+        that many segments, which are scanned in parallel. Pages are then
+        yielded in whichever order they arrive in.
+
+        :param table_name: name of the table to scan
+        :param scan_args: extra arguments passed to every ``scan`` call
+        :return: an iterator of pages, each a list of raw items
+        """
+        table = self.ddb.Table(table_name)
+        if self.scan_segments == 1:
+            yield from self.__paginate(table.scan, **scan_args)
+            return
+
+        total = self.scan_segments
+        pages: Queue = Queue(maxsize=2 * total)
+        stopped = Event()
+
+        def put(item: Any) -> None:
+            """Put ``item`` into ``pages`` unless the consumer has left."""
+            while not stopped.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return
+                except Full:
+                    continue
+
+        def scan_segment(segment: int) -> None:
+            """Scan a single segment of the table into ``pages``."""
+            try:
+                for page in self.__paginate(table.scan,
+                                            Segment=segment,
+                                            TotalSegments=total,
+                                            **scan_args):
+                    put(page)
+                    if stopped.is_set():
+                        return
+                put(None)
+            except Exception as e:
+                put(e)
+
+        executor = ThreadPoolExecutor(max_workers=total)
+        try:
+            for segment in range(total):
+                executor.submit(scan_segment, segment)
+            remaining = total
+            while remaining > 0:
+                page = pages.get()
+                if page is None:
+                    remaining -= 1
+                elif isinstance(page, Exception):
+                    raise page
                 else:
-                    return Attr(x[0]).eq(x[1])
+                    yield page
+        finally:
+            stopped.set()
+            executor.shutdown(wait=True)
 
-            filter_expr = reduce(lambda a, x: a | x, map(f, params))
-            resp = table.scan(FilterExpression=filter_expr)
-        else:
-            resp = table.scan()
+    def __paginate(self,
+                   op: Callable[..., Dict[str, Any]],
+                   **kwargs: Any) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Call a paginated operation until every page has been read.
+
+        :param op: operation to call (e.g. ``table.scan``)
+        :param kwargs: arguments to call the operation with
+        :return: an iterator of pages, each a list of raw items
+        """
+        while True:
+            resp = op(**kwargs)
+            yield resp.get('Items', [])
+            last_key = resp.get('LastEvaluatedKey')
+            if last_key is None:
+                return
+            kwargs['ExclusiveStartKey'] = last_key
+
+    def update(self,
+               Model: Type[T],
+               k: str,
+               add: Optional[Dict[str, Any]] = None,
+               remove: Optional[Dict[str, Set[str]]] = None,
+               set_values: Optional[Dict[str, Any]] = None,
+               condition: Optional[Dict[str, Any]] = None) -> T:
+        """
+        Change some attributes of an object, without rewriting the rest.
 
-        return list(map(Model.from_dict, resp['Items']))
+        The changes are compiled into a single ``UpdateItem`` request, and
+        DynamoDB applies them atomically, so unlike :meth:`store`,
+        concurrent updates to the same object don't overwrite each other.
+        DynamoDB can't remove elements from an attribute that is also added
+        to or set in the same request, so in that case the elements are
+        removed with a second request.
+
+        :param Model: table type of the object
+        :param k: ID or key of the object (must be primary key)
+        :param add: numbers to add to each numeric attribute, or elements to
+                    add to each set attribute
+        :param remove: elements to remove from each set attribute
+        :param set_values: values to set attributes to; attributes set to an
+                           empty value are removed
+        :param condition: values that attributes must have for the update
+                          to happen
+        :raise: LookupError if key is not found
+        :raise: ConditionFailedError if key is not found, or the condition
+                isn't met
+        :return: the updated model
+        """
+        logging.info(f"Updating {Model.__name__}(id={k})")
+        table_name = self.CONST.get_table_name(Model)
+        key = self.CONST.get_key(table_name)
+        table = self.ddb.Table(table_name)
+        clauses: Dict[str, Dict[str, Any]] = {
+            'SET': {}, 'REMOVE': {}, 'ADD': {}, 'DELETE': {}}
+        for attr, v in (set_values or {}).items():
+            clauses['SET' if v else 'REMOVE'][attr] = v
+        clauses['ADD'] = {attr: v for attr, v in (add or {}).items() if v}
+        clauses['DELETE'] = \
+            {attr: v for attr, v in (remove or {}).items() if v}
+
+        requests = [clauses]
+        if clauses['DELETE'].keys() & \
+                (clauses['SET'].keys() | clauses['ADD'].keys()):
+            requests = [dict(clauses, DELETE={}),
+                        {'DELETE': clauses['DELETE']}]
+
+        updated = None
+        for i, request in enumerate(requests):
+            names = {'#k': key}
+            values: Dict[str, Any] = {}
+            update_exprs = []
+            for op, attrs in request.items():
+                parts = []
+                for attr, v in attrs.items():
+                    n = len(names)
+                    names[f'#s{n}'] = attr
+                    if op == 'REMOVE':
+                        parts.append(f'#s{n}')
+                        continue
+                    values[f':s{n}'] = v
+                    sep = ' = ' if op == 'SET' else ' '
+                    parts.append(f'#s{n}{sep}:s{n}')
+                if parts:
+                    update_exprs.append(f"{op} {', '.join(parts)}")
+            if not update_exprs:
+                continue
+
+            cond_exprs = ['attribute_exists(#k)']
+            if i == 0:
+                for attr, v in (condition or {}).items():
+                    n = len(names)
+                    names[f'#c{n}'] = attr
+                    values[f':c{n}'] = v
+                    cond_exprs.append(f'#c{n} = :c{n}')
+            update_args: Dict[str, Any] = {}
+            if values:
+                update_args['ExpressionAttributeValues'] = values
+
+            client = self.ddb.meta.client
+            try:
+                resp = table.update_item(
+                    Key={key: k},
+                    UpdateExpression=' '.join(update_exprs),
+                    ConditionExpression=' AND '.join(cond_exprs),
+                    ExpressionAttributeNames=names,
+                    ReturnValues='ALL_NEW',
+                    **update_args)
+            except client.exceptions.ConditionalCheckFailedException:
+                err_msg = f'{Model.__name__}(id={k}) not found'
+                if condition and i == 0:
+                    err_msg += ' or condition not met'
+                    logging.info(err_msg)
+                    raise ConditionFailedError(err_msg)
+                logging.info(err_msg)
+                raise LookupError(err_msg)
+            updated = Model.from_dict(resp['Attributes'])
+
+        if updated is None:
+            return self.retrieve(Model, k)
+        return updated
 
     def delete(self,
                Model: Type[T],
-               k: str) -> None:
+               k: str,
+               if_exists: bool = False) -> None:
         """
         Remove an object from a table.
 
         :param Model: table type to remove the object from
         :param k: ID or key of the object to remove (must be primary key)
+        :param if_exists: raise an error if there is no object to remove,
+                          instead of doing nothing
+        :raise: ConditionFailedError if ``if_exists`` is set and key is not
+                found
         """
         logging.info(f"Deleting {Model.__name__}(id={k})")
         table_name = self.CONST.get_table_name(Model)
         table = self.ddb.Table(table_name)
-        table.delete_item(
-            Key={
-                self.CONST.get_key(table_name): k
-            }
-        )
+        key = self.CONST.get_key(table_name)
+        client = self.ddb.meta.client
+        try:
+            table.delete_item(
+                Key={
+                    key: k
+                },
+                **self.__existence_condition(key, if_exists, False)
+            )
+        except client.exceptions.ConditionalCheckFailedException:
+            err_msg = f'{Model.__name__}(id={k}) not found'
+            logging.info(err_msg)
+            raise ConditionFailedError(err_msg)
+
+    def __existence_condition(self,
+                              key: str,
+                              if_exists: bool,
+                              if_not_exists: bool) -> Dict[str, Any]:
+        """
+        Build the arguments that make a write depend on an item existing.
+
+        :param key: name of the table's primary key
+        :param if_exists: require the item to exist
+        :param if_not_exists: require the item not to exist
+        :raise: ValueError if both conditions are given
+        :return: ``ConditionExpression`` and ``ExpressionAttributeNames``
+                 arguments, or no arguments if no condition is given
+        """
+        if if_exists and if_not_exists:
+            raise ValueError('Cannot require an object to both exist and '
+                             'not exist')
+        if if_exists:
+            expr = 'attribute_exists(#k)'
+        elif if_not_exists:
+            expr = 'attribute_not_exists(#k)'
+        else:
+            return {}
+        return {
+            'ConditionExpression': expr,
+            'ExpressionAttributeNames': {'#k': key}
+        }
+
+    def bulk_delete(self,
+                    Model: Type[T],
+                    ks: List[str]) -> None:
+        """
+        Remove many objects from a table.
+
+        Objects are deleted in batches of up to 25 keys per request. Keys not
+        found in the database are ignored.
+
+        :param Model: table type to remove the objects from
+        :param ks: IDs or keys of the objects to remove (must be primary keys)
+        :raise: RuntimeError if some items still could not be deleted after
+                retrying
+        """
+        logging.info(f"Deleting {len(ks)} {Model.__name__}(s)")
+        table_name = self.CONST.get_table_name(Model)
+        key = self.CONST.get_key(table_name)
+        unique_ks = list(dict.fromkeys(ks))
+        for i in range(0, len(unique_ks), self.BATCH_WRITE_SIZE):
+            self.__batch_write(table_name, [
+                {'DeleteRequest': {'Key': {key: k}}}
+                for k in unique_ks[i:i + self.BATCH_WRITE_SIZE]
+            ])
@@ -0,0 +1,13 @@
+"""Exceptions from interacting with the database."""
+
+
+class ConditionFailedError(LookupError):
+    """
+    Exception raised when a conditional write finds its condition unmet.
+
+    Since the object not existing also fails the condition, this is a
+    subclass of :class:`LookupError`, which is raised when an object isn't
+    found.
+    """
+
+    pass
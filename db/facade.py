@@ -2,8 +2,11 @@
 from app.model.user import User
 from app.model.team import Team
 from app.model.project import Project
-from typing import List, Tuple, TypeVar, Type
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, \
+    Tuple, TypeVar, Type, Union
+from db.cache import ModelCache, model_key
 from db.dynamodb import DynamoDB
+from db.sqlite import SQLiteDB
 import logging
 
 
@@ -14,70 +17,188 @@ class DBFacade:
     """
     A database facade that gives an overall API for any databases.
 
-    Currently, we plan on having DynamoDB, but other databases, such as MongoDB
-    or Postgres are also being considered. Please use this class instead of
-    ``db/dynamodb.py``, because we might change the databases, but the facade
-    would stay the same.
+    Currently, we support DynamoDB and SQLite, but other databases, such as
+    MongoDB or Postgres are also being considered. Please use this class
+    instead of ``db/dynamodb.py`` or ``db/sqlite.py``, because we might change
+    the databases, but the facade would stay the same.
     """
 
-    def __init__(self, db: DynamoDB) -> None:
+    def __init__(self,
+                 db: Union[DynamoDB, SQLiteDB],
+                 cache: Optional[ModelCache] = None) -> None:
         """
         Initialize facade using a given class.
 
-        Currently, we can only initialize with :class:`db.dynamodb.DynamoDB`.
+        Currently, we can initialize with :class:`db.dynamodb.DynamoDB` or
+        :class:`db.sqlite.SQLiteDB`.
+
+        If a cache is given, :meth:`retrieve` and :meth:`bulk_retrieve` are
+        served from it when asked to (with ``cached=True``), and every read
+        and write keeps it up to date.
 
         :param db: Database class for API calls
+        :param cache: Optional cache of retrieved models
         """
         logging.info("Initializing database facade")
         self.ddb = db
+        self.cache = cache
 
     def __str__(self) -> str:
         """Return a string representing this class."""
         return "Database Facade"
 
-    def store(self, obj: T) -> bool:
+    def store(self,
+              obj: T,
+              if_exists: bool = False,
+              if_not_exists: bool = False) -> bool:
         """
         Store object into the correct table.
 
         Object can be of type :class:`model.user.User`,
         :class:`model.team.Team`, or :class:`model.project.Project`.
 
+        Instead of retrieving an object only to check whether it exists
+        before storing another, make the store conditional; the database
+        checks the condition as it writes, so concurrent writers can't get
+        in between. For example, to add a user without overwriting one::
+
+            try:
+                facade.store(User(slack_id), if_not_exists=True)
+            except ConditionFailedError:
+                # The user already exists
+                ...
+
         :param obj: Object to store in database
+        :param if_exists: only store the object if it replaces another
+        :param if_not_exists: only store the object if it doesn't replace
+                              another
+        :raise: ConditionFailedError if the condition isn't met
         :return: True if object was stored, and false otherwise
         """
         logging.info(f"Storing object {obj}")
-        return self.ddb.store(obj)
+        try:
+            stored = self.ddb.store(obj, if_exists, if_not_exists)
+        except Exception:
+            if self.cache is not None:
+                self.cache.invalidate(*model_key(obj))
+            raise
+        if stored and self.cache is not None:
+            self.cache.put(obj)
+        return stored
+
+    def bulk_store(self, objs: Iterable[T]) -> int:
+        """
+        Store many objects into their correct tables.
+
+        This is much faster than calling :meth:`store` on every object, since
+        objects are sent to the database in batches. Invalid objects are
+        skipped. ``objs`` can be any iterable (including a generator, e.g. one
+        from :meth:`query_iter`), and is only gone through once.
+
+        :param objs: Objects to store in database
+        :return: number of (valid) objects stored
+        """
+        logging.info("Bulk storing objects")
+        if self.cache is None:
+            return self.ddb.bulk_store(objs)
+
+        keys = []
+
+        def track(objs: Iterable[T]) -> Iterator[T]:
+            """Remember the keys of the objects as they are stored."""
+            for obj in objs:
+                keys.append(model_key(obj))
+                yield obj
+
+        try:
+            return self.ddb.bulk_store(track(objs))
+        finally:
+            for Model, k in keys:
+                self.cache.invalidate(Model, k)
 
     def retrieve(self,
                  Model: Type[T],
-                 k: str) -> T:
+                 k: str,
+                 fields: Optional[List[str]] = None,
+                 cached: bool = False) -> T:
         """
         Retrieve a model from the database.
 
+        Every process has its own cache, so a cached model can be missing
+        changes made by other processes for up to the cache's TTL. Only set
+        ``cached`` when the model is only read, e.g. displayed, or the user
+        running a command looked up to check their permissions (which can
+        then lag behind a change by that long). Never set it when the model
+        is modified and written back with :meth:`store`, since that would
+        overwrite those changes.
+
         :param Model: the actual class you want to retrieve
         :param k: retrieve based on this key (or ID)
+        :param fields: if given, only these attributes are read (see
+                       :meth:`query`)
+        :param cached: if true, the model may be served from the cache
         :raise: LookupError if key is not found
         :return: a model ``Model`` if key is found
         """
         logging.info(f"Retrieving {Model.__name__}(id={k})")
-        return self.ddb.retrieve(Model, k)
-
-    def bulk_retrieve(self, Model: Type[T], ks: List[str]) -> List[T]:
+        if self.cache is None:
+            return self.ddb.retrieve(Model, k, fields)
+
+        obj = self.cache.get(Model, k) if cached else None
+        if obj is None:
+            obj = self.ddb.retrieve(Model, k, fields)
+            if fields is None:
+                self.cache.put(obj)
+        return obj
+
+    def bulk_retrieve(self,
+                      Model: Type[T],
+                      ks: List[str],
+                      ordered: bool = False,
+                      fields: Optional[List[str]] = None,
+                      cached: bool = False) -> List[T]:
         """
         Retrieve a list of models from the database.
 
-        Keys not found in the database will be skipped.
+        Keys not found in the database will be skipped. Duplicate keys are
+        only retrieved once.
 
         :param Model: the actual class you want to retrieve
         :param ks: retrieve based on this key (or ID)
+        :param ordered: if true, models are returned in the same order as
+                        their keys in ``ks``; otherwise, in no
+                        particular order
+        :param fields: if given, only these attributes are read (see
+                       :meth:`query`)
+        :param cached: if true, models may be served from the cache (see
+                       :meth:`retrieve`)
         :return: a list of models ``Model``
         """
         logging.info(f"Bulk retrieving {len(ks)} {Model.__name__}(s)")
-        return self.ddb.bulk_retrieve(Model, ks)
+        if self.cache is None:
+            return self.ddb.bulk_retrieve(Model, ks, ordered, fields)
+
+        found = {}
+        missing = []
+        for k in dict.fromkeys(ks):
+            obj = self.cache.get(Model, k) if cached else None
+            if obj is None:
+                missing.append(k)
+            else:
+                found[k] = obj
+        if missing:
+            for obj in self.ddb.bulk_retrieve(Model, missing, False, fields):
+                if fields is None:
+                    self.cache.put(obj)
+                found[model_key(obj)[1]] = obj
+        if ordered:
+            return [found[k] for k in dict.fromkeys(ks) if k in found]
+        return list(found.values())
 
     def query(self,
               Model: Type[T],
-              params: List[Tuple[str, str]] = []) -> List[T]:
+              params: List[Tuple[str, str]] = [],
+              fields: Optional[List[str]] = None) -> List[T]:
         """
         Query a table using a list of parameters.
 
@@ -104,17 +225,53 @@ class DBFacade:
             teams = ddb.query(Team, [('members', 'abc123'),
                                      ('members', '231abc')])
 
+        If ``fields`` is given, only those attributes (and the ones needed to
+        create a model, such as its key) are read from the database, and the
+        other attributes of the models are left empty. Use this when only a
+        few attributes are needed, e.g. to list every team::
+
+            teams = ddb.query(Team, fields=['display_name', 'platform'])
+
+        Models read this way are never cached, since they are incomplete.
+
         :param Model: type of list elements you'd want
         :param params: list of tuples to match
+        :param fields: if given, only these attributes are read
         :return: a list of ``Model`` that fit the query parameters
         """
         logging.info(f"Querying {Model.__name__} matching "
                      f"parameters: {params}")
-        return self.ddb.query(Model, params)
+        return self.ddb.query(Model, params, fields)
+
+    def query_iter(self,
+                   Model: Type[T],
+                   params: List[Tuple[str, str]] = [],
+                   fields: Optional[List[str]] = None) -> Iterator[T]:
+        """
+        Lazily query a table using a list of parameters.
+
+        Works exactly like :meth:`query`, except that models are yielded as
+        they are read from the database instead of all at once. Prefer this
+        when going through every object of a (potentially large) table.
+
+        Example::
+
+            for user in facade.query_iter(User):
+                print(user.karma)
+
+        :param Model: type of list elements you'd want
+        :param params: list of tuples to match
+        :param fields: if given, only these attributes are read
+        :return: an iterator of ``Model`` that fit the query parameters
+        """
+        logging.info(f"Lazily querying {Model.__name__} matching "
+                     f"parameters: {params}")
+        return self.ddb.query_iter(Model, params, fields)
 
     def query_or(self,
                  Model: Type[T],
-                 params: List[Tuple[str, str]] = []) -> List[T]:
+                 params: List[Tuple[str, str]] = [],
+                 fields: Optional[List[str]] = None) -> List[T]:
         """
         Query a table using a list of parameters.
 
@@ -147,20 +304,103 @@ class DBFacade:
 
         :param Model: type of list elements you'd want
         :param params: list of tuples to match
+        :param fields: if given, only these attributes are read (see
+                       :meth:`query`)
         :return: a list of ``Model`` that fit the query parameters
         """
         logging.info(f"Querying {Model.__name__} matching "
                      f"parameters: {params}")
-        return self.ddb.query_or(Model, params)
+        return self.ddb.query_or(Model, params, fields)
+
+    def update(self,
+               Model: Type[T],
+               k: str,
+               add: Optional[Dict[str, Any]] = None,
+               remove: Optional[Dict[str, Set[str]]] = None,
+               set_values: Optional[Dict[str, Any]] = None,
+               condition: Optional[Dict[str, Any]] = None) -> T:
+        """
+        Change some attributes of an object, without rewriting the rest.
+
+        Only the changes are sent to the database, which applies them
+        atomically, so concurrent updates to the same object don't overwrite
+        each other, as they can with :meth:`store`. For example, to give a
+        user karma::
+
+            facade.update(User, slack_id, add={'karma': 1})
+
+        :param Model: table type of the object
+        :param k: ID or key of the object (must be primary key)
+        :param add: numbers to add to each numeric attribute, or elements to
+                    add to each set attribute
+        :param remove: elements to remove from each set attribute
+        :param set_values: values to set attributes to; attributes set to an
+                           empty value are removed
+        :param condition: values that attributes must have for the update
+                          to happen
+        :raise: LookupError if key is not found
+        :raise: ConditionFailedError if key is not found, or the condition
+                isn't met
+        :return: the updated model
+        """
+        logging.info(f"Updating {Model.__name__}(id={k})")
+        try:
+            obj = self.ddb.update(Model, k, add, remove, set_values,
+                                  condition)
+        except Exception:
+            if self.cache is not None:
+                self.cache.invalidate(Model, k)
+            raise
+        if self.cache is not None:
+            self.cache.put(obj)
+        return obj
 
     def delete(self,
                Model: Type[T],
-               k: str) -> None:
+               k: str,
+               if_exists: bool = False) -> None:
         """
         Remove an object from a table.
 
         :param Model: table type to remove the object from
         :param k: ID or key of the object to remove (must be primary key)
+        :param if_exists: raise an error if there is no object to remove,
+                          instead of doing nothing
+        :raise: ConditionFailedError if ``if_exists`` is set and key is not
+                found
         """
         logging.info(f"Deleting {Model.__name__}(id={k})")
-        self.ddb.delete(Model, k)
+        try:
+            self.ddb.delete(Model, k, if_exists)
+        finally:
+            if self.cache is not None:
+                self.cache.invalidate(Model, k)
+
+    def bulk_delete(self,
+                    Model: Type[T],
+                    ks: List[str]) -> None:
+        """
+        Remove many objects from a table.
+
+        :param Model: table type to remove the objects from
+        :param ks: IDs or keys of the objects to remove (must be primary keys)
+        """
+        logging.info(f"Bulk deleting {len(ks)} {Model.__name__}(s)")
+        try:
+            self.ddb.bulk_delete(Model, ks)
+        finally:
+            # Some of the objects may have been deleted even if it failed
+            if self.cache is not None:
+                for k in ks:
+                    self.cache.invalidate(Model, k)
+
+    def cache_stats(self) -> Dict[str, int]:
+        """
+        Get the hit and miss counters of the cache.
+
+        :return: dictionary with the number of hits, misses, and models
+                 currently cached, or an empty dictionary if there is no cache
+        """
+        if self.cache is None:
+            return {}
+        return self.cache.stats()
@@ -0,0 +1,519 @@
+"""SQLite."""
+import json
+import logging
+import os
+import sqlite3
+
+from app.model import User, Team, Project
+from contextlib import contextmanager
+from db.dynamodb import DynamoDB
+from db.exceptions import ConditionFailedError
+from threading import Lock
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, \
+    Tuple, Type, TypeVar, cast
+from config import Config
+
+T = TypeVar('T', User, Team, Project)
+
+
+class SQLiteDB:
+    """
+    Handles calls to an embedded SQLite database.
+
+    Offers the same operations as :class:`db.dynamodb.DynamoDB`, for
+    deployments on a single machine, and as a fast stand-in for DynamoDB
+    when benchmarking. Please do not use this class directly, and instead
+    use :class:`db.facade.DBFacade`.
+
+    Every model table has a companion table of ``(key, attribute, value)``
+    rows, indexed on ``(attribute, value)``, with one row per scalar
+    attribute and one row per element of every set or list attribute (so it
+    doubles as a junction table for e.g. ``Team.members``). Queries on any
+    attribute, including whether a set contains an element, are answered
+    from this index instead of by scanning.
+
+    The database is opened in WAL mode, so that several processes can read
+    it while one of them writes. It is opened the first time it is used in
+    each process, since an SQLite connection must not be used across
+    ``fork()`` (e.g. by gunicorn workers forked from a preloaded app). All
+    methods are thread-safe.
+    """
+
+    # Number of models read per page by :meth:`query_iter`
+    PAGE_SIZE = 500
+
+    # Seconds to wait for another process to finish writing
+    BUSY_TIMEOUT = 30.0
+
+    def __init__(self, config: Config) -> None:
+        """
+        Initialize the database, without opening it yet.
+
+        Its tables are named after the configured DynamoDB tables, and are
+        created when it is first opened if they don't exist.
+        """
+        self.path = config.sqlite_db
+        self.CONST = DynamoDB.Const(config)
+        self.users_table = config.aws_users_tablename
+        self.teams_table = config.aws_teams_tablename
+        self.projects_table = config.aws_projects_tablename
+        self.__lock = Lock()
+        self.__pid: Optional[int] = None
+        self.__conn: Optional[sqlite3.Connection] = None
+
+    def __str__(self) -> str:
+        """Return a string representing this class."""
+        return "SQLite"
+
+    def check_valid_table(self, table_name: str) -> bool:
+        """
+        Check if table with ``table_name`` exists.
+
+        :param table_name: table identifier
+        :return: boolean value, true if table exists, false otherwise
+        """
+        with self.__lock:
+            row = self.__connection().execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' "
+                "AND name = ?", (table_name,)).fetchone()
+        return row is not None
+
+    def store(self,
+              obj: T,
+              if_exists: bool = False,
+              if_not_exists: bool = False) -> bool:
+        """
+        Store object into the correct table.
+
+        Object can be of type :class:`model.user.User`,
+        :class:`model.team.Team`, or :class:`model.project.Project`.
+
+        :param obj: Object to store in database
+        :param if_exists: only store the object if it replaces another
+        :param if_not_exists: only store the object if it doesn't replace
+                              another
+        :raise: ConditionFailedError if the condition isn't met
+        :return: True if object was stored, and false otherwise
+        """
+        if if_exists and if_not_exists:
+            raise ValueError('Cannot require an object to both exist and '
+                             'not exist')
+        Model = self.__get_model(obj)
+        if not Model.is_valid(obj):  # type: ignore
+            return False
+
+        table_name = self.CONST.get_table_name(Model)
+        item = Model.to_dict(obj)  # type: ignore
+        k = item[self.CONST.get_key(table_name)]
+        logging.info(f"Storing obj {obj} in table {table_name}")
+        with self.__transaction() as conn:
+            if if_exists or if_not_exists:
+                exists = self.__exists(conn, table_name, k)
+                if exists != if_exists:
+                    err_msg = f'{Model.__name__}(id={k}) ' + \
+                        ('not found' if if_exists else 'already exists')
+                    logging.info(err_msg)
+                    raise ConditionFailedError(err_msg)
+            self.__put(conn, table_name, item)
+        return True
+
+    def bulk_store(self, objs: Iterable[T]) -> int:
+        """
+        Store many objects into their correct tables, in one transaction.
+
+        Invalid objects are skipped. If the same object (same primary key)
+        appears more than once, the last one is the one stored.
+
+        :param objs: Objects to store in database
+        :return: number of (valid) objects stored
+        """
+        num_stored = 0
+        with self.__transaction() as conn:
+            for obj in objs:
+                Model = self.__get_model(obj)
+                if not Model.is_valid(obj):  # type: ignore
+                    logging.warning(f"Not storing invalid obj {obj}")
+                    continue
+                self.__put(conn,
+                           self.CONST.get_table_name(Model),
+                           Model.to_dict(obj))  # type: ignore
+                num_stored += 1
+        logging.info(f"Stored {num_stored} obj(s)")
+        return num_stored
+
+    def retrieve(self,
+                 Model: Type[T],
+                 k: str,
+                 fields: Optional[List[str]] = None) -> T:
+        """
+        Retrieve a model from the database.
+
+        :param Model: the actual class you want to retrieve
+        :param k: retrieve based on this key (or ID)
+        :param fields: if given, only these attributes are populated
+        :raise: LookupError if key is not found
+        :return: a model ``Model`` if key is found
+        """
+        table_name = self.CONST.get_table_name(Model)
+        with self.__lock:
+            row = self.__connection().execute(
+                f'SELECT item FROM "{table_name}" WHERE k = ?',
+                (k,)).fetchone()
+        if row is None:
+            err_msg = f'{Model.__name__}(id={k}) not found'
+            logging.info(err_msg)
+            raise LookupError(err_msg)
+        return self.__load(Model, row[0], fields)
+
+    def bulk_retrieve(self,
+                      Model: Type[T],
+                      ks: List[str],
+                      ordered: bool = False,
+                      fields: Optional[List[str]] = None) -> List[T]:
+        """
+        Retrieve a list of models from the database.
+
+        Keys not found in the database are ignored.
+
+        :param Model: the actual class you want to retrieve
+        :param ks: retrieve based on this key (or ID)
+        :param ordered: if True, return the models in the order of ``ks``
+        :param fields: if given, only these attributes are populated
+        :return: a list of models ``Model``
+        """
+        table_name = self.CONST.get_table_name(Model)
+        unique_ks = list(dict.fromkeys(ks))
+        rows: List[Tuple[str, str]] = []
+        with self.__lock:
+            conn = self.__connection()
+            # Stay well under SQLite's limit on the number of parameters
+            for i in range(0, len(unique_ks), self.PAGE_SIZE):
+                chunk = unique_ks[i:i + self.PAGE_SIZE]
+                rows.extend(conn.execute(
+                    f'SELECT k, item FROM "{table_name}" WHERE k IN '
+                    f'({", ".join("?" * len(chunk))})', chunk).fetchall())
+        if ordered:
+            positions = {k: i for i, k in enumerate(unique_ks)}
+            rows.sort(key=lambda row: positions[row[0]])
+        return [self.__load(Model, item, fields) for _, item in rows]
+
+    def query(self,
+              Model: Type[T],
+              params: List[Tuple[str, str]] = [],
+              fields: Optional[List[str]] = None) -> List[T]:
+        """
+        Query a table using a list of parameters.
+
+        Returns a list of ``Model`` that have **all** of the attributes
+        specified in the parameters, exactly like
+        :meth:`db.dynamodb.DynamoDB.query`. Attributes that are sets are
+        checked to see if they **contain** the value.
+
+        :param Model: type of list elements you'd want
+        :param params: list of tuples to match
+        :param fields: if given, only these attributes are populated
+        :return: a list of ``Model`` that fit the query parameters
+        """
+        return list(self.query_iter(Model, params, fields))
+
+    def query_iter(self,
+                   Model: Type[T],
+                   params: List[Tuple[str, str]] = [],
+                   fields: Optional[List[str]] = None) -> Iterator[T]:
+        """
+        Lazily query a table using a list of parameters.
+
+        Works exactly like :meth:`query`, except that models are read
+        ``PAGE_SIZE`` at a time, so the whole table is never held in memory
+        at once.
+
+        :param Model: type of list elements you'd want
+        :param params: list of tuples to match
+        :param fields: if given, only these attributes are populated
+        :return: an iterator of ``Model`` that fit the query parameters
+        """
+        return self.__query_models(Model, params, ' INTERSECT ', fields)
+
+    def query_or(self,
+                 Model: Type[T],
+                 params: List[Tuple[str, str]] = [],
+                 fields: Optional[List[str]] = None) -> List[T]:
+        """
+        Query a table using a list of parameters.
+
+        Returns a list of ``Model`` that have **one** of the attributes
+        specified in the parameters, exactly like
+        :meth:`db.dynamodb.DynamoDB.query_or`.
+
+        :param Model: type of list elements you'd want
+        :param params: list of tuples to match
+        :param fields: if given, only these attributes are populated
+        :return: a list of ``Model`` that fit the query parameters
+        """
+        return list(self.__query_models(Model, params, ' UNION ', fields))
+
+    def __query_models(self,
+                       Model: Type[T],
+                       params: List[Tuple[str, str]],
+                       combine: str,
+                       fields: Optional[List[str]]) -> Iterator[T]:
+        """
+        Yield the models matching the parameters, one page at a time.
+
+        :param Model: type of models to yield
+        :param params: list of tuples to match
+        :param combine: SQL operator joining the keys matching each
+                        parameter, ``INTERSECT`` or ``UNION``
+        :param fields: if given, only these attributes are populated
+        :return: an iterator of ``Model`` that fit the query parameters
+        """
+        table_name = self.CONST.get_table_name(Model)
+        where = 'k > ?'
+        args: List[str] = []
+        if params:
+            match = f'SELECT k FROM "{table_name}_attrs" ' \
+                'WHERE attr = ? AND value = ?'
+            where += f' AND k IN ({combine.join([match] * len(params))})'
+            for attr, value in params:
+                args.extend([attr, str(value)])
+
+        last_key = ''
+        while True:
+            with self.__lock:
+                rows = self.__connection().execute(
+                    f'SELECT k, item FROM "{table_name}" WHERE {where} '
+                    f'ORDER BY k LIMIT {self.PAGE_SIZE}',
+                    [last_key] + args).fetchall()
+            yield from (self.__load(Model, item, fields) for _, item in rows)
+            if len(rows) < self.PAGE_SIZE:
+                return
+            last_key = rows[-1][0]
+
+    def update(self,
+               Model: Type[T],
+               k: str,
+               add: Optional[Dict[str, Any]] = None,
+               remove: Optional[Dict[str, Set[str]]] = None,
+               set_values: Optional[Dict[str, Any]] = None,
+               condition: Optional[Dict[str, Any]] = None) -> T:
+        """
+        Change some attributes of an object, without rewriting the rest.
+
+        Works exactly like :meth:`db.dynamodb.DynamoDB.update`; the object
+        is read, changed and written back in a single transaction.
+
+        :param Model: table type of the object
+        :param k: ID or key of the object (must be primary key)
+        :param add: numbers to add to each numeric attribute, or elements to
+                    add to each set attribute
+        :param remove: elements to remove from each set attribute
+        :param set_values: values to set attributes to; attributes set to an
+                           empty value are removed
+        :param condition: values that attributes must have for the update
+                          to happen
+        :raise: LookupError if key is not found
+        :raise: ConditionFailedError if key is not found, or the condition
+                isn't met
+        :return: the updated model
+        """
+        logging.info(f"Updating {Model.__name__}(id={k})")
+        table_name = self.CONST.get_table_name(Model)
+        with self.__transaction() as conn:
+            row = conn.execute(f'SELECT item FROM "{table_name}" WHERE k = ?',
+                               (k,)).fetchone()
+            err_msg = f'{Model.__name__}(id={k}) not found'
+            if row is None and not condition:
+                logging.info(err_msg)
+                raise LookupError(err_msg)
+            item = json.loads(row[0]) if row is not None else None
+            if item is None or \
+                    any(not self.__equal(item.get(attr), v)
+                        for attr, v in (condition or {}).items()):
+                err_msg += ' or condition not met'
+                logging.info(err_msg)
+                raise ConditionFailedError(err_msg)
+
+            for attr, v in (set_values or {}).items():
+                if v:
+                    item[attr] = v
+                else:
+                    item.pop(attr, None)
+            for attr, v in (add or {}).items():
+                if isinstance(v, (set, frozenset, list)):
+                    item[attr] = set(item.get(attr, [])) | set(v)
+                elif v:
+                    item[attr] = item.get(attr, 0) + v
+            for attr, v in (remove or {}).items():
+                remaining = set(item.get(attr, [])) - set(v)
+                if remaining:
+                    item[attr] = remaining
+                else:
+                    item.pop(attr, None)
+            self.__put(conn, table_name, item)
+        return Model.from_dict(json.loads(self.__dumps(item)))
+
+    def delete(self,
+               Model: Type[T],
+               k: str,
+               if_exists: bool = False) -> None:
+        """
+        Remove an object from a table.
+
+        :param Model: table type to remove the object from
+        :param k: ID or key of the object to remove (must be primary key)
+        :param if_exists: raise an error if there is no object to remove,
+                          instead of doing nothing
+        :raise: ConditionFailedError if ``if_exists`` is set and key is not
+                found
+        """
+        if not if_exists:
+            self.bulk_delete(Model, [k])
+            return
+
+        logging.info(f"Deleting {Model.__name__}(id={k})")
+        table_name = self.CONST.get_table_name(Model)
+        with self.__transaction() as conn:
+            if not self.__exists(conn, table_name, k):
+                err_msg = f'{Model.__name__}(id={k}) not found'
+                logging.info(err_msg)
+                raise ConditionFailedError(err_msg)
+            conn.execute(f'DELETE FROM "{table_name}" WHERE k = ?', (k,))
+            conn.execute(f'DELETE FROM "{table_name}_attrs" WHERE k = ?',
+                         (k,))
+
+    def bulk_delete(self,
+                    Model: Type[T],
+                    ks: List[str]) -> None:
+        """
+        Remove many objects from a table, in one transaction.
+
+        Keys not found in the database are ignored.
+
+        :param Model: table type to remove the objects from
+        :param ks: IDs or keys of the objects to remove (must be primary keys)
+        """
+        logging.info(f"Deleting {len(ks)} {Model.__name__}(s)")
+        table_name = self.CONST.get_table_name(Model)
+        keys = [(k,) for k in dict.fromkeys(ks)]
+        with self.__transaction() as conn:
+            conn.executemany(f'DELETE FROM "{table_name}" WHERE k = ?', keys)
+            conn.executemany(f'DELETE FROM "{table_name}_attrs" WHERE k = ?',
+                             keys)
+
+    @contextmanager
+    def __transaction(self) -> Iterator[sqlite3.Connection]:
+        """Hold the lock for a write transaction, rolling back on errors."""
+        with self.__lock:
+            conn = self.__connection()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield conn
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
+
+    def __connection(self) -> sqlite3.Connection:
+        """
+        Get this process' connection to the database, opening it if needed.
+
+        Must be called with the lock held.
+        """
+        if self.__conn is None or self.__pid != os.getpid():
+            # A connection inherited from the parent process is abandoned,
+            # not closed, since closing it could affect the parent's
+            logging.info(f"Opening SQLite database {self.path}")
+            conn = sqlite3.connect(self.path,
+                                   timeout=self.BUSY_TIMEOUT,
+                                   check_same_thread=False,
+                                   isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                for table_name in [self.users_table,
+                                   self.teams_table,
+                                   self.projects_table]:
+                    conn.execute(f'CREATE TABLE IF NOT EXISTS '
+                                 f'"{table_name}" ('
+                                 'k TEXT PRIMARY KEY, item TEXT NOT NULL)')
+                    conn.execute(f'CREATE TABLE IF NOT EXISTS '
+                                 f'"{table_name}_attrs" ('
+                                 'k TEXT NOT NULL, attr TEXT NOT NULL, '
+                                 'value TEXT NOT NULL, '
+                                 'PRIMARY KEY (k, attr, value)) WITHOUT ROWID')
+                    conn.execute(f'CREATE INDEX IF NOT EXISTS '
+                                 f'"{table_name}_attrs_index" ON '
+                                 f'"{table_name}_attrs" (attr, value)')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                conn.close()
+                raise
+            conn.execute('COMMIT')
+            self.__pid = os.getpid()
+            self.__conn = conn
+        return self.__conn
+
+    @staticmethod
+    def __exists(conn: sqlite3.Connection, table_name: str, k: str) -> bool:
+        """Check if a table has an item with the given key."""
+        return conn.execute(f'SELECT 1 FROM "{table_name}" WHERE k = ?',
+                            (k,)).fetchone() is not None
+
+    def __put(self,
+              conn: sqlite3.Connection,
+              table_name: str,
+              item: Dict[str, Any]) -> None:
+        """Write an item and its index rows, replacing any old version."""
+        k = item[self.CONST.get_key(table_name)]
+        conn.execute(f'INSERT OR REPLACE INTO "{table_name}" (k, item) '
+                     'VALUES (?, ?)', (k, self.__dumps(item)))
+        conn.execute(f'DELETE FROM "{table_name}_attrs" WHERE k = ?', (k,))
+        rows: Set[Tuple[str, str, str]] = set()
+        for attr, v in item.items():
+            if isinstance(v, (set, frozenset, list, tuple)):
+                rows.update((k, attr, str(element)) for element in v)
+            else:
+                rows.add((k, attr, str(v)))
+        conn.executemany(f'INSERT INTO "{table_name}_attrs" (k, attr, value) '
+                         'VALUES (?, ?, ?)', rows)
+
+    def __load(self,
+               Model: Type[T],
+               item: str,
+               fields: Optional[List[str]]) -> T:
+        """Create a model from a serialized item, keeping only some fields."""
+        d = json.loads(item)
+        if fields is not None:
+            table_name = self.CONST.get_table_name(Model)
+            keep = set(self.CONST.get_required_attrs(table_name)) | set(fields)
+            d = {attr: v for attr, v in d.items() if attr in keep}
+        return Model.from_dict(d)
+
+    @staticmethod
+    def __dumps(item: Dict[str, Any]) -> str:
+        """Serialize an item, turning sets into sorted lists."""
+        return json.dumps({attr: sorted(v) if isinstance(v, (set, frozenset))
+                           else v
+                           for attr, v in item.items()})
+
+    @staticmethod
+    def __equal(value: Any, expected: Any) -> bool:
+        """Check if an attribute has the value a condition expects."""
+        if isinstance(expected, (set, frozenset)):
+            return set(value or []) == expected
+        return bool(value == expected)
+
+    def __get_model(self, obj: T) -> Type[T]:
+        """
+        Get the class of an object that can be stored.
+
+        :param obj: Object to get the class of
+        :raise: RuntimeError if object is not a User, Team, or Project
+        :return: either ``User``, ``Team``, or ``Project``
+        """
+        for Model in (User, Team, Project):
+            if isinstance(obj, Model):
+                return cast(Type[T], Model)
+        logging.error(f"Cannot store object {str(obj)}")
+        raise RuntimeError(f'Cannot store object{str(obj)}')
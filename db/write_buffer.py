@@ -0,0 +1,216 @@
+"""Buffer set updates so that updates to the same object are combined."""
+import atexit
+import logging
+import time
+
+from app.model import User, Team, Project
+from collections import deque
+from db.facade import DBFacade
+from threading import Condition, Thread
+from typing import Any, Deque, Dict, Optional, Set, Tuple, Type, TypeVar
+
+T = TypeVar('T', User, Team, Project)
+
+# Model class and primary key of an object
+ObjectKey = Tuple[Type[Any], str]
+# Pending changes to an object, mapping (attribute, element) to True if the
+# element is to be added, False if it is to be removed
+Changes = Dict[Tuple[str, str], bool]
+
+
+class SetUpdateBuffer:
+    """
+    Combine the set updates made to an object within a short window.
+
+    The first update to an object opens a batch, which a background thread
+    applies ``window`` seconds later with :meth:`DBFacade.update`, along with
+    every update made to the object in the meantime. If an element is both
+    added and removed within a batch, the last update wins. Updates are
+    therefore applied a little after :meth:`update` returns, so callers never
+    see them fail; a batch that fails to apply is put back in the buffer, and
+    retried with exponential backoff up to ``max_attempts`` times before it
+    is logged as an error and dropped. Callers that need to know whether an
+    update was written should use a ``window`` of ``0``. All methods are
+    thread-safe.
+    """
+
+    def __init__(self,
+                 facade: DBFacade,
+                 window: float,
+                 max_attempts: int = 5,
+                 backoff: float = 1.0) -> None:
+        """
+        Initialize the buffer.
+
+        :param facade: database facade the updates are applied with
+        :param window: seconds an update waits to be combined with others;
+                       if not positive, updates are applied right away (as
+                       they are once the buffer has been flushed), and
+                       raise any error
+        :param max_attempts: number of times a batch is tried before it is
+                             dropped
+        :param backoff: seconds to wait before the first retry of a batch;
+                        the wait doubles on every retry
+        """
+        self.facade = facade
+        self.window = window
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.updates = 0
+        self.writes = 0
+        self.retried = 0
+        self.failed = 0
+        # Objects with open batches, in the order they are due
+        self.__due: Deque[Tuple[float, ObjectKey]] = deque()
+        self.__batches: Dict[ObjectKey, Changes] = {}
+        # Number of times each object's batch has failed to apply
+        self.__attempts: Dict[ObjectKey, int] = {}
+        self.__cond = Condition()
+        self.__worker: Optional[Thread] = None
+        self.__closed = False
+
+    def update(self,
+               Model: Type[T],
+               k: str,
+               add: Optional[Dict[str, Set[str]]] = None,
+               remove: Optional[Dict[str, Set[str]]] = None) -> None:
+        """
+        Add and remove elements of an object's set attributes, shortly.
+
+        :param Model: table type of the object
+        :param k: ID or key of the object (must be primary key)
+        :param add: elements to add to each set attribute
+        :param remove: elements to remove from each set attribute
+        """
+        if self.window <= 0 or self.__closed:
+            with self.__cond:
+                self.updates += 1
+                self.writes += 1
+            self.facade.update(Model, k, add, remove)
+            return
+
+        with self.__cond:
+            self.updates += 1
+            key = (Model, k)
+            changes = self.__batches.get(key)
+            if changes is None:
+                changes = self.__batches[key] = {}
+                self.__due.append((time.monotonic() + self.window, key))
+                self.__start()
+                self.__cond.notify()
+            for attr, elements in (add or {}).items():
+                for element in elements:
+                    changes[(attr, element)] = True
+            for attr, elements in (remove or {}).items():
+                for element in elements:
+                    changes[(attr, element)] = False
+
+    def pending(self,
+                Model: Type[T],
+                k: str,
+                attr: str,
+                element: str) -> Optional[bool]:
+        """
+        Check if an element is about to be added to or removed from a set.
+
+        :param Model: table type of the object
+        :param k: ID or key of the object
+        :param attr: name of the set attribute
+        :param element: the element
+        :return: ``True`` if the element will be added, ``False`` if it will
+                 be removed, or ``None`` if there is no pending update
+        """
+        with self.__cond:
+            return self.__batches.get((Model, k), {}).get((attr, element))
+
+    def flush(self) -> None:
+        """Apply every pending update, and stop the background thread."""
+        with self.__cond:
+            self.__closed = True
+            self.__cond.notify()
+            worker = self.__worker
+        if worker is not None:
+            worker.join()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the buffer's counters.
+
+        :return: dictionary with the number of objects with pending updates,
+                 updates made, writes to the database, writes retried, and
+                 batches dropped after failing every attempt
+        """
+        with self.__cond:
+            return {'pending': len(self.__batches),
+                    'updates': self.updates,
+                    'writes': self.writes,
+                    'retried': self.retried,
+                    'failed': self.failed}
+
+    def __start(self) -> None:
+        """Start the background thread, if it isn't already running."""
+        if self.__worker is None:
+            self.__worker = Thread(target=self.__run,
+                                   name='set-update-buffer',
+                                   daemon=True)
+            self.__worker.start()
+            atexit.register(self.flush)
+
+    def __run(self) -> None:
+        """Apply batches once their window has passed."""
+        while True:
+            with self.__cond:
+                while True:
+                    if not self.__due:
+                        if self.__closed:
+                            return
+                        self.__cond.wait()
+                        continue
+                    deadline, key = self.__due[0]
+                    wait = deadline - time.monotonic()
+                    if wait <= 0 or self.__closed:
+                        break
+                    self.__cond.wait(wait)
+                self.__due.popleft()
+                changes = self.__batches.pop(key)
+                self.writes += 1
+
+            Model, k = key
+            add: Dict[str, Set[str]] = {}
+            remove: Dict[str, Set[str]] = {}
+            for (attr, element), added in changes.items():
+                (add if added else remove).setdefault(attr, set()).add(element)
+            try:
+                self.facade.update(Model, k, add, remove)
+                with self.__cond:
+                    self.__attempts.pop(key, None)
+            except Exception:
+                logging.exception(f"Failed to update {Model.__name__}(id={k})")
+                self.__retry(key, changes)
+
+    def __retry(self, key: ObjectKey, changes: Changes) -> None:
+        """Put a batch that failed back in the buffer, unless it's hopeless."""
+        Model, k = key
+        with self.__cond:
+            attempts = self.__attempts.get(key, 0) + 1
+            if attempts >= self.max_attempts:
+                self.__attempts.pop(key, None)
+                self.failed += 1
+                logging.error(f"Failed to update {Model.__name__}(id={k}) "
+                              f"{attempts} times, dropping {len(changes)} "
+                              "changes")
+                return
+            self.__attempts[key] = attempts
+            self.retried += 1
+            # Updates made since the batch was taken out are more recent
+            newer = self.__batches.get(key)
+            if newer is None:
+                self.__batches[key] = changes
+                self.__due.append((time.monotonic() +
+                                   self.backoff * 2 ** (attempts - 1), key))
+                self.__due = deque(sorted(self.__due, key=lambda due: due[0]))
+                self.__cond.notify()
+            else:
+                newer.update({change: added
+                              for change, added in changes.items()
+                              if change not in newer})
@@ -1,30 +1,101 @@
 """All necessary class initializations."""
 import random
+import requests
 import string
 
 from app.controller.command import CommandParser
 from app.controller.command.commands.token import TokenCommandConfig
 from datetime import timedelta
 from db import DBFacade
+from db.cache import ModelCache
 from db.dynamodb import DynamoDB
+from db.sqlite import SQLiteDB
 from interface.github import GithubInterface, DefaultGithubFactory
 from interface.slack import Bot
+from interface.slack_dispatcher import SlackDispatcher
 from slack import WebClient
 from app.controller.webhook.github import GitHubWebhookHandler
+from app.controller.webhook.github.deliveries import DeliveryLog
+from app.controller.webhook.github.queue import EventStore, \
+    MemoryEventStore, SQLiteEventStore, WebhookQueue
 from app.controller.webhook.slack import SlackEventsHandler
 from config import Config
 
-from typing import Optional, cast
+from typing import Any, Callable, Optional, Union, cast
+from utils.http import make_session
+
+# Maximum number of webhook deliveries each process remembers
+DELIVERY_LOG_SIZE = 4096
+
+
+def make_dbfacade(config: Config) -> DBFacade:
+    """
+    Initialize a :class:`DBFacade` object.
+
+    The facade caches retrieved models, unless the configured cache size is 0.
+    Creating a facade connects to the database, so a single facade should be
+    created per process and passed to the other factories.
+
+    The facade uses an SQLite database if one is configured, and DynamoDB
+    otherwise.
+
+    :return: a new ``DBFacade`` object, freshly initialized
+    """
+    cache = None
+    if config.db_cache_size > 0:
+        cache = ModelCache(config.db_cache_size, config.db_cache_ttl)
+    db: Union[DynamoDB, SQLiteDB]
+    if config.sqlite_db:
+        db = SQLiteDB(config)
+    else:
+        db = DynamoDB(config)
+    return DBFacade(db, cache)
+
+
+def make_http_session(config: Config) -> requests.Session:
+    """
+    Initialize a ``requests.Session`` with pooled, reused connections.
+
+    The pool holds a connection per command worker, so that every running
+    command can post its response without waiting for a connection.
+
+    :return: a new ``requests.Session`` object, freshly initialized
+    """
+    return make_session(config.command_workers,
+                        config.http_timeout,
+                        config.http_retries)
+
+
+def make_slack_dispatcher(config: Config) -> SlackDispatcher:
+    """
+    Initialize a :class:`SlackDispatcher` object.
+
+    Slack's rate limits apply to the whole app, so a single dispatcher should
+    be created per process and passed to the other factories, so that every
+    Slack API call made by the process is paced together.
+
+    :return: a new ``SlackDispatcher`` object, freshly initialized
+    """
+    return SlackDispatcher(WebClient(config.slack_api_token))
 
 
 def make_command_parser(config: Config,
-                        gh: Optional[GithubInterface] = None) \
+                        gh: Optional[GithubInterface] = None,
+                        facade: Optional[DBFacade] = None,
+                        session: Optional[requests.Session] = None,
+                        dispatcher: Optional[SlackDispatcher] = None) \
         -> CommandParser:
     """
     Initialize and returns a :class:`CommandParser` object.
 
+    :param facade: database facade to use; a new one is made if not given
+    :param session: HTTP session to use; a new one is made if not given
+    :param dispatcher: Slack dispatcher to use; a new one is made if not
+                       given
     :return: a new ``CommandParser`` object, freshly initialized
     """
+    if session is None:
+        session = make_http_session(config)
     slack_api_token, slack_notification_channel = "", ""
     signing_key = ""
     if not config.testing:
@@ -34,35 +105,95 @@ def make_command_parser(config: Config,
         github_organization = config.github_org_name
         slack_notification_channel = config.slack_notification_channel
         gh = GithubInterface(DefaultGithubFactory(github_app_id,
-                                                  github_auth_key),
+                                                  github_auth_key,
+                                                  session),
                              github_organization)
         signing_key = config.github_key
-    facade = DBFacade(DynamoDB(config))
-    bot = Bot(WebClient(slack_api_token), slack_notification_channel)
+    if facade is None:
+        facade = make_dbfacade(config)
+    if dispatcher is None:
+        dispatcher = SlackDispatcher(WebClient(slack_api_token))
+    bot = Bot(dispatcher.sc, slack_notification_channel, dispatcher)
     # TODO: make token config expiry configurable
     token_config = TokenCommandConfig(timedelta(days=7), signing_key)
-    return CommandParser(facade, bot, cast(GithubInterface, gh), token_config)
+    return CommandParser(facade, bot, cast(GithubInterface, gh), token_config,
+                         session)
 
 
-def make_github_webhook_handler(config: Config) -> GitHubWebhookHandler:
+def make_github_webhook_handler(config: Config,
+                                facade: Optional[DBFacade] = None) \
+        -> GitHubWebhookHandler:
     """
     Initialize a :class:`GitHubWebhookHandler` object.
 
+    :param facade: database facade to use; a new one is made if not given
     :return: a new ``GitHubWebhookHandler`` object, freshly initialized
     """
-    facade = DBFacade(DynamoDB(config))
-    return GitHubWebhookHandler(facade, config)
+    if facade is None:
+        facade = make_dbfacade(config)
+    return GitHubWebhookHandler(facade, config,
+                                make_webhook_queue(config),
+                                make_delivery_log(config, facade))
+
+
+def make_delivery_log(config: Config, facade: DBFacade) -> DeliveryLog:
+    """
+    Initialize a :class:`DeliveryLog` object.
+
+    :param facade: database facade whose database holds the shared table, if
+                   it is a DynamoDB database
+    :return: a new ``DeliveryLog`` object, freshly initialized
+    """
+    table: Optional[Callable[[], Any]] = None
+    if config.aws_deliveries_tablename and isinstance(facade.ddb, DynamoDB):
+        ddb = facade.ddb
+        table_name = config.aws_deliveries_tablename
+        ddb.expiring_table(table_name, 'delivery_id')
+
+        def shared_table() -> Any:
+            """Get the table through this process' DynamoDB resource."""
+            return ddb.ddb.Table(table_name)
+        table = shared_table
+    return DeliveryLog(DELIVERY_LOG_SIZE, config.github_delivery_ttl, table)
+
+
+def make_webhook_queue(config: Config) -> Optional[WebhookQueue]:
+    """
+    Initialize a :class:`WebhookQueue` object, if webhooks are asynchronous.
+
+    Nothing is started or opened until the queue is used, so the queue can be
+    created before the server forks its worker processes.
+
+    :return: a new ``WebhookQueue`` object, or ``None`` if webhooks are
+             handled synchronously
+    """
+    if not config.github_webhook_async:
+        return None
+    store: EventStore
+    if config.github_webhook_queue_db:
+        store = SQLiteEventStore(config.github_webhook_queue_db)
+    else:
+        store = MemoryEventStore()
+    return WebhookQueue(store, config.github_webhook_workers)
 
 
-def make_slack_events_handler(config: Config) -> SlackEventsHandler:
+def make_slack_events_handler(config: Config,
+                              facade: Optional[DBFacade] = None,
+                              dispatcher: Optional[SlackDispatcher] = None) \
+        -> SlackEventsHandler:
     """
     Initialize a :class:`SlackEventsHandler` object.
 
+    :param facade: database facade to use; a new one is made if not given
+    :param dispatcher: Slack dispatcher to use; a new one is made if not
+                       given
     :return: a new ``SlackEventsHandler`` object, freshly initialized
     """
-    facade = DBFacade(DynamoDB(config))
-    bot = Bot(WebClient(config.slack_api_token),
-              config.slack_notification_channel)
+    if facade is None:
+        facade = make_dbfacade(config)
+    if dispatcher is None:
+        dispatcher = make_slack_dispatcher(config)
+    bot = Bot(dispatcher.sc, config.slack_notification_channel, dispatcher)
     return SlackEventsHandler(facade, bot)
 
 
@@ -5,38 +5,56 @@ from github.Team import Team
 from interface.exceptions.github import GithubAPIException
 from interface.github_app import GithubAppInterface, \
     DefaultGithubAppAuthFactory
+from interface.github_cache import GithubObjectCache
+from interface.github_rate_limit import RateLimitGovernor
 from app.model.team import Team as ModelTeam
-from typing import cast, List
+from typing import cast, Any, Callable, Dict, List, Optional, Set
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from functools import wraps
+from threading import Lock, local
 import logging
+import requests
 
 
 def handle_github_error(func):
-    """Github error handler that updates Github App API token if necessary."""
+    """
+    Github error handler that updates Github App API token if necessary.
+
+    Calls are paced by the interface's rate limit governor, and are retried
+    once Github's rate limit allows if they were rate limited.
+    """
     @wraps(func)
     def wrapper(self, *arg, **kwargs):
+        github = self.github
         try:
-            return func(self, *arg, **kwargs)
+            if self.github_factory.token_expiring():
+                logging.info("Github App API token expiring, renewing it")
+                github = self.renew_github(github)
+            self.governor.acquire()
+            ret = func(self, *arg, **kwargs)
+            self.governor.observe(self.github)
+            return ret
         except GithubException as e:
             logging.warning(f"GithubException raised with message {e.data}"
                             f" and error code {e.status}")
             if e.status == 401:
                 logging.warning(
                     "Attempting to create new instance of pygithub interface")
-                self.github = self.github_factory.create()
-                logging.warning(
-                    "Attempting to create new instance of organization object")
-                self.org = self.github.get_organization(self.org_name)
-                try:
-                    return func(self, *arg, **kwargs)
-                except GithubException as e:
-                    logging.error("Second attempt of using pygithub interface"
-                                  f" failed with message {e.data} and error "
-                                  f"code {e.status}")
-                    raise GithubAPIException(e.data)
+                self.renew_github(github, refresh=True)
+            elif e.status in (403, 429) and \
+                    self.rate_limit_backoff(e) is not None:
+                logging.warning("Retrying rate limited Github request")
+                self.governor.acquire()
             else:
                 logging.error(f"Unable to handle error code {e.status}")
                 raise GithubAPIException(e.data)
+            try:
+                return func(self, *arg, **kwargs)
+            except GithubException as e:
+                logging.error("Second attempt of using pygithub interface"
+                              f" failed with message {e.data} and error "
+                              f"code {e.status}")
+                raise GithubAPIException(e.data)
 
     return wrapper
 
@@ -44,33 +62,69 @@ def handle_github_error(func):
 class DefaultGithubFactory:
     """Default factory for creating interface to Github API."""
 
-    def __init__(self, app_id: str, private_key: str):
+    def __init__(self,
+                 app_id: str,
+                 private_key: str,
+                 session: Optional[requests.Session] = None):
         """
         Init factory.
 
         :param app_id: Github Apps ID
         :param private_key: Private key provided by Github Apps registration
+        :param session: session used for Github Apps API requests
         """
         self.auth = GithubAppInterface(
-            DefaultGithubAppAuthFactory(app_id, private_key))
+            DefaultGithubAppAuthFactory(app_id, private_key),
+            session if session is not None else requests)
         self.github = Github
 
-    def create(self) -> Github:
-        """Create instance of pygithub interface with Github Apps API token."""
+    def create(self, refresh: bool = False) -> Github:
+        """
+        Create instance of pygithub interface with Github Apps API token.
+
+        :param refresh: whether to create a new token even if the cached one
+                        hasn't expired
+        """
         logging.info("Creating new instance of pygithub interface")
-        return self.github(self.auth.create_api_token())
+        return self.github(self.auth.create_api_token(refresh))
+
+    def token_expiring(self) -> bool:
+        """Check if the cached Github Apps API token is about to expire."""
+        return bool(self.auth.token_expiring())
 
 
 class GithubInterface:
     """Utility class for interacting with Github API."""
 
+    # Maximum number of teams whose members are listed at the same time
+    TEAM_MEMBER_WORKERS = 8
+    # Maximum number of users added to a team at the same time
+    ADD_MEMBER_WORKERS = 8
+    # Maximum number of users and teams kept in the object cache
+    OBJECT_CACHE_SIZE = 256
+    # Seconds a cached user or team is used before it is revalidated
+    OBJECT_CACHE_TTL = 60.0
+
     def __init__(self,
                  github_factory: DefaultGithubFactory,
-                 org: str) -> None:
-        """Initialize bot by creating Github object and get organization."""
+                 org: str,
+                 governor: Optional[RateLimitGovernor] = None) -> None:
+        """
+        Initialize bot by creating Github object and get organization.
+
+        :param governor: rate limit governor that paces every call; a new
+                         one is made if not given
+        """
         logging.info("Creating rocket's Github interface")
         self.org_name = org
         self.github_factory = github_factory
+        self.governor = governor if governor is not None \
+            else RateLimitGovernor()
+        self.github_lock = Lock()
+        self.cache = GithubObjectCache(self.OBJECT_CACHE_SIZE,
+                                       self.OBJECT_CACHE_TTL,
+                                       revalidate=self._revalidate)
+        self.__clients = local()
         self.github = github_factory.create()
         try:
             self.org = self.github.get_organization(org)
@@ -80,6 +134,97 @@ class GithubInterface:
                           f"error message {e.data} and error code {e.status}")
             raise GithubAPIException(e.data)
 
+    def renew_github(self, stale: Github, refresh: bool = False) -> Github:
+        """
+        Replace the pygithub interface, if no other thread has already.
+
+        :param stale: the pygithub interface that needs replacing
+        :param refresh: whether to create a new token even if the cached one
+                        hasn't expired
+        :return: the current pygithub interface
+        """
+        with self.github_lock:
+            if self.github is stale:
+                self.github = self.github_factory.create(refresh)
+                # Cached objects make requests with the old token
+                self.cache.clear()
+                logging.warning(
+                    "Attempting to create new instance of organization object")
+                self.org = self.github.get_organization(self.org_name)
+            return self.github
+
+    def _thread_github(self) -> Github:
+        """
+        Get a pygithub interface owned by the calling thread.
+
+        A pygithub interface makes every request over the same connection,
+        which isn't thread-safe, so requests made from several threads at
+        once are made with one of these. It is replaced whenever the shared
+        pygithub interface is renewed.
+        """
+        clients = self.__clients
+        if getattr(clients, 'shared', None) is not self.github:
+            clients.shared = self.github
+            clients.github = self.github_factory.create()
+        return cast(Github, clients.github)
+
+    def _revalidate(self, obj: Any) -> Any:
+        """
+        Revalidate an expired cached user or team.
+
+        The conditional request is made by a copy of the object bound to the
+        calling thread's pygithub interface, so the cached object, which
+        other threads may be using, is left as it is.
+
+        :param obj: the expired object
+        :return: ``obj`` if it hasn't changed, or an up-to-date copy of it
+                 bound to the shared pygithub interface
+        """
+        klass = type(obj)
+        github = self._thread_github()
+        fresh = github.create_from_raw_data(klass, obj.raw_data,
+                                            obj.raw_headers)
+        try:
+            changed = fresh.update()
+        finally:
+            self.governor.observe(github)
+        if not changed:
+            return obj
+        return self.github.create_from_raw_data(
+            klass, fresh.raw_data, fresh.raw_headers)
+
+    def rate_limit_stats(self) -> Dict[str, Any]:
+        """
+        Get the current Github rate limit budget.
+
+        :return: dictionary with the number of requests remaining, the
+                 limit, the UNIX time it resets at, and the total number of
+                 seconds requests have been held back
+        """
+        return self.governor.stats()
+
+    def rate_limit_backoff(self, e: GithubException) -> Optional[float]:
+        """
+        Back off from Github if an exception was caused by rate limiting.
+
+        :param e: exception raised by pygithub
+        :return: number of seconds to back off for, or ``None`` if the
+                 exception wasn't caused by rate limiting
+        """
+        # pygithub records the rate limit of failed responses too
+        self.governor.observe(self.github)
+        return self.governor.backoff(getattr(e, 'headers', None),
+                                     str(e.data))
+
+    def _get_user(self, username: str) -> NamedUser:
+        return cast(NamedUser,
+                    self.cache.get(('user', username.lower()),
+                                   lambda: self.github.get_user(username)))
+
+    def _get_team(self, id: int) -> Team:
+        return self.cache.get(('team', id),
+                              lambda: self.org.get_team(id))
+
     @handle_github_error
     def org_add_member(self, username: str) -> str:
         """
@@ -87,7 +232,7 @@ class GithubInterface:
 
         If the user is already in the organization, don't do anything.
         """
-        user = self.github.get_user(username)
+        user = self._get_user(username)
         if not self.org.has_in_members(user):
             self.org.add_to_members(user, "member")
         return str(user.id)
@@ -95,25 +240,25 @@ class GithubInterface:
     @handle_github_error
     def org_add_admin(self, username: str) -> None:
         """Add member with given username as admin to organization."""
-        user = self.github.get_user(username)
+        user = self._get_user(username)
         self.org.add_to_members(user, "admin")
 
     @handle_github_error
     def org_remove_member(self, username: str) -> None:
         """Remove member with given username from organization."""
-        user = self.github.get_user(username)
+        user = self._get_user(username)
         self.org.remove_from_membership(user)
 
     @handle_github_error
     def org_has_member(self, username: str) -> bool:
         """Return true if user with username is member of organization."""
-        user = self.github.get_user(username)
+        user = self._get_user(username)
         return cast(bool, self.org.has_in_members(user))
 
     @handle_github_error
     def org_get_team(self, id: int) -> Team:
         """Given Github team ID, return team from organization."""
-        return self.org.get_team(id)
+        return self._get_team(id)
 
     @handle_github_error
     def org_create_team(self, name: str) -> int:
@@ -131,6 +276,7 @@ class GithubInterface:
         """Get team with given ID and delete it from organization."""
         team = self.org_get_team(id)
         team.delete()
+        self.cache.invalidate(('team', id))
 
     @handle_github_error
     def org_edit_team(self,
@@ -151,16 +297,49 @@ class GithubInterface:
             team.edit(name)
 
     @handle_github_error
-    def org_get_teams(self) -> List[Team]:
-        """Return array of teams associated with organization."""
-        teams = self.org.get_teams()
+    def org_get_teams(self) -> List[ModelTeam]:
+        """
+        Return array of teams associated with organization.
+
+        Members are listed through the team objects returned with the list of
+        teams, and the members of up to ``TEAM_MEMBER_WORKERS`` teams are
+        listed at the same time.
+
+        A pygithub interface makes every request over the same connection,
+        which isn't thread-safe, so each worker thread lists members with a
+        pygithub interface of its own (see :meth:`_thread_github`).
+        """
+        teams = list(self.org.get_teams())
+
+        def get_member_ids(team: Team) -> Set[str]:
+            """Return the IDs of every member of a team."""
+            self.governor.acquire()
+            # get_members() returns a PaginatedList; each page is a request
+            return set(str(user.id) for user in team.get_members())
+
+        def get_member_ids_in_worker(team: Team) -> Set[str]:
+            """Return the IDs of every member of a team, in a worker."""
+            github = self._thread_github()
+            # Only the team's URL is needed to list its members
+            worker_team = cast(Team, github.create_from_raw_data(
+                Team,  # type: ignore
+                {'id': team.id, 'name': team.name, 'url': team.url}))
+            try:
+                return get_member_ids(worker_team)
+            finally:
+                self.governor.observe(github)
+
+        workers = min(self.TEAM_MEMBER_WORKERS, len(teams))
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                members = list(executor.map(get_member_ids_in_worker, teams))
+        else:
+            members = [get_member_ids(team) for team in teams]
+
         team_array = []
-        for team in teams:
-            # convert PaginatedList to List
+        for team, member_ids in zip(teams, members):
             team_model = ModelTeam(str(team.id), team.name, "")
-            team_model.members = set(str(user.id)
-                                     for user in
-                                     self.list_team_members(team.id))
+            team_model.members = member_ids
             team_array.append(team_model)
         return team_array
 
@@ -171,14 +350,14 @@ class GithubInterface:
     @handle_github_error
     def list_team_members(self, team_id: str) -> List[NamedUser]:
         """Return a list of users in the team of id team_id."""
-        team = self.org.get_team(int(team_id))
+        team = self._get_team(int(team_id))
         return cast(List[NamedUser], list(team.get_members()))
 
     @handle_github_error
     def get_team_member(self, username: str, team_id: str) -> NamedUser:
         """Return a team member with a username of username."""
         try:
-            team = self.org.get_team(int(team_id))
+            team = self._get_team(int(team_id))
             team_members = team.get_members()
             return next(
                 member for member in team_members
@@ -190,20 +369,82 @@ class GithubInterface:
     @handle_github_error
     def add_team_member(self, username: str, team_id: str) -> None:
         """Add user with given username to team with id team_id."""
-        team = self.org.get_team(int(team_id))
-        new_member = self.github.get_user(username)
+        team = self._get_team(int(team_id))
+        new_member = self._get_user(username)
         team.add_membership(new_member)
 
+    @handle_github_error
+    def add_team_members(self,
+                         usernames: List[str],
+                         team_id: str,
+                         done: Optional[Callable[[str, Optional[str]], None]]
+                         = None) -> Dict[str, str]:
+        """
+        Add users with given usernames to team with id team_id.
+
+        Up to ``ADD_MEMBER_WORKERS`` users are added at the same time, each
+        worker thread with a pygithub interface of its own (see
+        :meth:`_thread_github`). A user that can't be added, for whatever
+        reason, doesn't stop the others from being added.
+
+        :param usernames: Github usernames of the users
+        :param team_id: Github ID of the team
+        :param done: function called in this thread as each user is done,
+                     with the username, and the error if the user couldn't
+                     be added
+        :return: error message of each user that couldn't be added
+        """
+        # Only the team's URL and the users' usernames are needed
+        team_url = self._get_team(int(team_id)).url
+
+        def add_member(username: str) -> None:
+            """Add a user to the team, in a worker."""
+            github = self._thread_github()
+            team = cast(Team, github.create_from_raw_data(
+                Team,  # type: ignore
+                {'id': int(team_id), 'url': team_url}))
+            member = cast(NamedUser, github.create_from_raw_data(
+                NamedUser, {'login': username}))
+            self.governor.acquire()
+            try:
+                team.add_membership(member)
+            finally:
+                self.governor.observe(github)
+
+        errors: Dict[str, str] = {}
+        if not usernames:
+            return errors
+        workers = min(self.ADD_MEMBER_WORKERS, len(usernames))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(add_member, username): username
+                       for username in usernames}
+            for future in as_completed(futures):
+                username = futures[future]
+                error: Optional[str] = None
+                try:
+                    future.result()
+                except GithubException as e:
+                    error = str(e.data)
+                except Exception as e:
+                    error = str(e) or type(e).__name__
+                if error is not None:
+                    logging.error(f"Failed to add {username} to team "
+                                  f"{team_id} with {error}")
+                    errors[username] = error
+                if done is not None:
+                    done(username, error)
+        return errors
+
     @handle_github_error
     def has_team_member(self, username: str, team_id: str) -> bool:
         """Check if team with team_id contains user with username."""
-        team = self.org.get_team(int(team_id))
-        member = self.github.get_user(username)
+        team = self._get_team(int(team_id))
+        member = self._get_user(username)
         return cast(bool, team.has_in_members(member))
 
     @handle_github_error
     def remove_team_member(self, username: str, team_id: str) -> None:
         """Remove user with given username from team with id team_id."""
-        team = self.org.get_team(int(team_id))
-        to_be_removed_member = self.github.get_user(username)
+        team = self._get_team(int(team_id))
+        to_be_removed_member = self._get_user(username)
         team.remove_membership(to_be_removed_member)
@@ -4,20 +4,38 @@ import requests
 
 from datetime import datetime, timedelta
 from interface.exceptions.github import GithubAPIException
+from threading import Lock
 import logging
 
 
 class GithubAppInterface:
-    """Interface class for interacting with Github App API."""
+    """
+    Interface class for interacting with Github App API.
 
-    def __init__(self, app_auth_factory):
+    Installation tokens are cached, and are only replaced once they are about
+    to expire. All methods are thread-safe.
+    """
+
+    # Replace tokens this long before Github says they expire
+    TOKEN_REFRESH_MARGIN = timedelta(minutes=5)
+    # Github's installation tokens last an hour, if it doesn't say otherwise
+    DEFAULT_TOKEN_LIFETIME = timedelta(hours=1)
+
+    def __init__(self, app_auth_factory, session=requests):
         """
         Initialize GithubAppInterface.
 
         :param app_auth_factory: Factory for creating auth objects
+        :param session: ``requests.Session`` used to make requests; the
+                        ``requests`` module is used if not given
         """
         self.app_auth_factory = app_auth_factory
         self.auth = app_auth_factory.create()
+        self.session = session
+        self.installation_id = None
+        self.token = None
+        self.token_expiry = datetime.min
+        self.lock = Lock()
 
     def get_app_details(self):
         """
@@ -32,7 +50,7 @@ class GithubAppInterface:
         logging.info("Attempting to retrieve Github App details")
         url = "https://api.github.com/app"
         headers = self._gen_headers()
-        r = requests.get(url=url, headers=headers)
+        r = self.session.get(url=url, headers=headers)
         if r.status_code != 200:
             logging.error("Failed to get Github App details with message "
                           f"{r.text} and error code {r.status_code}")
@@ -41,39 +59,70 @@ class GithubAppInterface:
                      f"{r.json()}")
         return r.json()
 
-    def create_api_token(self):
+    def create_api_token(self, refresh=False):
         """
-        Create installation token to make Github API requests.
+        Get an installation token to make Github API requests.
+
+        A new token is only created if the cached one is about to expire, or
+        if a refresh is requested. The installation is only looked up the
+        first time. Concurrent calls wait for a single token to be created,
+        instead of each creating their own.
 
         See
         https://developer.github.com/v3/apps/#find-installations and
         https://developer.github.com/v3/apps/#create-a-new-installation-token
         for details.
 
+        :param refresh: whether to create a new token even if the cached one
+                        hasn't expired
         :return: Authenticated API token
         """
+        with self.lock:
+            if not refresh and self.token is not None and \
+                    not self.token_expiring():
+                return self.token
+
+            headers = self._gen_headers()
+            if self.installation_id is None:
+                self.installation_id = self._get_installation_id(headers)
+
+            logging.info("Attempting to create new installation token")
+            url = f"https://api.github.com/app/installations/" \
+                  f"{self.installation_id}/access_tokens"
+            r = self.session.post(url=url, headers=headers)
+            if r.status_code != 201:
+                logging.error("Failed to create new installation token "
+                              f"with error message {r.text} "
+                              f"and code {r.status_code}")
+                # The app may have been reinstalled, so look it up again
+                self.installation_id = None
+                raise GithubAPIException(r.text)
+            token = r.json()
+            self.token = token['token']
+            self.token_expiry = self._parse_expiry(token.get('expires_at'))
+            return self.token
+
+    def token_expiring(self):
+        """Check if the cached installation token is about to expire."""
+        return self.token is not None and \
+            datetime.utcnow() >= self.token_expiry - self.TOKEN_REFRESH_MARGIN
+
+    def _get_installation_id(self, headers):
         logging.info("Attempting to get list of installations")
         url = "https://api.github.com/app/installations"
-        headers = self._gen_headers()
-        r = requests.get(url=url,
-                         headers=headers)
+        r = self.session.get(url=url,
+                             headers=headers)
         if r.status_code != 200:
             logging.error("Failed to get list of Github App installations "
                           f"with error message {r.text} "
                           f"and code {r.status_code}")
             raise GithubAPIException(r.text)
-        installation_id = r.json()[0]['id']
-
-        logging.info("Attempting to create new installation token")
-        url = f"https://api.github.com/app/installations/" \
-              f"{installation_id}/access_tokens"
-        r = requests.post(url=url, headers=headers)
-        if r.status_code != 201:
-            logging.error("Failed to create new installation token "
-                          f"with error message {r.text} "
-                          f"and code {r.status_code}")
-            raise GithubAPIException(r.text)
-        return r.json()['token']
+        return r.json()[0]['id']
+
+    def _parse_expiry(self, expires_at):
+        if expires_at is None:
+            return datetime.utcnow() + self.DEFAULT_TOKEN_LIFETIME
+        return datetime.strptime(expires_at, '%Y-%m-%dT%H:%M:%SZ')
 
     def _gen_headers(self):
         if self.auth.is_expired():
@@ -87,9 +136,12 @@ class GithubAppInterface:
     class GithubAppAuth:
         """Class to encapsulate JWT encoding for Github App API."""
 
+        # Github accepts JWTs that expire up to 10 minutes in the future
+        LIFETIME = timedelta(minutes=9)
+
         def __init__(self, app_id, private_key):
             """Initialize Github App authentication."""
-            self.expiry = (datetime.utcnow() + timedelta(minutes=1))
+            self.expiry = (datetime.utcnow() + self.LIFETIME)
             payload = {
                 'iat': datetime.utcnow(),
                 'exp': self.expiry,
@@ -0,0 +1,117 @@
+"""Short-lived cache of objects fetched through PyGithub."""
+import copy
+import time
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Hashable, Optional, Set, Tuple, \
+    TypeVar, cast
+
+T = TypeVar('T')
+
+
+def revalidate_copy(obj: Any) -> Any:
+    """
+    Revalidate a PyGithub object with a conditional request.
+
+    The request is made by a copy of the object, so the object itself, which
+    other threads may be reading, is never modified.
+
+    :param obj: the object to revalidate
+    :return: ``obj`` if it hasn't changed, or an up-to-date copy of it
+    """
+    fresh = copy.copy(obj)
+    return fresh if fresh.update() else obj
+
+
+class GithubObjectCache:
+    """
+    A least-recently-used cache of PyGithub objects.
+
+    Objects younger than the TTL are returned without asking Github. Older
+    objects are revalidated with a conditional request using the ETag Github
+    sent with the object, so if it hasn't changed Github answers with a
+    ``304 Not Modified``, which doesn't count against the rate limit.
+
+    Cached objects are never modified: an object is revalidated by one
+    thread at a time, which replaces it with an up-to-date copy if it has
+    changed, while other threads keep getting the object they had. All
+    methods are thread-safe.
+    """
+
+    def __init__(self,
+                 max_size: int,
+                 ttl: float,
+                 clock: Callable[[], float] = time.monotonic,
+                 revalidate: Optional[Callable[[Any], Any]] = None) -> None:
+        """
+        Initialize the cache.
+
+        :param max_size: maximum number of objects to keep
+        :param ttl: number of seconds an object is used before revalidating
+        :param clock: function returning the current time, in seconds
+        :param revalidate: function that returns an expired object if it
+                           hasn't changed, or an up-to-date copy of it;
+                           :func:`revalidate_copy` if not given
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.__clock = clock
+        self.__revalidate = revalidate if revalidate is not None \
+            else revalidate_copy
+        self.__lock = Lock()
+        self.__entries: 'OrderedDict[Hashable, Tuple[float, Any]]' = \
+            OrderedDict()
+        # Keys of the expired objects being revalidated
+        self.__revalidating: Set[Hashable] = set()
+
+    def __len__(self) -> int:
+        """Return the number of objects currently in the cache."""
+        return len(self.__entries)
+
+    def get(self, key: Hashable, fetch: Callable[[], T]) -> T:
+        """
+        Get an object, fetching it if it isn't cached.
+
+        :param key: key identifying the object
+        :param fetch: function that fetches the object from Github
+        :return: the cached, revalidated, or freshly fetched object
+        """
+        now = self.__clock()
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None:
+                self.__entries.move_to_end(key)
+                # An object being revalidated by another thread was up to
+                # date a moment ago
+                if entry[0] > now or key in self.__revalidating:
+                    return cast(T, entry[1])
+                self.__revalidating.add(key)
+
+        try:
+            obj = fetch() if entry is None else self.__revalidate(entry[1])
+        finally:
+            if entry is not None:
+                with self.__lock:
+                    self.__revalidating.discard(key)
+
+        with self.__lock:
+            self.__entries[key] = (now + self.ttl, obj)
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.max_size:
+                self.__entries.popitem(last=False)
+        return obj
+
+    def invalidate(self, key: Hashable) -> None:
+        """
+        Remove an object from the cache, if it is there.
+
+        :param key: key identifying the object
+        """
+        with self.__lock:
+            self.__entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove every object from the cache."""
+        with self.__lock:
+            self.__entries.clear()
@@ -0,0 +1,169 @@
+"""Pace requests to the Github API to stay within its rate limit."""
+import logging
+import time
+
+from interface.exceptions.github import GithubAPIException
+from threading import Lock
+from typing import Any, Callable, Dict, Mapping, Optional
+
+
+class RateLimitGovernor:
+    """
+    Track Github's rate limit and slow down requests before it runs out.
+
+    Once fewer than ``reserve`` requests are left, requests are spaced out so
+    that the remaining budget lasts until the limit resets. If Github tells
+    us to back off (with ``Retry-After``, or by running out of budget), no
+    requests are made until it says we can. Requests are slowed down rather
+    than failed, and never sent early against a limit known to be used up,
+    unless a ``max_wait`` is given, in which case requests that would have
+    to wait longer fail instead. All methods are thread-safe.
+    """
+
+    # Seconds to back off after hitting a secondary rate limit, if Github
+    # doesn't say how long to wait
+    SECONDARY_BACKOFF = 60.0
+
+    def __init__(self,
+                 reserve: int = 500,
+                 max_wait: Optional[float] = None,
+                 clock: Callable[[], float] = time.time,
+                 sleep: Callable[[float], None] = time.sleep) -> None:
+        """
+        Initialize the governor.
+
+        :param reserve: number of remaining requests below which requests
+                        are paced
+        :param max_wait: maximum number of seconds to wait for a request,
+                         after which it fails; if not given, requests wait
+                         as long as they have to
+        :param clock: function returning the current UNIX time, in seconds
+        :param sleep: function that sleeps for a number of seconds
+        """
+        self.reserve = reserve
+        self.max_wait = max_wait
+        self.remaining: Optional[int] = None
+        self.limit: Optional[int] = None
+        self.reset = 0.0
+        self.throttled = 0.0
+        self.__clock = clock
+        self.__sleep = sleep
+        self.__lock = Lock()
+        self.__blocked_until = 0.0
+        self.__next_slot = 0.0
+
+    def acquire(self) -> None:
+        """
+        Wait until a request can be made without exceeding the budget.
+
+        :raise: GithubAPIException if the request would have to wait longer
+                than ``max_wait``
+        """
+        with self.__lock:
+            now = self.__clock()
+            interval = 0.0
+            if self.remaining is not None and \
+                    self.remaining < self.reserve and self.reset > now:
+                interval = (self.reset - now) / max(self.remaining, 1)
+            # Requests paced past the reset can be made as soon as the budget
+            # is renewed
+            next_slot = min(self.__next_slot, max(self.reset, now))
+            start = max(now, self.__blocked_until, next_slot)
+            wait = start - now
+            if self.max_wait is not None and wait > self.max_wait:
+                err_msg = f"Github rate limit exceeded, requests can be " \
+                    f"made again in {wait:.0f}s"
+                logging.error(err_msg)
+                raise GithubAPIException(err_msg)
+            self.__next_slot = start + interval
+            if self.remaining is not None:
+                self.remaining = max(self.remaining - 1, 0)
+            self.throttled += wait
+
+        if wait > 0:
+            logging.warning(f"Github rate limit low ({self.remaining} "
+                            f"requests left), waiting {wait:.2f}s")
+            self.__sleep(wait)
+
+    def update(self, remaining: int, limit: int, reset: float) -> None:
+        """
+        Record the rate limit Github reported in its last response.
+
+        :param remaining: number of requests left until the limit resets
+        :param limit: number of requests allowed per rate limit window
+        :param reset: UNIX time at which the limit resets
+        """
+        with self.__lock:
+            self.remaining = remaining
+            self.limit = limit
+            self.reset = reset
+
+    def observe(self, github: Any) -> None:
+        """
+        Record the rate limit reported to a pygithub interface.
+
+        The rate limit is read from the interface's requester, since
+        pygithub's own ``rate_limiting`` properties request it from Github
+        if no response has been seen yet.
+
+        :param github: pygithub interface that has made a request
+        """
+        requester = getattr(github, '_Github__requester', None)
+        if requester is None:
+            return
+        remaining, limit = requester.rate_limiting
+        if limit < 0:
+            # No response with rate limit headers yet
+            return
+        self.update(remaining, limit, requester.rate_limiting_resettime)
+
+    def backoff(self,
+                headers: Optional[Mapping[str, str]] = None,
+                message: str = '') -> Optional[float]:
+        """
+        Block requests for as long as a rate limited response tells us to.
+
+        ``Retry-After`` and rate limit headers are used if available. Not
+        every version of pygithub exposes the headers of failed responses, so
+        otherwise the last observed rate limit, and then the error message,
+        are used instead.
+
+        :param headers: headers of a ``403`` or ``429`` response
+        :param message: error message of the response
+        :return: number of seconds requests are blocked for, or ``None`` if
+                 the response wasn't caused by rate limiting
+        """
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        message = message.lower()
+        now = self.__clock()
+        if 'retry-after' in headers:
+            wait = float(headers['retry-after'])
+        elif headers.get('x-ratelimit-remaining') == '0' and \
+                'x-ratelimit-reset' in headers:
+            wait = float(headers['x-ratelimit-reset']) - now
+        elif self.remaining == 0:
+            wait = self.reset - now
+        elif 'abuse' in message or 'secondary rate limit' in message:
+            wait = self.SECONDARY_BACKOFF
+        else:
+            return None
+        wait = max(wait, 0.0)
+
+        with self.__lock:
+            self.__blocked_until = max(self.__blocked_until, now + wait)
+        logging.warning(f"Github rate limit exceeded, backing off {wait}s")
+        return wait
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the current rate limit budget.
+
+        :return: dictionary with the number of requests remaining, the
+                 limit, the UNIX time it resets at, and the total number of
+                 seconds requests have been held back
+        """
+        with self.__lock:
+            return {'remaining': self.remaining,
+                    'limit': self.limit,
+                    'reset': self.reset,
+                    'throttled': self.throttled}
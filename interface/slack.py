@@ -1,22 +1,45 @@
 """Utility classes for interacting with Slack API."""
+from interface.slack_dispatcher import SlackDispatcher
 from slack import WebClient
-from typing import Dict, Any, List, cast
+from threading import Lock
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 import logging
+import time
 
 
 class Bot:
     """Utility class for calling Slack APIs."""
 
-    def __init__(self, sc: WebClient, slack_channel: str = '') -> None:
-        """Initialize Bot by creating a WebClient Object."""
+    # Number of items fetched per request from paginated APIs
+    PAGE_SIZE = 200
+    # Seconds lists of channels are cached for
+    CHANNEL_CACHE_TTL = 60.0
+
+    def __init__(self,
+                 sc: WebClient,
+                 slack_channel: str = '',
+                 dispatcher: Optional[SlackDispatcher] = None) -> None:
+        """
+        Initialize Bot by creating a WebClient Object.
+
+        :param dispatcher: dispatcher that makes every Slack API call; a new
+                           one is made if not given, but every bot in a
+                           process should share one, so that Slack's rate
+                           limits are enforced across all of them
+        """
         logging.info("Initializing Slack client interface")
         self.sc = sc
         self.slack_channel = slack_channel
+        self.dispatcher = dispatcher if dispatcher is not None \
+            else SlackDispatcher(sc)
+        self.__channels: Dict[Tuple[bool, str], Tuple[float, List[Any]]] = {}
+        self.__channels_lock = Lock()
 
     def send_dm(self, message: str, slack_user_id: str) -> None:
         """Send direct message to user with id of slack_user_id."""
         logging.debug(f"Sending direct message to {slack_user_id}")
-        response = self.sc.chat_postMessage(
+        response = self.dispatcher.call(
+            'chat_postMessage',
             channel=slack_user_id,
             text=message
         )
@@ -31,7 +54,8 @@ class Bot:
                         attachments: List[Any] = []) -> None:
         """Send message to channel with name channel_name."""
         logging.debug(f"Sending message to channel {channel_name}")
-        response = self.sc.chat_postMessage(
+        response = self.dispatcher.call(
+            'chat_postMessage',
             channel=channel_name,
             attachments=attachments,
             text=message
@@ -41,33 +65,113 @@ class Bot:
                           f"error: {response['error']}")
             raise SlackAPIError(response['error'])
 
-    def get_channel_users(self, channel_id: str) -> Dict[str, Any]:
-        """Retrieve list of user IDs from channel with channel_id."""
+    def get_channel_users(self,
+                          channel_id: str,
+                          limit: int = PAGE_SIZE) -> List[str]:
+        """
+        Retrieve list of user IDs from channel with channel_id.
+
+        :param channel_id: Slack ID of the channel
+        :param limit: maximum number of users fetched per request
+        :return: IDs of every user in the channel
+        """
+        return list(self.iter_channel_users(channel_id, limit))
+
+    def iter_channel_users(self,
+                           channel_id: str,
+                           limit: int = PAGE_SIZE) -> Iterator[str]:
+        """
+        Iterate through the user IDs of channel with channel_id.
+
+        Users are fetched a page at a time, as the iterator is consumed.
+
+        :param channel_id: Slack ID of the channel
+        :param limit: maximum number of users fetched per request
+        :return: iterator of user IDs
+        """
         logging.debug(f"Retrieving user IDs from channel {channel_id}")
-        response = self.sc.conversations_members(
-            channel=channel_id
-        )
-        if not response['ok']:
-            logging.error("User retrieval "
-                          f"from channel {channel_id} failed with "
-                          f"error: {response['error']}")
-            raise SlackAPIError(response['error'])
-        else:
-            return cast(Dict[str, Any], response["members"])
+        for response in self.__paginate('conversations_members',
+                                        channel=channel_id,
+                                        limit=limit):
+            if not response['ok']:
+                logging.error("User retrieval "
+                              f"from channel {channel_id} failed with "
+                              f"error: {response['error']}")
+                raise SlackAPIError(response['error'])
+            yield from response['members']
 
     def get_channel_names(self) -> List[str]:
         """Retrieve list of channel names."""
         return list(map(lambda c: str(c['name']), self.get_channels()))
 
-    def get_channels(self) -> List[Any]:
-        """Retrieve list of channel objects."""
-        resp = self.sc.conversations_list()
-        if not resp['ok']:
-            logging.error(f"Channel retrieval failed with "
-                          f"error: {resp['error']}")
-            raise SlackAPIError(resp['error'])
-        else:
-            return cast(List[Any], resp['channels'])
+    def get_channels(self,
+                     exclude_archived: bool = False,
+                     types: str = 'public_channel') -> List[Any]:
+        """
+        Retrieve list of channel objects.
+
+        Lists are cached for ``CHANNEL_CACHE_TTL`` seconds.
+
+        :param exclude_archived: whether to leave out archived channels
+        :param types: comma-separated channel types to list, any of
+                      ``public_channel``, ``private_channel``, ``mpim`` and
+                      ``im``
+        :return: list of channel objects
+        """
+        key = (exclude_archived, types)
+        with self.__channels_lock:
+            cached = self.__channels.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            return list(cached[1])
+
+        channels = list(self.iter_channels(exclude_archived=exclude_archived,
+                                           types=types))
+        with self.__channels_lock:
+            self.__channels[key] = \
+                (time.monotonic() + self.CHANNEL_CACHE_TTL, channels)
+        return list(channels)
+
+    def iter_channels(self,
+                      limit: int = PAGE_SIZE,
+                      exclude_archived: bool = False,
+                      types: str = 'public_channel') -> Iterator[Any]:
+        """
+        Iterate through channel objects, fetching a page at a time.
+
+        :param limit: maximum number of channels fetched per request
+        :param exclude_archived: whether to leave out archived channels
+        :param types: comma-separated channel types to list
+        :return: iterator of channel objects
+        """
+        for resp in self.__paginate('conversations_list',
+                                    limit=limit,
+                                    exclude_archived=exclude_archived,
+                                    types=types):
+            if not resp['ok']:
+                logging.error(f"Channel retrieval failed with "
+                              f"error: {resp['error']}")
+                raise SlackAPIError(resp['error'])
+            yield from resp['channels']
+
+    def __paginate(self, method: str, **kwargs: Any) -> Iterator[Any]:
+        """
+        Call a paginated Slack API method until every page is fetched.
+
+        :param method: name of the ``WebClient`` method
+        :param kwargs: arguments to the method
+        :return: iterator of responses, one per page
+        """
+        cursor = None
+        while True:
+            if cursor:
+                kwargs['cursor'] = cursor
+            response = self.dispatcher.call(method, **kwargs)
+            yield response
+            if not response['ok']:
+                return
+            cursor = response.get('response_metadata', {}).get('next_cursor')
+            if not cursor:
+                return
 
     def create_channel(self, channel_name):
         """
@@ -77,7 +181,8 @@ class Bot:
         """
         logging.debug("Attempting to create channel with name {}".
                       format(channel_name))
-        response = self.sc.channels_create(
+        response = self.dispatcher.call(
+            'channels_create',
             name=channel_name,
             validate=True
         )
@@ -99,15 +204,16 @@ class Bot:
         """
         Send a message to the slack bot channel, usually for webhook notifs.
 
+        The message is sent in the background, combined with any other
+        notifications sent around the same time.
+
         :param message to send to configured bot channel
         """
-        try:
-            self.send_to_channel(message, self.slack_channel, [])
-            logging.info("Webhook notif successfully sent to {} channel".
+        if self.dispatcher.post(self.slack_channel, message):
+            logging.info("Webhook notif queued for {} channel".
                          format(self.slack_channel))
-        except SlackAPIError as se:
-            logging.error("Webhook notif failed to send due to {} error.".
-                          format(se.error))
+        else:
+            logging.error("Webhook notif dropped; too many notifs queued.")
 
 
 class SlackAPIError(Exception):
@@ -0,0 +1,283 @@
+"""Rate limited dispatch of calls to the Slack API."""
+import atexit
+import logging
+import time
+
+from collections import deque
+from slack import WebClient
+from slack.errors import SlackApiError
+from threading import Condition, Lock, Thread
+from typing import Any, Callable, Deque, Dict, Hashable, List, Optional, \
+    Tuple
+
+
+class TokenBucket:
+    """
+    Token bucket that limits how often something can happen.
+
+    Callers that find the bucket empty reserve a future token and wait for
+    it, so waiting callers are served in order. All methods are thread-safe.
+    """
+
+    def __init__(self,
+                 rate: float,
+                 capacity: float,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep) -> None:
+        """
+        Initialize a full bucket.
+
+        :param rate: number of tokens added per second
+        :param capacity: maximum number of tokens in the bucket
+        :param clock: function returning the current time, in seconds
+        :param sleep: function that sleeps for a number of seconds
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.__tokens = capacity
+        self.__clock = clock
+        self.__sleep = sleep
+        self.__updated = clock()
+        self.__lock = Lock()
+
+    def acquire(self) -> float:
+        """
+        Take a token, waiting for one if the bucket is empty.
+
+        :return: number of seconds waited
+        """
+        with self.__lock:
+            self.__refill()
+            self.__tokens -= 1
+            wait = max(-self.__tokens / self.rate, 0.0)
+        if wait > 0:
+            self.__sleep(wait)
+        return wait
+
+    def pause(self, seconds: float) -> None:
+        """
+        Empty the bucket so that no token is available for a while.
+
+        :param seconds: number of seconds until the next token is available
+        """
+        with self.__lock:
+            self.__refill()
+            self.__tokens = min(self.__tokens, 1.0) - seconds * self.rate
+
+    def __refill(self) -> None:
+        """Add the tokens accumulated since the last refill."""
+        now = self.__clock()
+        self.__tokens = min(self.capacity,
+                            self.__tokens + (now - self.__updated) * self.rate)
+        self.__updated = now
+
+
+class SlackDispatcher:
+    """
+    Make Slack API calls without exceeding Slack's rate limits.
+
+    Every API method is limited to the rate of its tier, and messages are
+    limited to one per second per channel. Calls that are rate limited
+    anyway are retried once ``Retry-After`` has passed.
+
+    Messages can also be queued with :meth:`post`, in which case they are
+    sent in the background. Messages queued for a channel within
+    ``window`` seconds of the first are sent as a single message (of up to
+    ``MAX_BATCH`` lines).
+    """
+
+    # Calls per minute allowed for each of Slack's rate limit tiers
+    TIER_RATES = {1: 1, 2: 20, 3: 50, 4: 100}
+    METHOD_TIERS = {
+        'channels_create': 2,
+        'conversations_list': 2,
+        'conversations_members': 4,
+    }
+    # Tier of methods not listed in METHOD_TIERS
+    DEFAULT_TIER = 3
+    # Slack allows short bursts; allow this many seconds' worth of calls
+    TIER_BURST = 15
+    # Messages allowed per second per channel, and in a burst
+    MESSAGE_RATE = 1.0
+    MESSAGE_BURST = 3.0
+    # Maximum number of queued messages combined into one message
+    MAX_BATCH = 20
+
+    def __init__(self,
+                 sc: WebClient,
+                 max_queue: int = 1000,
+                 window: float = 2.0,
+                 max_retries: int = 3) -> None:
+        """
+        Initialize the dispatcher.
+
+        :param sc: client used to call the Slack API
+        :param max_queue: maximum number of queued messages; messages queued
+                          beyond this are dropped
+        :param window: seconds queued messages wait to be combined with
+                       other messages to the same channel
+        :param max_retries: maximum number of times a rate limited call is
+                            retried
+        """
+        self.sc = sc
+        self.max_queue = max_queue
+        self.window = window
+        self.max_retries = max_retries
+        self.sent = 0
+        self.coalesced = 0
+        self.retried = 0
+        self.dropped = 0
+        self.__buckets: Dict[Hashable, TokenBucket] = {}
+        self.__buckets_lock = Lock()
+        # Batches of messages to send, in the order they are due
+        self.__batches: Deque[Tuple[float, str, List[str]]] = deque()
+        # Most recent unsent batch for each channel
+        self.__open: Dict[str, List[str]] = {}
+        self.__depth = 0
+        self.__cond = Condition()
+        self.__worker: Optional[Thread] = None
+        self.__closed = False
+
+    def call(self, method: str, **kwargs: Any) -> Any:
+        """
+        Call a Slack API method once its rate limit allows.
+
+        :param method: name of the ``WebClient`` method
+        :param kwargs: arguments to the method
+        :return: the method's response
+        :raise SlackApiError: if the call fails for a reason other than rate
+                              limiting, or is still rate limited after
+                              ``max_retries`` retries
+        """
+        bucket = self.__bucket(method, kwargs.get('channel'))
+        for attempt in range(self.max_retries + 1):
+            bucket.acquire()
+            try:
+                return getattr(self.sc, method)(**kwargs)
+            except SlackApiError as e:
+                if e.response.status_code != 429 or \
+                        attempt == self.max_retries:
+                    raise
+                retry_after = float(e.response.headers.get('Retry-After', 1))
+                logging.warning(f"Slack rate limited {method}, retrying in "
+                                f"{retry_after}s")
+                with self.__cond:
+                    self.retried += 1
+                bucket.pause(retry_after)
+
+    def post(self, channel: str, text: str) -> bool:
+        """
+        Queue a message to be sent to a channel in the background.
+
+        :param channel: name or ID of the channel
+        :param text: text of the message
+        :return: ``True`` if the message was queued, ``False`` if it was
+                 dropped because the queue is full
+        """
+        with self.__cond:
+            if self.__depth >= self.max_queue or self.__closed:
+                self.dropped += 1
+                logging.warning(f"Slack message queue full, dropped message "
+                                f"to {channel}")
+                return False
+            texts = self.__open.get(channel)
+            if texts is not None and len(texts) < self.MAX_BATCH:
+                texts.append(text)
+                self.coalesced += 1
+            else:
+                texts = [text]
+                self.__batches.append((time.monotonic() + self.window,
+                                       channel, texts))
+                self.__open[channel] = texts
+            self.__depth += 1
+            self.__start()
+            self.__cond.notify()
+        return True
+
+    def flush(self) -> None:
+        """Send every queued message, and stop sending in the background."""
+        with self.__cond:
+            self.__closed = True
+            self.__cond.notify()
+            worker = self.__worker
+        if worker is not None:
+            worker.join()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the dispatcher's queue depth and counters.
+
+        :return: dictionary with the number of queued messages, and the
+                 number of messages sent, combined into another message,
+                 dropped, and calls retried
+        """
+        with self.__cond:
+            return {'queued': self.__depth,
+                    'sent': self.sent,
+                    'coalesced': self.coalesced,
+                    'dropped': self.dropped,
+                    'retried': self.retried}
+
+    def __bucket(self, method: str, channel: Optional[str]) -> TokenBucket:
+        """Get the token bucket limiting a method (and channel)."""
+        key: Hashable
+        if method == 'chat_postMessage':
+            key = (method, channel)
+            rate, burst = self.MESSAGE_RATE, self.MESSAGE_BURST
+        else:
+            key = method
+            tier = self.METHOD_TIERS.get(method, self.DEFAULT_TIER)
+            rate = self.TIER_RATES[tier] / 60
+            burst = max(rate * self.TIER_BURST, 1.0)
+        with self.__buckets_lock:
+            if key not in self.__buckets:
+                self.__buckets[key] = TokenBucket(rate, burst)
+            return self.__buckets[key]
+
+    def __start(self) -> None:
+        """Start the background worker, if it isn't already running."""
+        if self.__worker is None:
+            self.__worker = Thread(target=self.__run,
+                                   name='slack-dispatcher',
+                                   daemon=True)
+            self.__worker.start()
+            atexit.register(self.flush)
+
+    def __run(self) -> None:
+        """Send queued messages once their coalescing window has passed."""
+        while True:
+            with self.__cond:
+                while True:
+                    if not self.__batches:
+                        if self.__closed:
+                            return
+                        self.__cond.wait()
+                        continue
+                    deadline, channel, texts = self.__batches[0]
+                    wait = deadline - time.monotonic()
+                    if wait <= 0 or self.__closed:
+                        break
+                    self.__cond.wait(wait)
+                self.__batches.popleft()
+                if self.__open.get(channel) is texts:
+                    del self.__open[channel]
+                self.__depth -= len(texts)
+
+            try:
+                self.call('chat_postMessage',
+                          channel=channel,
+                          text='\n'.join(texts))
+                with self.__cond:
+                    self.sent += len(texts)
+            except SlackApiError as e:
+                logging.error(f"Failed to send {len(texts)} messages to "
+                              f"{channel}: {e.response.get('error')}")
+                with self.__cond:
+                    self.dropped += len(texts)
+            except Exception:
+                # E.g. a connection error; the worker must keep running, or
+                # every message posted from now on would never be sent
+                logging.exception(f"Failed to send {len(texts)} messages to "
+                                  f"{channel}")
+                with self.__cond:
+                    self.dropped += len(texts)
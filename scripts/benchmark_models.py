@@ -0,0 +1,103 @@
+"""
+Benchmark converting models to and from dictionaries.
+
+Usage: python3 scripts/benchmark_models.py [number of items]
+
+Simulates reading a full table scan of users, teams and projects (100000 of
+each by default) with ``from_dict``, and writing them back with ``to_dict``.
+Prints the best time taken per item, and the memory held by the created models.
+Run it from the root of the repository, before and after changing a model, to
+compare.
+"""
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.model import User, Team, Project  # noqa: E402
+
+# Number of times each conversion is timed; the fastest time is reported
+REPEAT = 3
+
+
+def user_item(i):
+    """Return a stored user, as returned by a scan."""
+    return {
+        'slack_id': f'U{i:08}',
+        'permission_level': 'member',
+        'email': f'user{i}@ubclaunchpad.com',
+        'name': f'User {i}',
+        'github': f'user{i}',
+        'github_user_id': str(1000000 + i),
+        'major': 'Computer Science',
+        'bio': 'Launch Pad member',
+        'karma': i % 50 + 1
+    }
+
+
+def team_item(i):
+    """Return a stored team, as returned by a scan."""
+    return {
+        'github_team_id': str(2000000 + i),
+        'github_team_name': f'team{i}',
+        'display_name': f'Team {i}',
+        'platform': 'slack',
+        'members': {str(1000000 + (i + j) % 1000) for j in range(20)},
+        'team_leads': {str(1000000 + i % 1000)}
+    }
+
+
+def project_item(i):
+    """Return a stored project, as returned by a scan."""
+    return {
+        'project_id': f'{i:08}-0000-4000-8000-000000000000',
+        'github_team_id': str(2000000 + i),
+        'github_urls': [f'https://github.com/ubclaunchpad/project{i}'],
+        'display_name': f'Project {i}',
+        'short_description': 'A project',
+        'long_description': 'A project built by a team at Launch Pad. ' * 5,
+        'tags': ['python', 'slack']
+    }
+
+
+def benchmark(Model, items):
+    """Time converting items to models and back, and measure the models."""
+    read = write = float('inf')
+    for _ in range(REPEAT):
+        gc.collect()
+        start = time.perf_counter()
+        models = [Model.from_dict(item) for item in items]
+        read = min(read, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for model in models:
+            Model.to_dict(model)
+        write = min(write, time.perf_counter() - start)
+        del models
+
+    tracemalloc.start()
+    models = [Model.from_dict(item) for item in items]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del models
+
+    n = len(items)
+    print(f'{Model.__name__:<8} from_dict {read / n * 1e6:6.2f} us/item  '
+          f'to_dict {write / n * 1e6:6.2f} us/item  '
+          f'{size / n:7.0f} bytes/model')
+
+
+def main():
+    """Run the benchmark."""
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print(f'Converting {n} items of each model')
+    benchmark(User, [user_item(i) for i in range(n)])
+    benchmark(Team, [team_item(i) for i in range(n)])
+    benchmark(Project, [project_item(i) for i in range(n)])
+
+
+if __name__ == '__main__':
+    main()
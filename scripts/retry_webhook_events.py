@@ -0,0 +1,38 @@
+"""
+List or retry Github webhook events that failed repeatedly (dead letters).
+
+Usage: python3 scripts/retry_webhook_events.py <queue database> [--retry]
+
+Prints every dead letter in the database configured by
+``GITHUB_WEBHOOK_QUEUE_DB``, with the error it last failed with. With
+``--retry``, the dead letters are moved back to the pending events; they are
+then handled by the next rocket worker process to start, so restart rocket
+once the cause of the failures has been fixed. Run it from the root of the
+repository.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.controller.webhook.github.queue import SQLiteEventStore  # noqa: E402
+
+
+def main():
+    """List, and optionally retry, the dead letters."""
+    if len(sys.argv) not in (2, 3) or sys.argv[2:] not in ([], ['--retry']):
+        print(f'{sys.argv[0]} <queue database> [--retry]')
+        sys.exit(1)
+    store = SQLiteEventStore(sys.argv[1])
+    dead_letters = store.dead_letters()
+    for event_id, event, error in dead_letters:
+        print(f"{event_id}: {event['event']} "
+              f"{event['payload'].get('action')}: {error}")
+    if sys.argv[2:] == ['--retry']:
+        for event_id, _, _ in dead_letters:
+            store.revive(event_id)
+        print(f'Retrying {len(dead_letters)} events once rocket restarts')
+
+
+if __name__ == '__main__':
+    main()
@@ -34,7 +34,8 @@ class MentionCommandTest(TestCase):
         resp, code = self.testcommand.handle('karma view UFJ42EU67', user_id)
         self.assertIn('15', resp)
         self.assertEqual(code, 200)
-        self.mock_facade.retrieve.assert_called_once_with(User, "UFJ42EU67")
+        self.mock_facade.retrieve.assert_called_once_with(User, "UFJ42EU67",
+                                                          cached=True)
 
     def test_handle_view_lookup_error(self):
         """Test karma command view handle with user not in database."""
@@ -43,7 +44,8 @@ class MentionCommandTest(TestCase):
         self.mock_facade.retrieve.side_effect = LookupError
         self.assertTupleEqual(self.testcommand.handle(command, user_id),
                               (KarmaCommand.lookup_error, 200))
-        self.mock_facade.retrieve.assert_called_once_with(User, "ABCDE8FA9")
+        self.mock_facade.retrieve.assert_called_once_with(User, "ABCDE8FA9",
+                                                          cached=True)
 
     def test_handle_reset_as_admin(self):
         """Test karma command resets all users."""
@@ -54,15 +56,19 @@ class MentionCommandTest(TestCase):
         user_b = User("YYYY1234")
         user_a.karma = 2019
         user_b.karma = 2048
-        self.mock_facade.query.return_value = [user_a, user_b]
+        self.mock_facade.query_iter.return_value = iter([user_a, user_b])
         with self.app.app_context():
             resp, code = self.testcommand.handle(
                 "karma reset --all", "ABCDEFG2F")
             self.assertEqual(code, 200)
-        store_calls = [mock.call(user_a), mock.call(user_b)]
-        self.mock_facade.query.assert_called_once_with(User, [])
-        self.mock_facade.retrieve.assert_called_once_with(User, "ABCDEFG2F")
-        self.mock_facade.store.assert_has_calls(store_calls)
+        self.mock_facade.query_iter.assert_called_once_with(User)
+        self.mock_facade.retrieve.assert_called_once_with(User, "ABCDEFG2F",
+                                                          cached=True)
+        stored = list(self.mock_facade.bulk_store.call_args[0][0])
+        self.assertListEqual(stored, [user_a, user_b])
+        self.assertEqual(user_a.karma, KarmaCommand.karma_default_amount)
+        self.assertEqual(user_b.karma, KarmaCommand.karma_default_amount)
+        self.mock_facade.store.assert_not_called()
 
     def test_handle_reset_not_as_admin(self):
         """Test karma command resets all users."""
@@ -81,12 +87,17 @@ class MentionCommandTest(TestCase):
         user = User("ABCDEFG2F")
         destuser = User("MMMM1234")
         user.permissions_level = Permissions.admin
-        self.mock_facade.retrieve.side_effect = [user, destuser]
-        self.testcommand.handle("karma set MMMM1234 10", "ABCDEFG2F")
-        retrieve_calls = [mock.call(User, "ABCDEFG2F"),
-                          mock.call(User, "MMMM1234")]
-        self.mock_facade.retrieve.assert_has_calls(retrieve_calls)
-        self.mock_facade.store.assert_called_once_with(destuser)
+        destuser.name = "Dest"
+        self.mock_facade.retrieve.return_value = user
+        self.mock_facade.update.return_value = destuser
+        self.assertEqual(self.testcommand.handle("karma set MMMM1234 10",
+                                                 "ABCDEFG2F"),
+                         ("set Dest's karma to 10", 200))
+        self.mock_facade.retrieve.assert_called_once_with(User, "ABCDEFG2F",
+                                                          cached=True)
+        self.mock_facade.update.assert_called_once_with(
+            User, "MMMM1234", set_values={'karma': 10})
+        self.mock_facade.store.assert_not_called()
 
     def test_handle_set_as_non_admin(self):
         """Test setting karma as non admin."""
@@ -97,17 +108,18 @@ class MentionCommandTest(TestCase):
         self.assertEqual(self.testcommand.handle("karma set MMMM1234 10",
                                                  "ABCDEFG2F"),
                          (KarmaCommand.permission_error, 200))
-        self.mock_facade.retrieve.assert_called_once_with(User, "ABCDEFG2F")
+        self.mock_facade.retrieve.assert_called_once_with(User, "ABCDEFG2F",
+                                                          cached=True)
 
     def test_handle_set_lookup_error(self):
         """Test setting karma with lookup error."""
         user = User("ABCDEFG2F")
         user.permissions_level = Permissions.admin
-        self.mock_facade.retrieve.side_effect = [user, LookupError]
+        self.mock_facade.retrieve.return_value = user
+        self.mock_facade.update.side_effect = LookupError
         self.assertEqual(self.testcommand.handle("karma set MMMM1234 10",
                                                  "ABCDEFG2F"),
                          (KarmaCommand.lookup_error, 200))
-        retrieve_calls = [mock.call(User, "ABCDEFG2F"),
-                          mock.call(User, "MMMM1234")]
-        self.mock_facade.retrieve.assert_has_calls(retrieve_calls)
-        self.mock_facade.store.asser_not_called()
+        self.mock_facade.retrieve.assert_called_once_with(User, "ABCDEFG2F",
+                                                          cached=True)
+        self.mock_facade.store.assert_not_called()
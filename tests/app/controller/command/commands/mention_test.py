@@ -33,13 +33,13 @@ class MentionCommandTest(TestCase):
         reciever = User('U123456789')
         reciever.name = 'U123456789'
         giver = 'UFJ42EU67'
-        reciever_initial_karma = reciever.karma
-        self.mock_facade.retrieve.return_value = reciever
+        self.mock_facade.update.return_value = reciever
         self.assertEqual(self.testcommand.handle("U123456789 ++", giver),
                          ("gave 1 karma to U123456789", 200))
-        self.mock_facade.retrieve.assert_called_once_with(User, 'U123456789')
-        self.assertEqual(reciever.karma, reciever_initial_karma +
-                         self.testcommand.karma_add_amount)
+        self.mock_facade.update.assert_called_once_with(
+            User, 'U123456789', add={'karma': 1})
+        self.mock_facade.retrieve.assert_not_called()
+        self.mock_facade.store.assert_not_called()
 
     def test_handle_add_karma_to_self(self):
         """Test handle command with karma to self."""
@@ -49,6 +49,6 @@ class MentionCommandTest(TestCase):
 
     def test_handle_user_not_found(self):
         """Test handle command with karma to unknown user."""
-        self.mock_facade.retrieve.side_effect = LookupError
+        self.mock_facade.update.side_effect = LookupError
         self.assertEqual(self.testcommand.handle(f"{user2} ++", user1),
                          (self.testcommand.lookup_error, 200))
@@ -235,7 +235,8 @@ class TestProjectCommand(TestCase):
                 "1 : GTID2 : project2\n"
             self.assertEqual(resp, expect)
             self.assertEqual(code, 200)
-        self.mock_facade.query.assert_called_once_with(Project)
+        self.mock_facade.query.assert_called_once_with(
+            Project, fields=['display_name'])
 
     def test_handle_list_no_teams(self):
         """Test project command list with no projects found."""
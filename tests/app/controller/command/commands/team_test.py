@@ -81,7 +81,7 @@ class TestTeamCommand(TestCase):
         """Test team command list parser."""
         team = Team("BRS", "brs", "web")
         team2 = Team("OTEAM", "other team", "android")
-        self.db.query.return_value = [team, team2]
+        self.db.query_iter.return_value = iter([team, team2])
         attach = team.get_basic_attachment()
         attach2 = team2.get_basic_attachment()
         attachment = [attach, attach2]
@@ -90,11 +90,12 @@ class TestTeamCommand(TestCase):
             expect = {'attachments': attachment}
             self.assertDictEqual(resp, expect)
             self.assertEqual(code, 200)
-        self.db.query.assert_called_once_with(Team)
+        self.db.query_iter.assert_called_once_with(
+            Team, fields=['display_name', 'platform'])
 
     def test_handle_list_no_teams(self):
         """Test team command list with no teams found."""
-        self.db.query.return_value = []
+        self.db.query_iter.return_value = iter([])
         self.assertTupleEqual(self.testcommand.handle("team list", user),
                               ("No Teams Exist!", 200))
 
@@ -177,20 +178,61 @@ class TestTeamCommand(TestCase):
         self.gh.add_team_member.assert_called_with('githubuser', 'team_id')
         inputstring += " --channel 'channelID'"
         outputstring += "added channel, "
+        summary = "\nAdded 2 of 2 channel members on GitHub."
         self.sc.get_channel_users.return_value = ['someID', 'otherID']
+        some_user = User('someID')
+        some_user.github_username = 'some'
+        other_user = User('otherID')
+        other_user.github_username = 'other'
+        self.db.bulk_retrieve.return_value = [some_user, other_user]
+        self.gh.add_team_members.return_value = {}
         self.assertTupleEqual(self.testcommand.handle(inputstring, user),
-                              (outputstring, 200))
+                              (outputstring + summary, 200))
         self.sc.get_channel_users.assert_called_once_with("channelID")
-        self.db.retrieve.assert_called_with(User, 'otherID')
-        self.gh.add_team_member.assert_called()
+        self.db.bulk_retrieve.assert_called_with(User, ['someID', 'otherID'])
+        self.gh.add_team_members.assert_called_with(
+            ['some', 'other'], 'team_id', mock.ANY)
         inputstring += " --lead 'someID'"
         outputstring += "added lead"
         self.gh.has_team_member.return_value = False
-        print(self.testcommand.handle(inputstring, user))
         self.assertTupleEqual(self.testcommand.handle(inputstring, user),
-                              (outputstring, 200))
+                              (outputstring + summary, 200))
         self.db.store.assert_called()
 
+    def test_handle_create_channel_failures(self):
+        """Test creating a team from a channel when some adds fail."""
+        test_user = User("userid")
+        test_user.permissions_level = Permissions.admin
+        self.db.retrieve.return_value = test_user
+        self.gh.org_create_team.return_value = "team_id"
+        self.sc.get_channel_users.return_value = \
+            [f'U{i}' for i in range(10)]
+        members = []
+        for i in range(9):
+            member = User(f'U{i}')
+            member.github_username = f'gh{i}'
+            member.github_id = str(i)
+            members.append(member)
+        self.db.bulk_retrieve.return_value = members
+
+        def add_team_members(usernames, team_id, done):
+            for username in usernames:
+                done(username, "error" if username == 'gh4' else None)
+            return {'gh4': "error"}
+        self.gh.add_team_members.side_effect = add_team_members
+        # Failing to post progress doesn't stop members from being added
+        progress = mock.MagicMock(side_effect=ConnectionError)
+
+        resp, code = self.testcommand.handle(
+            "team create b-s --channel 'C1'", user, progress)
+        self.assertIn("Added 8 of 9 channel members on GitHub.", resp)
+        self.assertIn("1 channel members aren't registered", resp)
+        self.assertIn("Failed to add: gh4.", resp)
+        self.assertEqual(progress.call_count, 3)
+        stored_team = self.db.store.call_args[0][0]
+        self.assertNotIn('4', stored_team.members)
+        self.assertIn('8', stored_team.members)
+
     def test_handle_create_not_admin(self):
         """Test team command create parser with improper permission."""
         test_user = User("userid")
@@ -570,6 +612,8 @@ class TestTeamCommand(TestCase):
             self.assertDictEqual(resp, expect)
             self.assertEqual(code, 200)
         self.db.query.assert_called_once_with(Team)
+        self.db.bulk_store.assert_called_once_with([team])
+        self.db.store.assert_not_called()
 
     def test_handle_refresh_addition_and_deletion(self):
         """Test team command refresh parser if local differs from github."""
@@ -595,3 +639,4 @@ class TestTeamCommand(TestCase):
             self.assertDictEqual(resp, expect)
             self.assertEqual(code, 200)
         self.db.query.assert_called_once_with(Team)
+        self.db.bulk_store.assert_called_once_with([team])
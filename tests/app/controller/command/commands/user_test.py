@@ -1,6 +1,6 @@
 """Test user command parsing."""
 from app.controller.command.commands import UserCommand
-from db import DBFacade
+from db import ConditionFailedError, DBFacade
 from flask import Flask
 from interface.github import GithubInterface, GithubAPIException
 from app.model import User, Permissions
@@ -54,24 +54,24 @@ class TestUserCommand(TestCase):
         """Test user command add method."""
         user_id = "U0G9QF9C6"
         user = User(user_id)
-        lookup_error = LookupError(f'User "{user_id}" not found')
-        self.mock_facade.retrieve.side_effect = lookup_error
         self.assertTupleEqual(self.testcommand.handle('user add', user_id),
                               ('User added!', 200))
-        self.mock_facade.store.assert_called_once_with(user)
+        self.mock_facade.store.assert_called_once_with(user,
+                                                       if_not_exists=True)
+        self.mock_facade.retrieve.assert_not_called()
 
     def test_handle_add_no_overwriting(self):
         """Test user command add method when user exists in db."""
         user_id = "U0G9QF9C6"
         user = User(user_id)
-        self.mock_facade.retrieve.return_value = user
+        self.mock_facade.store.side_effect = ConditionFailedError
 
-        # Since the user exists, we don't call store_user()
+        # Since the user exists, the conditional store fails
         err_msg = 'User already exists; to overwrite user, add `-f`'
         resp = self.testcommand.handle('user add', user_id)
         self.assertTupleEqual(resp, (err_msg, 200))
-        self.mock_facade.retrieve.assert_called_once_with(User, user_id)
-        self.mock_facade.store.assert_not_called()
+        self.mock_facade.store.assert_called_once_with(user,
+                                                       if_not_exists=True)
 
     def test_handle_add_overwriting(self):
         """Test user command add method when user exists in db."""
@@ -81,9 +81,9 @@ class TestUserCommand(TestCase):
         user2 = User(user2_id)
 
         self.testcommand.handle('user add -f', user_id)
-        self.mock_facade.store.assert_called_with(user)
+        self.mock_facade.store.assert_called_with(user, if_not_exists=False)
         self.testcommand.handle('user add --force', user2_id)
-        self.mock_facade.store.assert_called_with(user2)
+        self.mock_facade.store.assert_called_with(user2, if_not_exists=False)
         self.mock_facade.retrieve.assert_not_called()
 
     def test_handle_view(self):
@@ -98,7 +98,8 @@ class TestUserCommand(TestCase):
             expect = {'attachments': user_attaches}
             self.assertDictEqual(resp, expect)
             self.assertEqual(code, 200)
-        self.mock_facade.retrieve.assert_called_once_with(User, "U0G9QF9C6")
+        self.mock_facade.retrieve.assert_called_once_with(User, "U0G9QF9C6",
+                                                          cached=True)
 
     def test_handle_view_other_user(self):
         """Test user command view handle with slack-id parameter."""
@@ -114,7 +115,7 @@ class TestUserCommand(TestCase):
             self.assertDictEqual(resp, expect)
             self.assertEqual(code, 200)
         self.mock_facade.retrieve. \
-            assert_called_once_with(User, "ABCDE8FA9")
+            assert_called_once_with(User, "ABCDE8FA9", cached=True)
 
     def test_handle_view_lookup_error(self):
         """Test user command view handle with user not in database."""
@@ -123,7 +124,8 @@ class TestUserCommand(TestCase):
         self.mock_facade.retrieve.side_effect = LookupError
         self.assertTupleEqual(self.testcommand.handle(command, user_id),
                               (UserCommand.lookup_error, 200))
-        self.mock_facade.retrieve.assert_called_once_with(User, "ABCDE8FA9")
+        self.mock_facade.retrieve.assert_called_once_with(User, "ABCDE8FA9",
+                                                          cached=True)
 
     def test_handle_help(self):
         """Test user command help parser."""
@@ -139,7 +141,8 @@ class TestUserCommand(TestCase):
         self.assertEqual(self.testcommand.handle("user delete U0G9QF9C6",
                                                  "ABCDEFG2F"),
                          (message, 200))
-        self.mock_facade.retrieve.assert_called_once_with(User, "ABCDEFG2F")
+        self.mock_facade.retrieve.assert_called_once_with(User, "ABCDEFG2F",
+                                                          cached=True)
         self.mock_facade.delete.assert_called_once_with(User, "U0G9QF9C6")
 
     def test_handle_delete_not_admin(self):
@@ -150,7 +153,8 @@ class TestUserCommand(TestCase):
         self.assertEqual(self.testcommand.handle("user delete U0G9QF9C6",
                                                  "ABCDEFG2F"),
                          (UserCommand.permission_error, 200))
-        self.mock_facade.retrieve.assert_called_once_with(User, "ABCDEFG2F")
+        self.mock_facade.retrieve.assert_called_once_with(User, "ABCDEFG2F",
+                                                          cached=True)
         self.mock_facade.delete.assert_not_called()
 
     def test_handle_delete_lookup_error(self):
@@ -162,7 +166,8 @@ class TestUserCommand(TestCase):
         self.assertEqual(self.testcommand.handle("user delete U0G9QF9C6",
                                                  "ABCDEFG2F"),
                          (UserCommand.lookup_error, 200))
-        self.mock_facade.retrieve.assert_called_once_with(User, "ABCDEFG2F")
+        self.mock_facade.retrieve.assert_called_once_with(User, "ABCDEFG2F",
+                                                          cached=True)
         self.mock_facade.delete.assert_called_once_with(User, "U0G9QF9C6")
 
     def test_handle_edit_name(self):
@@ -262,7 +267,8 @@ class TestUserCommand(TestCase):
             " --bio 'Im a human'",
             "U0G9QF9C6"),
             (UserCommand.permission_error, 200))
-        self.mock_facade.retrieve.assert_called_once_with(User, "U0G9QF9C6")
+        self.mock_facade.retrieve.assert_called_once_with(User, "U0G9QF9C6",
+                                                          cached=True)
         self.mock_facade.store.assert_not_called()
 
     def test_handle_edit_make_admin(self):
@@ -311,7 +317,8 @@ class TestUserCommand(TestCase):
             " --bio 'Im a human'",
             "U0G9QF9C6"),
             (UserCommand.lookup_error, 200))
-        self.mock_facade.retrieve.assert_called_once_with(User, "U0G9QF9C6")
+        self.mock_facade.retrieve.assert_called_once_with(User, "U0G9QF9C6",
+                                                          cached=True)
         self.mock_facade.store.assert_not_called()
 
     def test_handle_edit_lookup_error(self):
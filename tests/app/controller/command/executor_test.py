@@ -0,0 +1,51 @@
+"""Test the command executor."""
+from app.controller.command import CommandExecutor, CommandParser
+from threading import Event
+from unittest import mock
+
+
+def make_executor(workers, queue_size):
+    """Make an executor whose commands block until released."""
+    release = Event()
+    parser = mock.MagicMock(CommandParser)
+    parser.get_command_name.side_effect = lambda txt: txt.split(' ', 1)[0]
+    parser.handle_app_command.side_effect = \
+        lambda txt, user, url: release.wait(5)
+    return CommandExecutor(parser, workers, queue_size), parser, release
+
+
+def test_submit_runs_command():
+    """Test that submitted commands are handed to the parser."""
+    executor, parser, release = make_executor(2, 2)
+    release.set()
+    assert executor.submit('team list', 'U123', 'url') == ('', 200)
+    executor.shutdown()
+    parser.handle_app_command.assert_called_once_with('team list',
+                                                      'U123', 'url')
+    stats = executor.stats()
+    assert stats['team']['count'] == 1
+
+
+def test_submit_queues_and_rejects():
+    """Test that commands queue once workers are busy, then are rejected."""
+    executor, parser, release = make_executor(1, 1)
+    assert executor.submit('team list', 'U123', 'url') == ('', 200)
+    assert executor.submit('user view', 'U123', 'url') == \
+        (CommandExecutor.queued_reply, 200)
+    assert executor.submit('karma view', 'U123', 'url') == \
+        (CommandExecutor.full_reply, 200)
+    release.set()
+    executor.shutdown()
+    assert parser.handle_app_command.call_count == 2
+    assert set(executor.stats().keys()) == {'team', 'user'}
+
+
+def test_failed_command_frees_worker():
+    """Test that a command raising an exception doesn't leak its slot."""
+    executor, parser, release = make_executor(1, 0)
+    parser.handle_app_command.side_effect = RuntimeError
+    executor.submit('team list', 'U123', 'url')
+    executor.shutdown()
+    stats = executor.stats()
+    assert stats['team']['count'] == 1
+    assert stats['team']['exec_max'] >= 0
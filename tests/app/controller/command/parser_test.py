@@ -85,7 +85,7 @@ def test_handle_user_command(mock_usercommand):
     parser.handle_app_command('user name', 'U061F7AUR', '')
     mock_usercommand. \
         return_value.handle. \
-        assert_called_once_with("user name", "U061F7AUR")
+        assert_called_once_with("user name", "U061F7AUR", None)
 
 
 @mock.patch('app.controller.command.parser.MentionCommand')
@@ -100,4 +100,55 @@ def test_handle_mention_command(mock_mentioncommand):
     mock_mentioncommand
     mock_mentioncommand. \
         return_value.handle. \
-        assert_called_once_with('U061F7AUR ++', 'UFJ42EU67')
+        assert_called_once_with('U061F7AUR ++', 'UFJ42EU67', None)
+
+
+def test_get_command_name():
+    """Test getting the name of the command a call would run."""
+    mock_facade = mock.MagicMock(DBFacade)
+    mock_bot = mock.MagicMock(Bot)
+    mock_gh = mock.MagicMock(GithubInterface)
+    mock_token_config = TokenCommandConfig(datetime.utcnow(), '')
+    parser = CommandParser(mock_facade, mock_bot, mock_gh, mock_token_config)
+    assert parser.get_command_name('team list') == 'team'
+    assert parser.get_command_name('<@U061F7AUR|ID> ++') == 'mention'
+    assert parser.get_command_name('hello world') == 'help'
+
+
+def test_handle_app_command_posts_with_session():
+    """Test that responses are posted through the given session."""
+    mock_facade = mock.MagicMock(DBFacade)
+    mock_bot = mock.MagicMock(Bot)
+    mock_gh = mock.MagicMock(GithubInterface)
+    mock_session = mock.MagicMock()
+    mock_token_config = TokenCommandConfig(datetime.utcnow(), '')
+    parser = CommandParser(mock_facade, mock_bot, mock_gh, mock_token_config,
+                           mock_session)
+    with Flask(__name__).app_context():
+        parser.handle_app_command('hello world', 'U061F7AUR',
+                                  'https://hooks.slack.com/commands/1')
+    mock_session.post.assert_called_once()
+    assert mock_session.post.call_args[1]['url'] == \
+        'https://hooks.slack.com/commands/1'
+
+
+@mock.patch('app.controller.command.parser.TeamCommand')
+def test_handle_command_progress(mock_teamcommand):
+    """Test that commands can post progress to the response URL."""
+    mock_facade = mock.MagicMock(DBFacade)
+    mock_bot = mock.MagicMock(Bot)
+    mock_gh = mock.MagicMock(GithubInterface)
+    mock_session = mock.MagicMock()
+    mock_token_config = TokenCommandConfig(datetime.utcnow(), '')
+    mock_teamcommand.return_value.handle.return_value = ('done', 200)
+    parser = CommandParser(mock_facade, mock_bot, mock_gh, mock_token_config,
+                           mock_session)
+    parser.handle_app_command('team create b-s --channel C1', 'U061F7AUR',
+                              'https://hooks.slack.com/commands/1')
+    args = mock_teamcommand.return_value.handle.call_args[0]
+    assert args[:2] == ('team create b-s --channel C1', 'U061F7AUR')
+    mock_session.post.assert_called_once_with(
+        url='https://hooks.slack.com/commands/1', json={'text': 'done'})
+    args[2]('halfway')
+    mock_session.post.assert_called_with(
+        url='https://hooks.slack.com/commands/1', json={'text': 'halfway'})
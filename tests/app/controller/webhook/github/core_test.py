@@ -1,7 +1,14 @@
 """Test the GitHub webhook handler."""
+import pytest
+
 from db import DBFacade
 from unittest import mock
 from app.controller.webhook.github import GitHubWebhookHandler
+from app.controller.webhook.github.deliveries import DeliveryLog
+from app.controller.webhook.github.events import GitHubEventHandler, \
+    register_handler, registered_handlers
+from app.controller.webhook.github.events import base
+from app.controller.webhook.github.queue import WebhookQueue
 
 
 @mock.patch('config.Config')
@@ -37,7 +44,7 @@ def test_verify_incorrect_hash(mock_hmac_new, mock_logging, config):
 @mock.patch('app.controller.webhook.github.'
             'core.GitHubWebhookHandler.verify_hash')
 @mock.patch('app.controller.webhook.github.'
-            'core.OrganizationEventHandler.handle')
+            'events.OrganizationEventHandler.handle')
 def test_verify_and_handle_org_event(mock_handle_org_event, mock_verify_hash,
                                      config):
     """Test that the handle function can handle organization events."""
@@ -56,7 +63,7 @@ def test_verify_and_handle_org_event(mock_handle_org_event, mock_verify_hash,
 @mock.patch('app.controller.webhook.github.'
             'core.GitHubWebhookHandler.verify_hash')
 @mock.patch('app.controller.webhook.github.'
-            'core.TeamEventHandler.handle')
+            'events.TeamEventHandler.handle')
 def test_verify_and_handle_team_event(mock_handle_team_event,
                                       mock_verify_hash,
                                       config):
@@ -79,7 +86,7 @@ def test_verify_and_handle_team_event(mock_handle_team_event,
 @mock.patch('app.controller.webhook.github.'
             'core.GitHubWebhookHandler.verify_hash')
 @mock.patch('app.controller.webhook.github.'
-            'core.MembershipEventHandler.handle')
+            'events.MembershipEventHandler.handle')
 def test_verify_and_handle_membership_event(mock_handle_mem_event,
                                             mock_verify_hash,
                                             config):
@@ -119,3 +126,188 @@ def test_handle_unverified_event(mock_verify_hash, config):
     rsp, code = webhook_handler.handle(None, None, {"action": "member_added"})
     assert rsp == "Hashed signature is not valid"
     assert code == 403
+
+
+@mock.patch('config.Config')
+@mock.patch('app.controller.webhook.github.'
+            'core.GitHubWebhookHandler.verify_hash')
+def test_handle_queued_event(mock_verify_hash, config):
+    """Test that events are queued and acknowledged if there is a queue."""
+    mock_verify_hash.return_value = True
+    mock_facade = mock.MagicMock(DBFacade)
+    mock_queue = mock.MagicMock(WebhookQueue)
+    webhook_handler = GitHubWebhookHandler(mock_facade, config, mock_queue)
+    mock_queue.start.assert_called_once_with(webhook_handler.handle_payload)
+
+    payload = {"action": "member_added"}
+    rsp, code = webhook_handler.handle(None, None, payload)
+    assert rsp == "Webhook queued"
+    assert code == 202
+    mock_queue.submit.assert_called_once_with(payload, "organization")
+
+    rsp, code = webhook_handler.handle(None, None, {"action": ""})
+    assert code == 500
+    mock_queue.submit.assert_called_once()
+
+    mock_verify_hash.return_value = False
+    rsp, code = webhook_handler.handle(None, None, payload)
+    assert code == 403
+    mock_queue.submit.assert_called_once()
+
+
+@mock.patch('config.Config')
+@mock.patch('app.controller.webhook.github.'
+            'core.GitHubWebhookHandler.verify_hash')
+@mock.patch('app.controller.webhook.github.'
+            'events.OrganizationEventHandler.handle')
+def test_handle_duplicate_delivery(mock_handle_org_event, mock_verify_hash,
+                                   config):
+    """Test that redelivered events are only handled once."""
+    mock_verify_hash.return_value = True
+    mock_handle_org_event.return_value = ("rsp", 200)
+    mock_facade = mock.MagicMock(DBFacade)
+    deliveries = DeliveryLog(16, 60)
+    webhook_handler = GitHubWebhookHandler(mock_facade, config,
+                                           deliveries=deliveries)
+    payload = {"action": "member_added"}
+    assert webhook_handler.handle(None, None, payload, "abc") == ("rsp", 200)
+    assert webhook_handler.handle(None, None, payload, "abc") == ("rsp", 200)
+    assert mock_handle_org_event.call_count == 1
+
+    webhook_handler.handle(None, None, payload, "def")
+    webhook_handler.handle(None, None, payload)
+    webhook_handler.handle(None, None, payload)
+    assert mock_handle_org_event.call_count == 4
+
+    mock_verify_hash.return_value = False
+    rsp, code = webhook_handler.handle(None, None, payload, "abc")
+    assert code == 403
+
+
+@mock.patch('config.Config')
+@mock.patch('app.controller.webhook.github.'
+            'core.GitHubWebhookHandler.verify_hash')
+@mock.patch('app.controller.webhook.github.'
+            'events.OrganizationEventHandler.handle')
+def test_handle_failed_delivery(mock_handle_org_event, mock_verify_hash,
+                                config):
+    """Test that deliveries which fail to be handled can be redelivered."""
+    mock_verify_hash.return_value = True
+    mock_handle_org_event.side_effect = [RuntimeError("boom"), ("rsp", 200)]
+    mock_facade = mock.MagicMock(DBFacade)
+    deliveries = DeliveryLog(16, 60)
+    webhook_handler = GitHubWebhookHandler(mock_facade, config,
+                                           deliveries=deliveries)
+    payload = {"action": "member_added"}
+    with pytest.raises(RuntimeError):
+        webhook_handler.handle(None, None, payload, "abc")
+    assert webhook_handler.handle(None, None, payload, "abc") == ("rsp", 200)
+    assert mock_handle_org_event.call_count == 2
+
+
+@mock.patch('config.Config')
+@mock.patch('app.controller.webhook.github.'
+            'core.GitHubWebhookHandler.verify_hash')
+@mock.patch('app.controller.webhook.github.'
+            'events.MembershipEventHandler.handle')
+def test_route_by_event_type(mock_handle_mem_event, mock_verify_hash,
+                             config):
+    """Test that events are routed by their type and action."""
+    mock_verify_hash.return_value = True
+    mock_handle_mem_event.return_value = ("rsp", 200)
+    mock_facade = mock.MagicMock(DBFacade)
+    webhook_handler = GitHubWebhookHandler(mock_facade, config)
+    payload = {"action": "added"}
+
+    assert webhook_handler.get_route(payload, "membership") == \
+        ("membership", "added")
+    assert webhook_handler.get_route(payload) == ("membership", "added")
+    assert webhook_handler.get_route(payload, "team") is None
+
+    rsp, code = webhook_handler.handle(None, None, payload, None, "team")
+    assert code == 500
+    mock_handle_mem_event.assert_not_called()
+    rsp, code = webhook_handler.handle(None, None, payload, None,
+                                       "membership")
+    assert (rsp, code) == ("rsp", 200)
+
+    mock_handle_mem_event.side_effect = LookupError
+    with pytest.raises(LookupError):
+        webhook_handler.handle(None, None, payload, None, "membership")
+    stats = webhook_handler.route_stats()["membership.added"]
+    assert stats["count"] == 2
+    assert stats["errors"] == 1
+    assert stats["time_avg"] <= stats["time_max"]
+    assert webhook_handler.route_stats()["team.created"]["count"] == 0
+
+
+@mock.patch('config.Config')
+def test_add_handler(config):
+    """Test that handlers can be added for more events."""
+    mock_facade = mock.MagicMock(DBFacade)
+    webhook_handler = GitHubWebhookHandler(mock_facade, config)
+    event_handler = mock.MagicMock(GitHubEventHandler)
+    event_handler.handle.return_value = ("pong", 200)
+    webhook_handler.add_handler(event_handler, "ping", ["ping"])
+    assert webhook_handler.handle_payload({"action": "ping"}, "ping") == \
+        ("pong", 200)
+
+    event_handler.event_type = "team"
+    event_handler.supported_action_list = ["created"]
+    webhook_handler.add_handler(event_handler)
+    webhook_handler.handle_payload({"action": "created"}, "team")
+    assert event_handler.handle.call_count == 2
+
+
+def test_register_handler():
+    """Test that registered handler classes are used by new handlers."""
+    class PingEventHandler(GitHubEventHandler):
+        """Handle ping events."""
+
+        event_type = "ping"
+        supported_action_list = ["ping"]
+
+        def handle(self, payload):
+            """Answer the ping."""
+            return "pong", 200
+
+    assert register_handler(PingEventHandler) is PingEventHandler
+    try:
+        webhook_handler = GitHubWebhookHandler(mock.MagicMock(DBFacade),
+                                               mock.MagicMock())
+        assert webhook_handler.handle_payload({"action": "ping"}, "ping") \
+            == ("pong", 200)
+    finally:
+        base._handler_classes.remove(PingEventHandler)
+
+
+@mock.patch('config.Config')
+def test_queued_handlers_write_right_away(config):
+    """Test that handlers only buffer writes if there is no queue."""
+    buffered = []
+
+    class PingEventHandler(GitHubEventHandler):
+        """Record whether writes are buffered."""
+
+        event_type = "ping"
+        supported_action_list = ["ping"]
+
+        def __init__(self, db_facade, buffer_writes=True):
+            """Record whether writes are buffered."""
+            super().__init__(db_facade, buffer_writes)
+            buffered.append(buffer_writes)
+
+        def handle(self, payload):
+            """Answer the ping."""
+            return "pong", 200
+
+    register_handler(PingEventHandler)
+    try:
+        mock_facade = mock.MagicMock(DBFacade)
+        GitHubWebhookHandler(mock_facade, config)
+        GitHubWebhookHandler(mock_facade, config,
+                             mock.MagicMock(WebhookQueue))
+    finally:
+        base._handler_classes.remove(PingEventHandler)
+    assert buffered == [True, False]
+    assert PingEventHandler not in registered_handlers()
@@ -0,0 +1,147 @@
+"""Test the log of handled GitHub webhook deliveries."""
+from app.controller.webhook.github.deliveries import DeliveryLog
+from botocore.exceptions import ClientError, EndpointConnectionError
+from unittest import TestCase, mock
+
+
+class TestDeliveryLog(TestCase):
+    """Test the DeliveryLog class."""
+
+    def setUp(self):
+        """Set up a log with a fake clock and shared table."""
+        self.now = 1000.0
+        self.table = mock.MagicMock()
+        self.table.get_item.return_value = {}
+        self.log = DeliveryLog(2, 60, lambda: self.table,
+                               clock=lambda: self.now)
+
+    def test_get_unknown(self):
+        """Test that deliveries not handled yet have no response."""
+        assert self.log.get('a') is None
+        self.table.get_item.assert_called_once_with(
+            Key={'delivery_id': 'a'}, ConsistentRead=True)
+
+    def test_put_then_get(self):
+        """Test that handled deliveries are answered from memory."""
+        self.log.put('a', ('done', 200))
+        self.table.put_item.assert_called_once_with(Item={
+            'delivery_id': 'a',
+            'response': '"done"',
+            'status': 200,
+            'expires': 1060
+        })
+        assert self.log.get('a') == ('done', 200)
+        self.table.get_item.assert_not_called()
+        assert self.log.duplicates == 1
+
+    def test_expire(self):
+        """Test that deliveries are forgotten after the TTL."""
+        self.log.put('a', ('done', 200))
+        self.now += 60
+        assert self.log.get('a') is None
+        assert len(self.log) == 0
+
+    def test_evict_oldest(self):
+        """Test that only the newest deliveries are kept in memory."""
+        for delivery_id in ['a', 'b', 'c']:
+            self.log.put(delivery_id, ('done', 200))
+        assert len(self.log) == 2
+        assert self.log.get('a') is None
+        assert self.log.get('c') == ('done', 200)
+
+    def test_get_shared(self):
+        """Test that deliveries handled by other processes are found."""
+        self.table.get_item.return_value = {'Item': {
+            'delivery_id': 'a',
+            'response': '"done"',
+            'status': 200,
+            'expires': 1030
+        }}
+        assert self.log.get('a') == ('done', 200)
+        assert self.log.get('a') == ('done', 200)
+        self.table.get_item.assert_called_once()
+
+        self.now = 1030
+        assert self.log.get('a') is None
+
+    def test_shared_table_unreachable(self):
+        """Test that errors reaching the table are ignored."""
+        error = EndpointConnectionError(endpoint_url='http://localhost')
+        self.table.get_item.side_effect = error
+        self.table.put_item.side_effect = error
+        assert self.log.get('a') is None
+        self.log.put('a', ('done', 200))
+        assert self.log.get('a') == ('done', 200)
+
+    def test_claim(self):
+        """Test that new deliveries are claimed with a conditional write."""
+        assert self.log.claim('a') is None
+        self.table.put_item.assert_called_once()
+        kwargs = self.table.put_item.call_args[1]
+        assert kwargs['Item'] == {'delivery_id': 'a', 'expires': 1060}
+        assert 'ConditionExpression' in kwargs
+
+        # The same process gets the delivery again while handling it
+        assert self.log.claim('a') == DeliveryLog.IN_PROGRESS
+        assert self.log.duplicates == 1
+        self.table.put_item.assert_called_once()
+
+        self.log.put('a', ('done', 200))
+        assert self.log.claim('a') == ('done', 200)
+
+    def test_claim_taken_in_progress(self):
+        """Test claiming a delivery another process is still handling."""
+        self.table.put_item.side_effect = ClientError(
+            {'Error': {'Code': 'ConditionalCheckFailedException'}},
+            'PutItem')
+        self.table.get_item.return_value = {'Item': {
+            'delivery_id': 'a',
+            'expires': 1060
+        }}
+        assert self.log.claim('a') == DeliveryLog.IN_PROGRESS
+        assert self.log.duplicates == 1
+        assert len(self.log) == 0
+
+    def test_claim_taken_handled(self):
+        """Test claiming a delivery another process has handled."""
+        self.table.put_item.side_effect = ClientError(
+            {'Error': {'Code': 'ConditionalCheckFailedException'}},
+            'PutItem')
+        self.table.get_item.return_value = {'Item': {
+            'delivery_id': 'a',
+            'response': '"done"',
+            'status': 200,
+            'expires': 1060
+        }}
+        assert self.log.claim('a') == ('done', 200)
+        assert self.log.get('a') == ('done', 200)
+        self.table.get_item.assert_called_once()
+
+    def test_claim_table_unreachable(self):
+        """Test that deliveries are handled if the table can't be reached."""
+        self.table.put_item.side_effect = ClientError(
+            {'Error': {'Code': 'ProvisionedThroughputExceededException'}},
+            'PutItem')
+        assert self.log.claim('a') is None
+
+    def test_release(self):
+        """Test that released deliveries can be claimed again."""
+        assert self.log.claim('a') is None
+        self.log.release('a')
+        self.table.delete_item.assert_called_once()
+        assert self.table.delete_item.call_args[1]['Key'] == \
+            {'delivery_id': 'a'}
+        assert self.log.claim('a') is None
+        assert self.log.duplicates == 0
+
+    def test_memory_only(self):
+        """Test a log without a shared table."""
+        log = DeliveryLog(2, 60)
+        assert log.get('a') is None
+        assert log.claim('a') is None
+        assert log.claim('a') == DeliveryLog.IN_PROGRESS
+        log.release('a')
+        assert log.claim('a') is None
+        log.put('a', ({'text': 'done'}, 200))
+        assert log.get('a') == ({'text': 'done'}, 200)
+        assert log.claim('a') == ({'text': 'done'}, 200)
@@ -112,6 +112,7 @@ def test_org_supported_action_list():
     """Confirm the supported action list of the handler."""
     mock_facade = mock.MagicMock(DBFacade)
     webhook_handler = MembershipEventHandler(mock_facade)
+    assert webhook_handler.event_type == "membership"
     assert webhook_handler.supported_action_list == ["removed",
                                                      "added"]
 
@@ -125,9 +126,11 @@ def test_handle_mem_event_add_member(mock_logging, mem_add_payload):
     return_team.add_member("SLACKID")
     mock_facade.query.return_value = [return_user]
     mock_facade.retrieve.return_value = return_team
-    webhook_handler = MembershipEventHandler(mock_facade)
+    webhook_handler = MembershipEventHandler(mock_facade, 0)
     rsp, code = webhook_handler.handle(mem_add_payload)
-    mock_facade.store.assert_called_once_with(return_team)
+    mock_facade.update.assert_called_once_with(
+        Team, "2723476", {'members': {"21031067"}}, None)
+    mock_facade.store.assert_not_called()
     mock_logging.info.assert_called_once_with(("user Codertocat added "
                                                "to rocket"))
     assert rsp == "added slack ID SLACKID"
@@ -155,16 +158,17 @@ def test_handle_mem_event_rm_single_member(mock_logging, mem_rm_payload):
     return_team.add_member("21031067")
     mock_facade.query.return_value = [return_user]
     mock_facade.retrieve.return_value = return_team
-    webhook_handler = MembershipEventHandler(mock_facade)
+    webhook_handler = MembershipEventHandler(mock_facade, 0)
     (rsp, code) = webhook_handler.handle(mem_rm_payload)
     mock_facade.query\
         .assert_called_once_with(User, [('github_user_id', "21031067")])
     mock_facade.retrieve \
         .assert_called_once_with(Team, "2723476")
-    mock_facade.store.assert_called_once_with(return_team)
+    mock_facade.update.assert_called_once_with(
+        Team, "2723476", None, {'members': {"21031067"}})
+    mock_facade.store.assert_not_called()
     mock_logging.info.assert_called_once_with("deleted slack user SLACKID"
                                               " from rocket")
-    assert not return_team.has_member("21031067")
     assert rsp == "deleted slack ID SLACKID from rocket"
     assert code == 200
 
@@ -232,3 +236,38 @@ def test_handle_mem_event_empty_action(mock_logging, mem_empty_payload):
                                                 .format(mem_empty_payload)))
     assert rsp == "invalid membership webhook triggered"
     assert code == 405
+
+
+def test_handle_mem_events_buffered(mem_add_payload):
+    """Test that changes to a team's members are written together."""
+    mock_facade = mock.MagicMock(DBFacade)
+    mock_facade.query.return_value = [User("SLACKID")]
+    mock_facade.retrieve.return_value = Team("2723476", "rocket", "rocket")
+    webhook_handler = MembershipEventHandler(mock_facade, 60)
+    for github_id in ["1", "2", "3"]:
+        mem_add_payload["member"]["id"] = github_id
+        rsp, code = webhook_handler.handle(mem_add_payload)
+        assert code == 200
+    mock_facade.update.assert_not_called()
+
+    mem_add_payload["action"] = "removed"
+    rsp, code = webhook_handler.handle(mem_add_payload)
+    assert rsp == "deleted slack ID SLACKID from rocket"
+    webhook_handler.writes.flush()
+    mock_facade.update.assert_called_once_with(
+        Team, "2723476", {'members': {"1", "2"}}, {'members': {"3"}})
+
+
+def test_handle_mem_events_unbuffered(mem_add_payload):
+    """Test that failed writes raise if writes are not buffered."""
+    mock_facade = mock.MagicMock(DBFacade)
+    mock_facade.query.return_value = [User("SLACKID")]
+    mock_facade.retrieve.return_value = Team("2723476", "rocket", "rocket")
+    mock_facade.update.side_effect = LookupError
+    webhook_handler = MembershipEventHandler(mock_facade, 60,
+                                             buffer_writes=False)
+    assert webhook_handler.writes.window == 0
+    with pytest.raises(LookupError):
+        webhook_handler.handle(mem_add_payload)
+    mock_facade.update.assert_called_once_with(
+        Team, "2723476", {'members': {"21031067"}}, None)
@@ -105,6 +105,7 @@ def test_org_supported_action_list():
     """Confirm the supported action list of the handler."""
     mock_facade = mock.MagicMock(DBFacade)
     webhook_handler = OrganizationEventHandler(mock_facade)
+    assert webhook_handler.event_type == "organization"
     assert webhook_handler.supported_action_list == ["member_removed",
                                                      "member_added"]
 
@@ -1,7 +1,7 @@
 """test the handler for GitHub team events."""
 import pytest
 
-from db import DBFacade
+from db import ConditionFailedError, DBFacade
 from app.model import Team
 from unittest import mock
 from app.controller.webhook.github.events import TeamEventHandler
@@ -213,6 +213,7 @@ def test_org_supported_action_list():
     """Confirm the supported action list of the handler."""
     mock_facade = mock.MagicMock(DBFacade)
     webhook_handler = TeamEventHandler(mock_facade)
+    assert webhook_handler.event_type == "team"
     assert webhook_handler.supported_action_list == ["created",
                                                      "deleted",
                                                      "edited",
@@ -225,12 +226,13 @@ def test_org_supported_action_list():
 def test_handle_team_event_created_team(mock_logging, team_created_payload):
     """Test that teams can be created if they are not in the db."""
     mock_facade = mock.MagicMock(DBFacade)
-    mock_facade.retrieve.side_effect = LookupError
     webhook_handler = TeamEventHandler(mock_facade)
     rsp, code = webhook_handler.handle(team_created_payload)
     mock_logging.debug.assert_called_with(("team github with id 2723476 "
                                            "added to organization."))
-    mock_facade.store.assert_called_once()
+    mock_facade.store.assert_called_once_with(Team('2723476', 'github', ''),
+                                              if_not_exists=True)
+    mock_facade.update.assert_not_called()
     assert rsp == "created team with github id 2723476"
     assert code == 200
 
@@ -239,11 +241,13 @@ def test_handle_team_event_created_team(mock_logging, team_created_payload):
 def test_handle_team_event_create_update(mock_logging, team_created_payload):
     """Test that teams can be updated if they are in the db."""
     mock_facade = mock.MagicMock(DBFacade)
+    mock_facade.store.side_effect = ConditionFailedError
     webhook_handler = TeamEventHandler(mock_facade)
     rsp, code = webhook_handler.handle(team_created_payload)
     mock_logging.warning.assert_called_with(("team github with id 2723476 "
                                              "already exists."))
-    mock_facade.store.assert_called_once()
+    mock_facade.update.assert_called_once_with(
+        Team, '2723476', set_values={'github_team_name': 'github'})
     assert rsp == "created team with github id 2723476"
     assert code == 200
 
@@ -253,7 +257,9 @@ def test_handle_team_event_delete_team(team_deleted_payload):
     mock_facade = mock.MagicMock(DBFacade)
     webhook_handler = TeamEventHandler(mock_facade)
     rsp, code = webhook_handler.handle(team_deleted_payload)
-    mock_facade.delete.assert_called_once_with(Team, "2723476")
+    mock_facade.delete.assert_called_once_with(Team, "2723476",
+                                               if_exists=True)
+    mock_facade.retrieve.assert_not_called()
     assert rsp == "deleted team with github id 2723476"
     assert code == 200
 
@@ -261,7 +267,7 @@ def test_handle_team_event_delete_team(team_deleted_payload):
 def test_handle_team_event_deleted_miss(team_deleted_payload):
     """Test that attempts to delete a missing team are handled."""
     mock_facade = mock.MagicMock(DBFacade)
-    mock_facade.retrieve.side_effect = LookupError
+    mock_facade.delete.side_effect = ConditionFailedError
     webhook_handler = TeamEventHandler(mock_facade)
     rsp, code = webhook_handler.handle(team_deleted_payload)
     assert rsp == "team with github id 2723476 not found"
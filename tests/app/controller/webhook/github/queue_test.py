@@ -0,0 +1,181 @@
+"""Test the GitHub webhook queue."""
+import os
+import pytest
+
+from app.controller.webhook.github.queue import MemoryEventStore, \
+    SQLiteEventStore, WebhookQueue
+from threading import Lock
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path):
+    """Create an empty event store of each kind."""
+    if request.param == 'memory':
+        return MemoryEventStore()
+    return SQLiteEventStore(str(tmp_path / 'webhooks.db'))
+
+
+def team_event(team_id, n):
+    """Make the payload of an event for a team."""
+    return {'action': 'edited', 'team': {'id': team_id}, 'n': n}
+
+
+def queued(payload, event_type='team'):
+    """Make an event as saved in the store by the queue."""
+    return {'event': event_type, 'payload': payload}
+
+
+def test_store_lifecycle(store):
+    """Test that events move between pending, done and dead letters."""
+    first = store.add(team_event(1, 0))
+    second = store.add(team_event(1, 1))
+    assert [e for e, _ in store.pending()] == [first, second]
+
+    store.done(first)
+    store.dead(second, 'error')
+    assert store.pending() == []
+    assert store.dead_letters() == [(second, team_event(1, 1), 'error')]
+
+    store.revive(second)
+    assert store.pending() == [(second, team_event(1, 1))]
+    assert store.dead_letters() == []
+
+
+def test_sqlite_store_survives_restart(tmp_path):
+    """Test that events left in an SQLite store are there after a restart."""
+    path = str(tmp_path / 'webhooks.db')
+    event_id = SQLiteEventStore(path).add(team_event(1, 0))
+    assert SQLiteEventStore(path).pending() == [(event_id, team_event(1, 0))]
+
+
+def test_shard_key():
+    """Test that events are sharded by team, or else by user."""
+    assert WebhookQueue.shard_key(team_event(7, 0)) == 'team:7'
+    payload = {'action': 'added', 'membership': {'user': {'login': 'bob'}}}
+    assert WebhookQueue.shard_key(payload) == 'user:bob'
+
+
+def test_handle_events_in_order(store):
+    """Test that events for a team are handled in the order they came."""
+    handled = []
+    lock = Lock()
+
+    def handler(payload, event_type):
+        """Record the event."""
+        assert event_type == 'team'
+        with lock:
+            handled.append((payload['team']['id'], payload['n']))
+
+    queue = WebhookQueue(store, 4)
+    queue.start(handler)
+    for n in range(20):
+        for team_id in range(5):
+            queue.submit(team_event(team_id, n), 'team')
+    queue.shutdown()
+
+    assert len(handled) == 100
+    for team_id in range(5):
+        assert [n for t, n in handled if t == team_id] == list(range(20))
+    assert queue.stats()['handled'] == 100
+    assert store.pending() == []
+
+
+def test_resume_pending_events(store):
+    """Test that events left in the store are handled once started."""
+    store.add(queued(team_event(1, 0)))
+    handled = []
+    queue = WebhookQueue(store, 1)
+    queue.start(lambda *event: handled.append(event))
+    assert queue.stats()['queued'] == 0
+    queue.submit(team_event(1, 1), 'team')
+    queue.shutdown()
+    assert handled == [(team_event(1, 0), 'team'), (team_event(1, 1), 'team')]
+
+
+def test_claim_once(tmp_path, monkeypatch):
+    """Test that only one process claims the events of a stopped one."""
+    path = str(tmp_path / 'webhooks.db')
+    pid = os.fork()
+    if pid == 0:
+        SQLiteEventStore(path).add(queued(team_event(1, 0)))
+        os._exit(0)
+    os.waitpid(pid, 0)
+
+    event_id = SQLiteEventStore(path).pending()[0][0]
+    assert SQLiteEventStore(path).claim() == \
+        [(event_id, queued(team_event(1, 0)))]
+    with monkeypatch.context() as m:
+        # Claim from another running process
+        m.setattr(os, 'getpid', os.getppid)
+        assert SQLiteEventStore(path).claim() == []
+
+
+def test_claim_skips_running_process(tmp_path, monkeypatch):
+    """Test that events of processes still running aren't claimed."""
+    path = str(tmp_path / 'webhooks.db')
+    store = SQLiteEventStore(path)
+    with monkeypatch.context() as m:
+        m.setattr(os, 'getpid', os.getppid)
+        store.add(queued(team_event(1, 0)))
+    assert SQLiteEventStore(path).claim() == []
+    assert len(store.pending()) == 1
+
+
+def test_workers_start_after_fork(tmp_path):
+    """Test that a queue made before forking handles events in the child."""
+    path = str(tmp_path / 'webhooks.db')
+    store = SQLiteEventStore(path)
+    handled = []
+    queue = WebhookQueue(store, 2)
+    queue.start(lambda *event: handled.append(event))
+    store.pending()
+
+    pid = os.fork()
+    if pid == 0:
+        try:
+            queue.submit(team_event(1, 0), 'team')
+            queue.shutdown()
+            os._exit(0 if len(handled) == 1 else 1)
+        finally:
+            os._exit(2)
+    _, status = os.waitpid(pid, 0)
+
+    assert os.WEXITSTATUS(status) == 0
+    assert handled == []
+    assert store.pending() == []
+
+
+def test_retry_then_dead_letter(store):
+    """Test that failing events are retried, then moved to dead letters."""
+    attempts = []
+
+    def handler(payload, event_type):
+        """Fail every time."""
+        attempts.append(payload)
+        raise RuntimeError('down')
+
+    queue = WebhookQueue(store, 1, max_attempts=3, backoff=0)
+    queue.start(handler)
+    event_id = queue.submit(team_event(1, 0), 'team')
+    queue.shutdown()
+
+    assert len(attempts) == 3
+    assert queue.stats() == {'queued': 0, 'handled': 0,
+                             'retried': 2, 'failed': 1}
+    assert store.dead_letters() == \
+        [(event_id, queued(team_event(1, 0)), "RuntimeError('down')")]
+
+
+def test_retry_dead_letters(store):
+    """Test that dead letters can be handled again."""
+    event_id = store.add(queued(team_event(1, 0), None))
+    store.dead(event_id, 'error')
+    handled = []
+    queue = WebhookQueue(store, 2)
+    queue.start(lambda *event: handled.append(event))
+    assert queue.retry_dead_letters() == 1
+    queue.shutdown()
+
+    assert handled == [(team_event(1, 0), None)]
+    assert store.dead_letters() == []
+    assert store.pending() == []
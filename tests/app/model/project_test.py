@@ -69,3 +69,13 @@ def test_project_equalities():
     assert p0 == p1
     assert p0 != p2
     assert p1 != p2
+
+
+def test_dict_round_trip():
+    """Test converting a project to a dictionary and back."""
+    project = Project('1', ['https://github.com/ubclaunchpad/rocket2'])
+    project.display_name = 'Rocket2'
+    project.tags = ['python']
+    d = Project.to_dict(project)
+    assert d['tags'] == ['python']
+    assert Project.from_dict(d) == project
@@ -127,3 +127,47 @@ def test_print():
                         " 'platform': 'web'," \
                         " 'team_leads': {'U0G9QF9C6'}," \
                         " 'members': {'U0G9QF9C6'}}"
+
+
+def test_dict_round_trip():
+    """Test converting a team to a dictionary and back."""
+    team = create_test_team('1', 'brussel-sprouts', 'Brussel Sprouts')
+    team.add_team_lead('abc_123')
+    d = Team.to_dict(team)
+    assert d['members'] == {'abc_123'}
+    assert Team.from_dict(d) == team
+    assert Team.to_dict(Team('1', 'brussel-sprouts', '')) == \
+        {'github_team_id': '1', 'github_team_name': 'brussel-sprouts'}
+
+
+def test_team_equality_sets():
+    """Test that teams with the same members in any order are equal."""
+    team = Team('1', 'brussel-sprouts', 'Brussel Sprouts')
+    team2 = Team('1', 'brussel-sprouts', 'Brussel Sprouts')
+    members = [str(i) for i in range(100)]
+    for member in members:
+        team.add_member(member)
+    for member in reversed(members):
+        team2.add_member(member)
+    assert team == team2
+    assert team != Team.to_dict(team)
+
+
+def test_team_hash():
+    """Test that teams can be put in sets and used as dictionary keys."""
+    team = Team('1', 'brussel-sprouts', 'Brussel Sprouts')
+    team2 = Team('1', 'brussel-sprouts', 'Brussel Sprouts')
+    assert hash(team) == hash(team2)
+    assert len({team, team2, Team('2', 'brussel-trouts', '')}) == 2
+    assert {team: 'a'}[team2] == 'a'
+
+
+def test_diff():
+    """Test getting the attributes that differ between teams."""
+    team = create_test_team('1', 'brussel-sprouts', 'Brussel Sprouts')
+    team2 = create_test_team('1', 'brussel-sprouts', 'Brussel Sprouts')
+    assert team.diff(team2) == []
+    team2.add_member('abc_456')
+    team2.platform = 'ios'
+    assert team.diff(team2) == ['platform', 'members']
+    assert team.diff(team2, ['github_team_name', 'members']) == ['members']
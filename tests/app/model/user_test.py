@@ -160,3 +160,34 @@ def test_print():
                         " 'image_url': ''," \
                         " 'permissions_level': <Permissions.admin: 3>,"\
                         " 'karma': 1}"
+
+
+def test_dict_round_trip():
+    """Test converting a user to a dictionary and back."""
+    user = create_test_admin('U0G9QF9C6')
+    d = User.to_dict(user)
+    assert d['github'] == user.github_username
+    assert d['bio'] == user.biography
+    assert User.from_dict(d) == user
+
+    user = User('U0G9QF9C6')
+    user.karma = 0
+    assert User.to_dict(user) == {'slack_id': 'U0G9QF9C6',
+                                  'permission_level': 'member'}
+
+
+def test_slots():
+    """Test that users only have the attributes in their slots."""
+    user = User('U0G9QF9C6')
+    assert not hasattr(user, '__dict__')
+
+
+def test_user_hash():
+    """Test that users are hashed by their Slack ID."""
+    user = create_test_admin('U0G9QF9C6')
+    user2 = create_test_admin('U0G9QF9C6')
+    user2.karma = 100
+    assert hash(user) == hash(user2)
+    assert user != user2
+    assert len({user, user2}) == 2
+    assert user.diff(user2) == ['karma']
@@ -1,6 +1,7 @@
 """Test how random channels would work."""
 from unittest import mock
 from app.scheduler.modules.random_channel import RandomChannelPromoter
+from interface.slack_dispatcher import SlackDispatcher
 
 
 @mock.patch('flask.Flask')
@@ -22,3 +23,36 @@ def test_doing_it(bot, config, app):
 
     bot.send_to_channel.assert_called()
     assert 'general' in bot.send_to_channel.call_args[0][0]
+
+
+@mock.patch('flask.Flask')
+@mock.patch('config.Config', autospec=True)
+@mock.patch('interface.slack.Bot', autospec=True)
+def test_no_channels(bot, config, app):
+    """Test that nothing is posted without a suitable channel."""
+    config.slack_api_token = ''
+    config.slack_notification_channel = ''
+    config.slack_announcement_channel = ''
+    bot.get_channels.return_value = [{'id': '456', 'name': 'bobheadxi',
+                                      'is_private': True}]
+
+    promoter = RandomChannelPromoter(app, config)
+    promoter.bot = bot
+
+    promoter.do_it()
+
+    bot.get_channels.assert_called_once_with(exclude_archived=True)
+    bot.send_to_channel.assert_not_called()
+
+
+@mock.patch('flask.Flask')
+@mock.patch('config.Config', autospec=True)
+def test_shared_dispatcher(config, app):
+    """Test that the promoter's bot uses the dispatcher it is given."""
+    config.slack_api_token = ''
+    config.slack_notification_channel = ''
+    config.slack_announcement_channel = ''
+    dispatcher = mock.MagicMock(SlackDispatcher)
+    dispatcher.sc = mock.MagicMock()
+    promoter = RandomChannelPromoter(app, config, dispatcher)
+    assert promoter.bot.dispatcher is dispatcher
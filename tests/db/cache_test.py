@@ -0,0 +1,87 @@
+"""Test the model cache."""
+import pytest
+
+from app.model import User, Team
+from db.cache import ModelCache, model_key
+from tests.util import create_test_admin, create_test_team
+
+
+class FakeClock:
+    """A clock that only moves when told to."""
+
+    def __init__(self):
+        """Start the clock at 0."""
+        self.now = 0.0
+
+    def __call__(self):
+        """Return the current time."""
+        return self.now
+
+
+def test_model_key():
+    """Test getting the key of different models."""
+    assert model_key(User('abc_123')) == (User, 'abc_123')
+    assert model_key(create_test_team('1', 'a', 'A')) == (Team, '1')
+    with pytest.raises(TypeError):
+        model_key('abc_123')
+
+
+def test_get_put():
+    """Test storing and getting back a model."""
+    cache = ModelCache(10, 30)
+    user = create_test_admin('abc_123')
+    assert cache.get(User, 'abc_123') is None
+    cache.put(user)
+    assert cache.get(User, 'abc_123') == user
+    assert cache.get(Team, 'abc_123') is None
+    assert cache.stats() == {'hits': 1, 'misses': 2, 'size': 1}
+
+
+def test_copies():
+    """Test that modifying models doesn't modify the cached versions."""
+    cache = ModelCache(10, 30)
+    team = create_test_team('1', 'brussel-sprouts', 'Brussel Sprouts')
+    cache.put(team)
+    team.add_member('apple')
+    cached = cache.get(Team, '1')
+    assert not cached.has_member('apple')
+    cached.add_member('banana')
+    assert not cache.get(Team, '1').has_member('banana')
+
+
+def test_ttl():
+    """Test that models expire."""
+    clock = FakeClock()
+    cache = ModelCache(10, 30, clock)
+    cache.put(User('abc_123'))
+    clock.now = 29
+    assert cache.get(User, 'abc_123') is not None
+    clock.now = 30
+    assert cache.get(User, 'abc_123') is None
+    assert len(cache) == 0
+
+
+def test_lru_eviction():
+    """Test that the least recently used model is evicted first."""
+    cache = ModelCache(2, 30)
+    cache.put(User('a'))
+    cache.put(User('b'))
+    cache.get(User, 'a')
+    cache.put(User('c'))
+    assert len(cache) == 2
+    assert cache.get(User, 'b') is None
+    assert cache.get(User, 'a') is not None
+    assert cache.get(User, 'c') is not None
+
+
+def test_invalidate_clear():
+    """Test removing models from the cache."""
+    cache = ModelCache(10, 30)
+    cache.put(User('a'))
+    cache.put(User('b'))
+    cache.invalidate(User, 'a')
+    cache.invalidate(User, 'not-there')
+    assert cache.get(User, 'a') is None
+    assert cache.get(User, 'b') is not None
+    cache.clear()
+    assert len(cache) == 0
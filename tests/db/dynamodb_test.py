@@ -3,6 +3,7 @@ import pytest
 
 from app.model import User, Project, Team, Permissions
 from config import Config
+from db.exceptions import ConditionFailedError
 from unittest.mock import MagicMock
 from tests.util import create_test_team, create_test_admin, create_test_project
 
@@ -15,6 +16,9 @@ def ddb():
     test_config.aws_users_tablename = 'users_test'
     test_config.aws_teams_tablename = 'teams_test'
     test_config.aws_projects_tablename = 'projects_test'
+    test_config.aws_scan_segments = 1
+    test_config.aws_max_pool_connections = 25
+    test_config.aws_skip_table_check = False
     test_config.testing = True
     actual = DynamoDB(test_config)
     yield actual
@@ -279,6 +283,57 @@ def test_delete_team(ddb):
     assert len(ddb.query(Team)) == 0
 
 
+@pytest.mark.db
+def test_update_team_sets(ddb):
+    """Test adding and removing members of a team atomically."""
+    team = create_test_team('1', 'rocket-2.0', 'Rocket 2.0')
+    ddb.store(team)
+
+    team = ddb.update(Team, '1', add={'members': {'a', 'b'}})
+    assert team.members == {'abc_123', 'a', 'b'}
+    team = ddb.update(Team, '1',
+                      add={'members': {'c'}, 'team_leads': {'a'}},
+                      remove={'members': {'abc_123', 'a'}})
+    assert team.members == {'b', 'c'}
+    assert team.team_leads == {'a'}
+    assert ddb.retrieve(Team, '1') == team
+
+    ddb.update(Team, '1', remove={'members': {'b', 'c'}})
+    assert ddb.retrieve(Team, '1').members == set()
+    assert ddb.update(Team, '1') == ddb.retrieve(Team, '1')
+
+
+@pytest.mark.db
+def test_update_user_karma(ddb):
+    """Test adding to and setting a user's karma atomically."""
+    user = create_test_admin('abc_123')
+    ddb.store(user)
+
+    assert ddb.update(User, 'abc_123', add={'karma': 2}).karma == 3
+    user = ddb.update(User, 'abc_123',
+                      set_values={'karma': 10, 'bio': ''},
+                      condition={'karma': 3})
+    assert user.karma == 10
+    assert user.biography == ''
+    assert user.name == create_test_admin('abc_123').name
+    assert ddb.retrieve(User, 'abc_123') == user
+
+    with pytest.raises(ConditionFailedError):
+        ddb.update(User, 'abc_123', add={'karma': 1}, condition={'karma': 3})
+    assert ddb.retrieve(User, 'abc_123').karma == 10
+
+
+@pytest.mark.db
+def test_update_missing_team(ddb):
+    """Test that updating a missing team raises an error."""
+    with pytest.raises(LookupError):
+        ddb.update(Team, '2', add={'members': {'a'}})
+    with pytest.raises(ConditionFailedError):
+        ddb.update(Team, '2', set_values={'display_name': 'Two'},
+                   condition={'platform': 'slack'})
+    assert len(ddb.query(Team)) == 0
+
+
 @pytest.mark.db
 def test_delete_project(ddb):
     """Test to see if we can successfully delete a team."""
@@ -288,3 +343,285 @@ def test_delete_project(ddb):
     assert len(ddb.query(Project)) == 1
     ddb.delete(Project, project.project_id)
     assert len(ddb.query(Project)) == 0
+
+
+@pytest.mark.db
+def test_query_large_table(ddb):
+    """Test that queries follow pagination past the 1MB page limit."""
+    uids = list(map(str, range(15)))
+    for uid in uids:
+        user = create_test_admin(uid)
+        user.biography = 'a' * 100000
+        assert ddb.store(user)
+
+    assert len(ddb.query(User)) == len(uids)
+    assert len(ddb.query(User, [('permission_level', 'admin')])) == len(uids)
+    assert set(u.slack_id for u in ddb.query_iter(User)) == set(uids)
+
+
+@pytest.mark.db
+def test_query_segmented(ddb):
+    """Test parallel segmented scans return every matching item."""
+    uids = list(map(str, range(20)))
+    for uid in uids:
+        assert ddb.store(create_test_admin(uid))
+
+    ddb.scan_segments = 4
+    assert set(u.slack_id for u in ddb.query(User)) == set(uids)
+    assert len(ddb.query_or(User, [('slack_id', '1'),
+                                   ('slack_id', '2')])) == 2
+    ddb.scan_segments = 1
+
+
+@pytest.mark.db
+def test_query_indexed_attrs(ddb):
+    """Test querying attributes backed by a global secondary index."""
+    user = create_test_admin('abc_123')
+    user.github_id = '4321'
+    user2 = create_test_admin('123_abc')
+    user2.github_id = '1234'
+    assert ddb.store(user)
+    assert ddb.store(user2)
+    team = create_test_team('1', 'rocket2.0', 'Rocket 2.0')
+    assert ddb.store(team)
+
+    assert 'github_user_id' in ddb.active_indexes['users_test']
+    assert ddb.query(User, [('github_user_id', '4321')]) == [user]
+    assert ddb.query(User, [('github_user_id', 4321)]) == [user]
+    assert ddb.query(User, [('github_user_id', '4321'),
+                            ('slack_id', '123_abc')]) == []
+    assert ddb.query(Team, [('github_team_name', 'rocket2.0')]) == [team]
+    assert ddb.query(Team, [('github_team_name', 'rocket')]) == []
+
+
+@pytest.mark.db
+def test_create_missing_indexes(ddb):
+    """Test that indexes are added to tables created without them."""
+    from db.dynamodb import DynamoDB
+    ddb.ddb.Table('users_test').delete()
+    ddb.ddb.create_table(
+        TableName='users_test',
+        AttributeDefinitions=[{'AttributeName': 'slack_id',
+                               'AttributeType': 'S'}],
+        KeySchema=[{'AttributeName': 'slack_id', 'KeyType': 'HASH'}],
+        ProvisionedThroughput={'ReadCapacityUnits': 1,
+                               'WriteCapacityUnits': 1})
+    test_config = MagicMock(Config)
+    test_config.aws_users_tablename = 'users_test'
+    test_config.aws_teams_tablename = 'teams_test'
+    test_config.aws_projects_tablename = 'projects_test'
+    test_config.aws_scan_segments = 1
+    test_config.aws_max_pool_connections = 25
+    test_config.aws_skip_table_check = False
+    test_config.testing = True
+    migrated = DynamoDB(test_config)
+
+    indexes = migrated.ddb.Table('users_test').global_secondary_indexes
+    assert [i['IndexName'] for i in indexes] == ['github_user_id-index']
+
+
+@pytest.mark.db
+def test_bulk_store_delete(ddb):
+    """Test storing and deleting many objects at once."""
+    uids = list(map(str, range(60)))
+    users = [create_test_admin(uid) for uid in uids]
+    teams = [create_test_team(uid, f'team{uid}', 'Team') for uid in uids[:3]]
+    invalid = User('')
+
+    assert ddb.bulk_store(iter(users + teams + [invalid])) == 63
+    assert len(ddb.query(User)) == 60
+    assert len(ddb.query(Team)) == 3
+    assert ddb.retrieve(User, '42') == users[42]
+
+    ddb.bulk_delete(User, uids[:40] + ['not-there', '0'])
+    assert sorted(u.slack_id for u in ddb.query(User)) == sorted(uids[40:])
+
+
+@pytest.mark.db
+def test_bulk_store_duplicates(ddb):
+    """Test that the last of many objects with the same key is stored."""
+    user = create_test_admin('abc_123')
+    user2 = create_test_admin('abc_123')
+    user2.name = 'Sprouts'
+    ddb.bulk_store([user, user2])
+    assert ddb.retrieve(User, 'abc_123') == user2
+
+
+@pytest.mark.db
+def test_bulk_store_unprocessed(ddb):
+    """Test that unprocessed items are retried, and eventually give up."""
+    from unittest import mock
+    real_batch_write = ddb.ddb.batch_write_item
+    calls = []
+
+    def flaky_batch_write(RequestItems):
+        calls.append(RequestItems)
+        if len(calls) == 1:
+            return {'UnprocessedItems': RequestItems}
+        return real_batch_write(RequestItems=RequestItems)
+
+    with mock.patch('db.dynamodb.time.sleep'), \
+            mock.patch.object(ddb.ddb, 'batch_write_item',
+                              side_effect=flaky_batch_write):
+        ddb.bulk_store([create_test_admin('abc_123')])
+    assert len(calls) == 2
+    assert ddb.retrieve(User, 'abc_123')
+
+    with mock.patch('db.dynamodb.time.sleep'), \
+            mock.patch.object(ddb.ddb, 'batch_write_item',
+                              side_effect=lambda RequestItems:
+                              {'UnprocessedItems': RequestItems}):
+        with pytest.raises(RuntimeError):
+            ddb.bulk_delete(User, ['abc_123'])
+
+
+@pytest.mark.db
+def test_bulk_retrieve_many_users(ddb):
+    """Test bulk retrieving more keys than fit in a single request."""
+    uids = list(map(str, range(250)))
+    ddb.bulk_store(create_test_admin(uid) for uid in uids)
+
+    ks = list(reversed(uids)) + ['not-there'] + uids[:10]
+    retrieved = ddb.bulk_retrieve(User, ks)
+    assert sorted(u.slack_id for u in retrieved) == sorted(uids)
+
+    retrieved = ddb.bulk_retrieve(User, ks, ordered=True)
+    assert [u.slack_id for u in retrieved] == list(reversed(uids))
+    assert ddb.bulk_retrieve(User, []) == []
+
+
+@pytest.mark.db
+def test_bulk_retrieve_unprocessed(ddb):
+    """Test that unprocessed keys are retried, and eventually give up."""
+    from unittest import mock
+    ddb.bulk_store(create_test_admin(str(i)) for i in range(3))
+    real_batch_get = ddb.ddb.batch_get_item
+    calls = []
+
+    def flaky_batch_get(RequestItems):
+        calls.append(RequestItems)
+        if len(calls) == 1:
+            return {'Responses': {}, 'UnprocessedKeys': RequestItems}
+        return real_batch_get(RequestItems=RequestItems)
+
+    with mock.patch('db.dynamodb.time.sleep'), \
+            mock.patch.object(ddb.ddb, 'batch_get_item',
+                              side_effect=flaky_batch_get):
+        assert len(ddb.bulk_retrieve(User, ['0', '1', '2'])) == 3
+    assert len(calls) == 2
+
+    with mock.patch('db.dynamodb.time.sleep'), \
+            mock.patch.object(ddb.ddb, 'batch_get_item',
+                              side_effect=lambda RequestItems:
+                              {'UnprocessedKeys': RequestItems}):
+        with pytest.raises(RuntimeError):
+            ddb.bulk_retrieve(User, ['0'])
+
+
+@pytest.mark.db
+def test_check_valid_table(ddb):
+    """Test checking if tables exist."""
+    assert ddb.check_valid_table('users_test')
+    assert not ddb.check_valid_table('not_a_table')
+
+
+@pytest.mark.db
+def test_expiring_table(ddb):
+    """Test getting (and creating) a table of expiring items."""
+    assert not ddb.check_valid_table('expiring_test')
+    table = ddb.expiring_table('expiring_test', 'delivery_id')
+    assert ddb.check_valid_table('expiring_test')
+    table.put_item(Item={'delivery_id': 'a', 'expires': 0})
+    assert ddb.expiring_table('expiring_test', 'delivery_id') \
+        .get_item(Key={'delivery_id': 'a'})['Item']['expires'] == 0
+
+
+@pytest.mark.db
+def test_skip_table_check(ddb):
+    """Test that no tables are checked when told to skip the check."""
+    from db.dynamodb import DynamoDB
+    test_config = MagicMock(Config)
+    test_config.aws_users_tablename = 'missing_users'
+    test_config.aws_teams_tablename = 'missing_teams'
+    test_config.aws_projects_tablename = 'missing_projects'
+    test_config.aws_scan_segments = 1
+    test_config.aws_max_pool_connections = 25
+    test_config.aws_skip_table_check = True
+    test_config.testing = True
+    skipped = DynamoDB(test_config)
+
+    assert not skipped.check_valid_table('missing_users')
+    assert skipped.active_indexes['missing_users'] == {'github_user_id'}
+
+
+@pytest.mark.db
+def test_projection(ddb):
+    """Test reading only some attributes of models."""
+    team = create_test_team('1', 'rocket2.0', 'Rocket 2.0')
+    ddb.store(team)
+    user = create_test_admin('abc_123')
+    ddb.store(user)
+
+    teams = ddb.query(Team, [('platform', 'slack')],
+                      fields=['display_name', 'platform'])
+    assert len(teams) == 1
+    assert teams[0].github_team_id == '1'
+    assert teams[0].github_team_name == 'rocket2.0'
+    assert teams[0].display_name == 'Rocket 2.0'
+    assert teams[0].members == set()
+    assert list(ddb.query_iter(Team, [('github_team_name', 'rocket2.0')],
+                               fields=[]))[0].platform == ''
+
+    retrieved = ddb.retrieve(User, 'abc_123', fields=['name'])
+    assert retrieved.name == user.name
+    assert retrieved.email == ''
+    retrieved = ddb.bulk_retrieve(User, ['abc_123'], fields=['email'])
+    assert retrieved[0].email == user.email
+    assert retrieved[0].name == ''
+
+
+@pytest.mark.db
+def test_conditional_store_delete(ddb):
+    """Test storing and deleting objects only if they (don't) exist."""
+    user = create_test_admin('abc_123')
+    with pytest.raises(ConditionFailedError):
+        ddb.store(user, if_exists=True)
+    assert ddb.store(user, if_not_exists=True)
+    user.name = 'Sprouts'
+    with pytest.raises(ConditionFailedError):
+        ddb.store(user, if_not_exists=True)
+    assert ddb.store(user, if_exists=True)
+    assert ddb.retrieve(User, 'abc_123') == user
+    with pytest.raises(ValueError):
+        ddb.store(user, if_exists=True, if_not_exists=True)
+
+    ddb.delete(User, 'abc_123', if_exists=True)
+    with pytest.raises(ConditionFailedError):
+        ddb.delete(User, 'abc_123', if_exists=True)
+    ddb.delete(User, 'abc_123')
+
+
+def test_resource_per_process(monkeypatch):
+    """Test that each process creates its own resource when it uses it."""
+    from db.dynamodb import DynamoDB
+    test_config = MagicMock(Config)
+    test_config.aws_users_tablename = 'users_test'
+    test_config.aws_teams_tablename = 'teams_test'
+    test_config.aws_projects_tablename = 'projects_test'
+    test_config.aws_scan_segments = 1
+    test_config.aws_max_pool_connections = 25
+    test_config.aws_skip_table_check = True
+    test_config.testing = True
+    resource = MagicMock()
+    monkeypatch.setattr('boto3.resource', resource)
+    ddb = DynamoDB(test_config)
+    resource.assert_not_called()
+
+    assert ddb.ddb is ddb.ddb
+    resource.assert_called_once()
+    assert resource.call_args[1]['endpoint_url'] == 'http://localhost:8000'
+
+    # As if the object had been inherited by a forked process
+    monkeypatch.setattr('os.getpid', lambda: -1)
+    ddb.ddb.Table('users_test')
+    assert resource.call_count == 2
@@ -1,5 +1,8 @@
 """Test the facade for the database."""
-from db import DBFacade
+import pytest
+
+from db import ConditionFailedError, DBFacade
+from db.cache import ModelCache
 from unittest import mock
 from app.model import Team, User, Project
 from tests.util import create_test_admin, create_test_team, create_test_project
@@ -17,7 +20,7 @@ def test_store_user(ddb):
     dbf = DBFacade(ddb)
     test_user = create_test_admin('abc_123')
     dbf.store(test_user)
-    ddb.store.assert_called_with(test_user)
+    ddb.store.assert_called_with(test_user, False, False)
 
 
 @mock.patch('db.dynamodb.DynamoDB', autospec=True)
@@ -26,7 +29,7 @@ def test_retrieve_user(ddb):
     dbf = DBFacade(ddb)
     slack_id = 'abc_123'
     dbf.retrieve(User, slack_id)
-    ddb.retrieve.assert_called_with(User, slack_id)
+    ddb.retrieve.assert_called_with(User, slack_id, None)
 
 
 @mock.patch('db.dynamodb.DynamoDB', autospec=True)
@@ -34,7 +37,16 @@ def test_query_user(ddb):
     """Test querying user calls correct functions."""
     dbf = DBFacade(ddb)
     dbf.query(User, ['permission_level', 'admin'])
-    ddb.query.assert_called_with(User, ['permission_level', 'admin'])
+    ddb.query.assert_called_with(User, ['permission_level', 'admin'], None)
+
+
+@mock.patch('db.dynamodb.DynamoDB', autospec=True)
+def test_query_iter_user(ddb):
+    """Test lazily querying users calls correct functions."""
+    dbf = DBFacade(ddb)
+    dbf.query_iter(User, [('permission_level', 'admin')])
+    ddb.query_iter.assert_called_with(User, [('permission_level', 'admin')],
+                                      None)
 
 
 @mock.patch('db.dynamodb.DynamoDB', autospec=True)
@@ -43,7 +55,7 @@ def test_store_team(ddb):
     dbf = DBFacade(ddb)
     test_team = create_test_team('1', 'brussel-sprouts', 'Brussel Sprouts')
     dbf.store(test_team)
-    ddb.store.assert_called_with(test_team)
+    ddb.store.assert_called_with(test_team, False, False)
 
 
 @mock.patch('db.dynamodb.DynamoDB', autospec=True)
@@ -52,7 +64,7 @@ def test_retrieve_team(ddb):
     dbf = DBFacade(ddb)
     team_name = 'brussel-sprouts'
     dbf.retrieve(Team, team_name)
-    ddb.retrieve.assert_called_with(Team, team_name)
+    ddb.retrieve.assert_called_with(Team, team_name, None)
 
 
 @mock.patch('db.dynamodb.DynamoDB', autospec=True)
@@ -61,7 +73,9 @@ def test_bulk_retrieve_team(ddb):
     dbf = DBFacade(ddb)
     team_ids = list(map(str, range(10)))
     dbf.bulk_retrieve(Team, team_ids)
-    ddb.bulk_retrieve.assert_called_with(Team, team_ids)
+    ddb.bulk_retrieve.assert_called_with(Team, team_ids, False, None)
+    dbf.bulk_retrieve(Team, team_ids, ordered=True)
+    ddb.bulk_retrieve.assert_called_with(Team, team_ids, True, None)
 
 
 @mock.patch('db.dynamodb.DynamoDB', autospec=True)
@@ -70,7 +84,7 @@ def test_query_or_team(ddb):
     dbf = DBFacade(ddb)
     params = [('github_team_id', str(team_id)) for team_id in range(10)]
     dbf.query_or(Team, params)
-    ddb.query_or.assert_called_with(Team, params)
+    ddb.query_or.assert_called_with(Team, params, None)
 
 
 @mock.patch('db.dynamodb.DynamoDB', autospec=True)
@@ -78,7 +92,7 @@ def test_query_team(ddb):
     """Test querying team calls correct functions."""
     dbf = DBFacade(ddb)
     dbf.query(Team, [('platform', 'slack')])
-    ddb.query.assert_called_with(Team, [('platform', 'slack')])
+    ddb.query.assert_called_with(Team, [('platform', 'slack')], None)
 
 
 @mock.patch('db.dynamodb.DynamoDB', autospec=True)
@@ -87,7 +101,7 @@ def test_delete_team(ddb):
     dbf = DBFacade(ddb)
     team_name = 'brussel-sprouts'
     dbf.delete(Team, team_name)
-    ddb.delete.assert_called_with(Team, team_name)
+    ddb.delete.assert_called_with(Team, team_name, False)
 
 
 @mock.patch('db.dynamodb.DynamoDB', autospec=True)
@@ -96,7 +110,7 @@ def test_delete_user(ddb):
     dbf = DBFacade(ddb)
     slack_id = 'abc_123'
     dbf.delete(User, slack_id)
-    ddb.delete.assert_called_with(User, slack_id)
+    ddb.delete.assert_called_with(User, slack_id, False)
 
 
 @mock.patch('db.dynamodb.DynamoDB', autospec=True)
@@ -105,7 +119,7 @@ def test_store_project(ddb):
     dbf = DBFacade(ddb)
     test_project = create_test_project('1', ['a'])
     dbf.store(test_project)
-    ddb.store.assert_called_with(test_project)
+    ddb.store.assert_called_with(test_project, False, False)
 
 
 @mock.patch('db.dynamodb.DynamoDB', autospec=True)
@@ -114,7 +128,7 @@ def test_retrieve_project(ddb):
     dbf = DBFacade(ddb)
     project_id = 'brussel-sprouts'
     dbf.retrieve(Project, project_id)
-    ddb.retrieve.assert_called_with(Project, project_id)
+    ddb.retrieve.assert_called_with(Project, project_id, None)
 
 
 @mock.patch('db.dynamodb.DynamoDB', autospec=True)
@@ -122,7 +136,7 @@ def test_query_project(ddb):
     """Test querying project calls correct functions."""
     dbf = DBFacade(ddb)
     dbf.query(Project, [('platform', 'slack')])
-    ddb.query.assert_called_with(Project, [('platform', 'slack')])
+    ddb.query.assert_called_with(Project, [('platform', 'slack')], None)
 
 
 @mock.patch('db.dynamodb.DynamoDB', autospec=True)
@@ -131,4 +145,205 @@ def test_delete_project(ddb):
     dbf = DBFacade(ddb)
     project_id = 'brussel-sprouts'
     dbf.delete(Project, project_id)
-    ddb.delete.assert_called_with(Project, project_id)
+    ddb.delete.assert_called_with(Project, project_id, False)
+
+
+@mock.patch('db.dynamodb.DynamoDB', autospec=True)
+def test_retrieve_cached(ddb):
+    """Test that retrieving twice only hits the database once."""
+    user = create_test_admin('abc_123')
+    ddb.retrieve.return_value = user
+    dbf = DBFacade(ddb, ModelCache(10, 30))
+    assert dbf.retrieve(User, 'abc_123', cached=True) == user
+    assert dbf.retrieve(User, 'abc_123', cached=True) == user
+    ddb.retrieve.assert_called_once_with(User, 'abc_123', None)
+    assert dbf.cache_stats() == {'hits': 1, 'misses': 1, 'size': 1}
+
+
+@mock.patch('db.dynamodb.DynamoDB', autospec=True)
+def test_retrieve_uncached_by_default(ddb):
+    """Test that models are read from the database unless cached is set."""
+    ddb.store.return_value = True
+    ddb.retrieve.return_value = create_test_admin('abc_123')
+    ddb.bulk_retrieve.return_value = [create_test_admin('abc_123')]
+    dbf = DBFacade(ddb, ModelCache(10, 30))
+    dbf.store(create_test_admin('abc_123'))
+    dbf.retrieve(User, 'abc_123')
+    ddb.retrieve.assert_called_once_with(User, 'abc_123', None)
+    dbf.bulk_retrieve(User, ['abc_123'])
+    ddb.bulk_retrieve.assert_called_once_with(User, ['abc_123'], False, None)
+
+
+@mock.patch('db.dynamodb.DynamoDB', autospec=True)
+def test_retrieve_cached_lookup_error(ddb):
+    """Test that missing models aren't cached."""
+    ddb.retrieve.side_effect = LookupError
+    dbf = DBFacade(ddb, ModelCache(10, 30))
+    for _ in range(2):
+        with pytest.raises(LookupError):
+            dbf.retrieve(User, 'abc_123', cached=True)
+    assert ddb.retrieve.call_count == 2
+
+
+@mock.patch('db.dynamodb.DynamoDB', autospec=True)
+def test_store_updates_cache(ddb):
+    """Test that storing a model updates the cached version."""
+    ddb.store.return_value = True
+    dbf = DBFacade(ddb, ModelCache(10, 30))
+    user = create_test_admin('abc_123')
+    dbf.store(user)
+    user.name = 'Steven Universe'
+    dbf.store(user)
+    assert dbf.retrieve(User, 'abc_123', cached=True).name == \
+        'Steven Universe'
+    ddb.retrieve.assert_not_called()
+
+
+@mock.patch('db.dynamodb.DynamoDB', autospec=True)
+def test_store_invalid_not_cached(ddb):
+    """Test that models that fail to be stored aren't cached."""
+    ddb.store.return_value = False
+    dbf = DBFacade(ddb, ModelCache(10, 30))
+    dbf.store(User(''))
+    assert dbf.cache_stats()['size'] == 0
+
+
+@mock.patch('db.dynamodb.DynamoDB', autospec=True)
+def test_delete_invalidates_cache(ddb):
+    """Test that deleting a model removes it from the cache."""
+    ddb.store.return_value = True
+    ddb.retrieve.return_value = create_test_admin('abc_123')
+    dbf = DBFacade(ddb, ModelCache(10, 30))
+    dbf.store(create_test_admin('abc_123'))
+    dbf.delete(User, 'abc_123')
+    dbf.retrieve(User, 'abc_123', cached=True)
+    ddb.retrieve.assert_called_once_with(User, 'abc_123', None)
+
+
+@mock.patch('db.dynamodb.DynamoDB', autospec=True)
+def test_failed_bulk_delete_invalidates_cache(ddb):
+    """Test that models are removed from the cache even if deleting fails."""
+    ddb.store.return_value = True
+    ddb.retrieve.return_value = create_test_admin('abc_123')
+    ddb.bulk_delete.side_effect = RuntimeError
+    dbf = DBFacade(ddb, ModelCache(10, 30))
+    dbf.store(create_test_admin('abc_123'))
+    with pytest.raises(RuntimeError):
+        dbf.bulk_delete(User, ['abc_123'])
+    dbf.retrieve(User, 'abc_123', cached=True)
+    ddb.retrieve.assert_called_once_with(User, 'abc_123', None)
+
+
+@mock.patch('db.dynamodb.DynamoDB', autospec=True)
+def test_bulk_retrieve_cached(ddb):
+    """Test that bulk retrieving only fetches uncached models."""
+    ddb.store.return_value = True
+    dbf = DBFacade(ddb, ModelCache(10, 30))
+    users = [create_test_admin(str(i)) for i in range(4)]
+    dbf.store(users[0])
+    dbf.store(users[1])
+    ddb.bulk_retrieve.return_value = users[2:]
+    retrieved = dbf.bulk_retrieve(User, ['3', '0', '1', '2', '0'],
+                                  ordered=True, cached=True)
+    ddb.bulk_retrieve.assert_called_once_with(User, ['3', '2'], False, None)
+    assert [u.slack_id for u in retrieved] == ['3', '0', '1', '2']
+
+    dbf.bulk_retrieve(User, ['2', '3'], cached=True)
+    ddb.bulk_retrieve.assert_called_once()
+
+
+@mock.patch('db.dynamodb.DynamoDB', autospec=True)
+def test_cache_stats_no_cache(ddb):
+    """Test cache stats without a cache."""
+    assert DBFacade(ddb).cache_stats() == {}
+
+
+@mock.patch('db.dynamodb.DynamoDB', autospec=True)
+def test_bulk_store(ddb):
+    """Test bulk storing calls correct functions."""
+    dbf = DBFacade(ddb)
+    users = [create_test_admin(str(i)) for i in range(3)]
+    dbf.bulk_store(users)
+    ddb.bulk_store.assert_called_with(users)
+
+
+@mock.patch('db.dynamodb.DynamoDB', autospec=True)
+def test_bulk_store_invalidates_cache(ddb):
+    """Test bulk storing removes the stored objects from the cache."""
+    ddb.store.return_value = True
+    ddb.bulk_store.side_effect = lambda objs: len(list(objs))
+    cache = ModelCache(10, 30)
+    dbf = DBFacade(ddb, cache)
+    dbf.store(create_test_admin('0'))
+    dbf.store(create_test_admin('3'))
+    assert dbf.bulk_store(create_test_admin(str(i)) for i in range(3)) == 3
+    assert cache.get(User, '0') is None
+    assert cache.get(User, '3') is not None
+
+
+@mock.patch('db.dynamodb.DynamoDB', autospec=True)
+def test_bulk_delete(ddb):
+    """Test bulk deleting calls correct functions."""
+    ddb.store.return_value = True
+    cache = ModelCache(10, 30)
+    dbf = DBFacade(ddb, cache)
+    dbf.store(create_test_admin('0'))
+    dbf.bulk_delete(User, ['0', '1'])
+    ddb.bulk_delete.assert_called_with(User, ['0', '1'])
+    assert cache.get(User, '0') is None
+
+
+@mock.patch('db.dynamodb.DynamoDB', autospec=True)
+def test_update_caches_result(ddb):
+    """Test that updating a model caches the updated model."""
+    user = create_test_admin('abc_123')
+    ddb.update.return_value = user
+    dbf = DBFacade(ddb, ModelCache(10, 30))
+    assert dbf.update(User, 'abc_123', add={'karma': 1}) == user
+    ddb.update.assert_called_once_with(User, 'abc_123', {'karma': 1},
+                                       None, None, None)
+    assert dbf.retrieve(User, 'abc_123', cached=True) == user
+    ddb.retrieve.assert_not_called()
+
+
+@mock.patch('db.dynamodb.DynamoDB', autospec=True)
+def test_update_failed_invalidates_cache(ddb):
+    """Test that a failed update removes the model from the cache."""
+    ddb.store.return_value = True
+    ddb.update.side_effect = ConditionFailedError
+    dbf = DBFacade(ddb, ModelCache(10, 30))
+    dbf.store(create_test_admin('abc_123'))
+    with pytest.raises(LookupError):
+        dbf.update(User, 'abc_123', set_values={'karma': 5},
+                   condition={'karma': 1})
+    assert dbf.cache_stats()['size'] == 0
+
+
+@mock.patch('db.dynamodb.DynamoDB', autospec=True)
+def test_projection_not_cached(ddb):
+    """Test that models with only some attributes read aren't cached."""
+    ddb.retrieve.return_value = create_test_admin('abc_123')
+    ddb.bulk_retrieve.return_value = [create_test_admin('0')]
+    dbf = DBFacade(ddb, ModelCache(10, 30))
+    dbf.retrieve(User, 'abc_123', fields=['name'], cached=True)
+    ddb.retrieve.assert_called_once_with(User, 'abc_123', ['name'])
+    dbf.bulk_retrieve(User, ['0'], fields=['name'], cached=True)
+    ddb.bulk_retrieve.assert_called_once_with(User, ['0'], False, ['name'])
+    assert dbf.cache_stats()['size'] == 0
+
+    dbf.query(Team, fields=['platform'])
+    ddb.query.assert_called_once_with(Team, [], ['platform'])
+
+
+@mock.patch('db.dynamodb.DynamoDB', autospec=True)
+def test_conditional_store_failed_invalidates_cache(ddb):
+    """Test that a failed conditional store removes the cached model."""
+    ddb.store.return_value = True
+    dbf = DBFacade(ddb, ModelCache(10, 30))
+    user = create_test_admin('abc_123')
+    dbf.store(user)
+    ddb.store.side_effect = ConditionFailedError
+    with pytest.raises(ConditionFailedError):
+        dbf.store(user, if_not_exists=True)
+    ddb.store.assert_called_with(user, False, True)
+    assert dbf.cache_stats()['size'] == 0
@@ -0,0 +1,288 @@
+"""Test the SQLite database."""
+import os
+import pytest
+
+from app.model import User, Project, Team, Permissions
+from config import Config
+from db.exceptions import ConditionFailedError
+from db.sqlite import SQLiteDB
+from unittest.mock import MagicMock
+from tests.util import create_test_team, create_test_admin, create_test_project
+
+
+@pytest.fixture
+def test_config(tmp_path):
+    """Create config for testing."""
+    test_config = MagicMock(Config)
+    test_config.aws_users_tablename = 'users_test'
+    test_config.aws_teams_tablename = 'teams_test'
+    test_config.aws_projects_tablename = 'projects_test'
+    test_config.sqlite_db = str(tmp_path / 'rocket.db')
+    return test_config
+
+
+@pytest.fixture
+def db(test_config):
+    """Create a new SQLite database."""
+    return SQLiteDB(test_config)
+
+
+def test_string_rep(db):
+    """Test string representation of the SQLiteDB class."""
+    assert str(db) == "SQLite"
+
+
+def test_check_valid_table(db):
+    """Test that the tables are created."""
+    assert db.check_valid_table('users_test')
+    assert db.check_valid_table('teams_test_attrs')
+    assert not db.check_valid_table('not_a_table')
+
+
+def test_store_invalid(db):
+    """Test that invalid objects are not stored."""
+    assert not db.store(User(''))
+    assert not db.store(Team('1', '', 'Display Name'))
+    assert len(db.query(User)) == 0
+    assert len(db.query(Team)) == 0
+
+
+def test_store_retrieve(db):
+    """Test storing and retrieving each type of object."""
+    user = create_test_admin('abc_123')
+    team = create_test_team('1', 'rocket2.0', 'Rocket 2.0')
+    project = create_test_project('123456', ['abcd', 'efgh'])
+    assert db.store(user)
+    assert db.store(team)
+    assert db.store(project)
+
+    assert db.retrieve(User, 'abc_123') == user
+    assert db.retrieve(Team, '1') == team
+    assert db.retrieve(Project, project.project_id) == project
+
+
+def test_retrieve_invalid(db):
+    """Test retrieving an object that isn't there."""
+    with pytest.raises(LookupError, match=r'Team\(id=1\) not found'):
+        db.retrieve(Team, '1')
+
+
+def test_persists(db, test_config):
+    """Test that objects are still there when the database is reopened."""
+    user = create_test_admin('abc_123')
+    db.store(user)
+    assert SQLiteDB(test_config).retrieve(User, 'abc_123') == user
+
+
+def test_opened_lazily(test_config):
+    """Test that the database is only opened once it is used."""
+    db = SQLiteDB(test_config)
+    assert not os.path.exists(test_config.sqlite_db)
+    assert db.check_valid_table('users_test')
+    assert os.path.exists(test_config.sqlite_db)
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs fork()')
+def test_fork(db):
+    """Test that a forked process opens its own connection to the database."""
+    user = create_test_admin('abc_123')
+    db.store(user)
+    pid = os.fork()
+    if pid == 0:
+        status = 1
+        try:
+            if db.retrieve(User, 'abc_123') == user and \
+                    db.store(create_test_admin('def_456')):
+                status = 0
+        finally:
+            os._exit(status)
+    _, status = os.waitpid(pid, 0)
+    assert os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0
+    assert db.retrieve(User, 'def_456') == create_test_admin('def_456')
+    db.store(create_test_admin('ghi_789'))
+    assert len(db.query(User)) == 3
+
+
+def test_store_replaces(db):
+    """Test that storing an object again replaces it and its index rows."""
+    team = create_test_team('1', 'rocket2.0', 'Rocket 2.0')
+    db.store(team)
+    team.discard_member('abc_123')
+    team.add_member('apple')
+    team.display_name = 'Rocket 3.0'
+    db.store(team)
+
+    assert db.retrieve(Team, '1') == team
+    assert db.query(Team, [('members', 'abc_123')]) == []
+    assert db.query(Team, [('display_name', 'Rocket 2.0')]) == []
+    assert db.query(Team, [('members', 'apple')]) == [team]
+
+
+def test_query(db):
+    """Test querying on scalar and set attributes."""
+    team = create_test_team('1', 'rocket2.0', 'Rocket 2.0')
+    team2 = create_test_team('2', 'lame-o', 'Lame-O Team')
+    team2.add_member('apple')
+    db.store(team)
+    db.store(team2)
+
+    assert db.query(Team, [('display_name', 'Rocket 2.0')]) == [team]
+    assert db.query(Team, [('platform', 'slack')]) == [team, team2]
+    assert db.query(Team, [('display_name', 'Rocket 2.0'),
+                           ('platform', 'slack')]) == [team]
+    assert db.query(Team, [('members', 'abc_123'),
+                           ('members', 'apple')]) == [team2]
+    assert db.query(Team, [('members', 'nobody')]) == []
+    assert db.query(Team) == [team, team2]
+
+
+def test_query_project(db):
+    """Test querying on list attributes."""
+    project = create_test_project('123456', ['abcd'])
+    db.store(project)
+    assert db.query(Project, [('tags', 'python'),
+                              ('tags', 'docker'),
+                              ('display_name', 'Rocket2')]) == [project]
+    assert db.query(Project, [('github_urls', 'abcd')]) == [project]
+
+
+def test_query_or(db):
+    """Test querying users using union of parameters."""
+    users = [create_test_admin(str(i)) for i in range(10)]
+    for user in users[:5]:
+        user.permissions_level = Permissions.member
+    db.bulk_store(users)
+
+    assert db.query_or(User, [('slack_id', '1'), ('slack_id', '7')]) == \
+        [users[1], users[7]]
+    assert len(db.query_or(User, [('permission_level', 'admin'),
+                                  ('permission_level', 'member')])) == 10
+    assert len(db.query_or(User)) == 10
+
+
+def test_query_iter_pages(db, monkeypatch):
+    """Test that queries read the table one page at a time."""
+    monkeypatch.setattr(SQLiteDB, 'PAGE_SIZE', 7)
+    users = [create_test_admin(f'{i:02}') for i in range(30)]
+    for user in users[::2]:
+        user.permissions_level = Permissions.member
+    db.bulk_store(users)
+
+    assert list(db.query_iter(User)) == users
+    assert db.query(User, [('permission_level', 'member')]) == users[::2]
+
+
+def test_bulk_store_delete(db):
+    """Test storing and deleting many objects at once."""
+    uids = list(map(str, range(60)))
+    users = [create_test_admin(uid) for uid in uids]
+    teams = [create_test_team(uid, f'team{uid}', 'Team') for uid in uids[:3]]
+
+    assert db.bulk_store(iter(users + teams + [User('')])) == 63
+    assert len(db.query(User)) == 60
+    assert len(db.query(Team)) == 3
+
+    db.bulk_delete(User, uids[:40] + ['not-there', '0'])
+    assert sorted(u.slack_id for u in db.query(User)) == sorted(uids[40:])
+    assert db.query(User, [('slack_id', '0')]) == []
+
+
+def test_bulk_store_rolls_back(db):
+    """Test that nothing is stored if storing one of the objects fails."""
+    with pytest.raises(RuntimeError):
+        db.bulk_store([create_test_admin('abc_123'), 'not a model'])
+    assert db.query(User) == []
+
+
+def test_bulk_retrieve(db):
+    """Test retrieving many objects at once."""
+    users = [create_test_admin(str(i)) for i in range(10)]
+    db.bulk_store(users)
+
+    retrieved = db.bulk_retrieve(User, ['7', '2', 'missing', '7'],
+                                 ordered=True)
+    assert retrieved == [users[7], users[2]]
+
+
+def test_delete(db):
+    """Test deleting an object."""
+    db.store(create_test_team('1', 'rocket-2.0', 'Rocket 2.0'))
+    db.delete(Team, '1')
+    assert db.query(Team) == []
+    assert db.query(Team, [('members', 'abc_123')]) == []
+
+
+def test_update_team_sets(db):
+    """Test adding and removing members of a team."""
+    db.store(create_test_team('1', 'rocket-2.0', 'Rocket 2.0'))
+
+    team = db.update(Team, '1',
+                     add={'members': {'c'}, 'team_leads': {'a'}},
+                     remove={'members': {'abc_123'}})
+    assert team.members == {'c'}
+    assert team.team_leads == {'a'}
+    assert db.retrieve(Team, '1') == team
+    assert db.query(Team, [('members', 'c')]) == [team]
+    assert db.query(Team, [('members', 'abc_123')]) == []
+
+
+def test_update_user_karma(db):
+    """Test adding to and setting a user's karma."""
+    db.store(create_test_admin('abc_123'))
+
+    assert db.update(User, 'abc_123', add={'karma': 2}).karma == 3
+    user = db.update(User, 'abc_123',
+                     set_values={'karma': 10, 'bio': ''},
+                     condition={'karma': 3})
+    assert user.karma == 10
+    assert user.biography == ''
+    assert db.retrieve(User, 'abc_123') == user
+
+    with pytest.raises(ConditionFailedError):
+        db.update(User, 'abc_123', add={'karma': 1}, condition={'karma': 3})
+    assert db.retrieve(User, 'abc_123').karma == 10
+
+
+def test_update_missing(db):
+    """Test that updating a missing object raises an error."""
+    with pytest.raises(LookupError):
+        db.update(Team, '2', add={'members': {'a'}})
+    with pytest.raises(ConditionFailedError):
+        db.update(Team, '2', set_values={'display_name': 'Two'},
+                  condition={'platform': 'slack'})
+    assert db.query(Team) == []
+
+
+def test_projection(db):
+    """Test reading only some attributes of models."""
+    team = create_test_team('1', 'rocket2.0', 'Rocket 2.0')
+    db.store(team)
+    user = create_test_admin('abc_123')
+    db.store(user)
+
+    teams = db.query(Team, fields=['display_name'])
+    assert teams[0].github_team_name == 'rocket2.0'
+    assert teams[0].display_name == 'Rocket 2.0'
+    assert teams[0].members == set()
+    retrieved = db.retrieve(User, 'abc_123', fields=['name'])
+    assert retrieved.name == user.name
+    assert retrieved.email == ''
+    assert db.bulk_retrieve(User, ['abc_123'], fields=[])[0].name == ''
+
+
+def test_conditional_store_delete(db):
+    """Test storing and deleting objects only if they (don't) exist."""
+    user = create_test_admin('abc_123')
+    with pytest.raises(ConditionFailedError):
+        db.store(user, if_exists=True)
+    assert db.store(user, if_not_exists=True)
+    user.name = 'Sprouts'
+    with pytest.raises(ConditionFailedError):
+        db.store(user, if_not_exists=True)
+    assert db.store(user, if_exists=True)
+    assert db.retrieve(User, 'abc_123') == user
+
+    db.delete(User, 'abc_123', if_exists=True)
+    assert db.query(User, [('slack_id', 'abc_123')]) == []
+    with pytest.raises(ConditionFailedError):
+        db.delete(User, 'abc_123', if_exists=True)
@@ -0,0 +1,94 @@
+"""Test the buffer of set updates."""
+from app.model import Team, User
+from db.facade import DBFacade
+from db.write_buffer import SetUpdateBuffer
+from threading import Event
+from unittest import TestCase, mock
+
+
+class TestSetUpdateBuffer(TestCase):
+    """Test the SetUpdateBuffer class."""
+
+    def setUp(self):
+        """Set up a buffer with a long window."""
+        self.facade = mock.MagicMock(DBFacade)
+        self.buffer = SetUpdateBuffer(self.facade, 60)
+
+    def test_combine_updates(self):
+        """Test that updates to an object are combined into one write."""
+        self.buffer.update(Team, '1', add={'members': {'a'}})
+        self.buffer.update(Team, '1', add={'members': {'b', 'c'}})
+        self.buffer.update(Team, '1', remove={'members': {'c', 'd'}})
+        self.buffer.update(Team, '2', add={'team_leads': {'a'}})
+        assert self.buffer.pending(Team, '1', 'members', 'a')
+        assert self.buffer.pending(Team, '1', 'members', 'd') is False
+        assert self.buffer.pending(Team, '1', 'members', 'e') is None
+        assert self.buffer.pending(User, '1', 'members', 'a') is None
+        self.facade.update.assert_not_called()
+
+        self.buffer.flush()
+        self.facade.update.assert_has_calls([
+            mock.call(Team, '1',
+                      {'members': {'a', 'b'}}, {'members': {'c', 'd'}}),
+            mock.call(Team, '2', {'team_leads': {'a'}}, {})
+        ])
+        assert self.buffer.stats() == {'pending': 0, 'updates': 4,
+                                       'writes': 2, 'retried': 0,
+                                       'failed': 0}
+
+    def test_failed_write(self):
+        """Test that failed writes are retried, then counted."""
+        self.facade.update.side_effect = LookupError
+        self.buffer.update(Team, '1', add={'members': {'a'}})
+        self.buffer.flush()
+        assert self.facade.update.call_count == 5
+        stats = self.buffer.stats()
+        assert stats['retried'] == 4
+        assert stats['failed'] == 1
+        assert stats['pending'] == 0
+
+    def test_retry_write(self):
+        """Test that a failed write is put back and written later."""
+        self.facade.update.side_effect = [LookupError, None]
+        self.buffer.update(Team, '1', add={'members': {'a'}})
+        self.buffer.flush()
+        assert self.facade.update.call_args_list == [
+            mock.call(Team, '1', {'members': {'a'}}, {})] * 2
+        stats = self.buffer.stats()
+        assert stats['retried'] == 1
+        assert stats['failed'] == 0
+
+    def test_retry_merges_newer_updates(self):
+        """Test that updates made during a failed write take precedence."""
+        buffer = SetUpdateBuffer(self.facade, 0.01, backoff=0)
+        written = Event()
+
+        def update(Model, k, add, remove):
+            if self.facade.update.call_count == 1:
+                buffer.update(Team, '1', remove={'members': {'a'}},
+                              add={'members': {'c'}})
+                raise LookupError
+            written.set()
+
+        self.facade.update.side_effect = update
+        buffer.update(Team, '1', add={'members': {'a', 'b'}})
+        assert written.wait(5)
+        buffer.flush()
+        assert self.facade.update.call_count == 2
+        self.facade.update.assert_called_with(
+            Team, '1', {'members': {'b', 'c'}}, {'members': {'a'}})
+        assert buffer.stats()['retried'] == 1
+
+    def test_no_window(self):
+        """Test that updates are written right away without a window."""
+        buffer = SetUpdateBuffer(self.facade, 0)
+        buffer.update(Team, '1', add={'members': {'a'}})
+        self.facade.update.assert_called_once_with(
+            Team, '1', {'members': {'a'}}, None)
+
+    def test_update_after_flush(self):
+        """Test that updates are written right away once flushed."""
+        self.buffer.flush()
+        self.buffer.update(Team, '1', remove={'members': {'a'}})
+        self.facade.update.assert_called_once_with(
+            Team, '1', None, {'members': {'a'}})
@@ -1,11 +1,13 @@
 """Tests for factories."""
 import pytest
 
-from factory import make_command_parser, CommandParser, \
+from factory import make_command_parser, CommandParser, make_http_session, \
     make_github_webhook_handler, GitHubWebhookHandler, \
-    make_slack_events_handler, SlackEventsHandler
-from unittest.mock import MagicMock
+    make_slack_events_handler, SlackEventsHandler, make_dbfacade, \
+    make_webhook_queue, make_delivery_log, make_slack_dispatcher
+from unittest.mock import MagicMock, patch
 from config import Config
+from db import DBFacade
 
 
 @pytest.fixture
@@ -15,6 +17,20 @@ def test_config():
     test_config.aws_users_tablename = 'users_test'
     test_config.aws_teams_tablename = 'teams_test'
     test_config.aws_projects_tablename = 'projects_test'
+    test_config.aws_scan_segments = 1
+    test_config.aws_max_pool_connections = 25
+    test_config.aws_skip_table_check = False
+    test_config.db_cache_size = 16
+    test_config.db_cache_ttl = 30
+    test_config.command_workers = 4
+    test_config.http_timeout = 5.0
+    test_config.http_retries = 2
+    test_config.github_webhook_async = False
+    test_config.github_webhook_workers = 2
+    test_config.github_webhook_queue_db = ''
+    test_config.github_delivery_ttl = 60
+    test_config.aws_deliveries_tablename = ''
+    test_config.sqlite_db = ''
     test_config.github_webhook_secret = 'secret'
     test_config.slack_api_token = 'token'
     test_config.slack_notification_channel = 'channel'
@@ -23,6 +39,28 @@ def test_config():
     return test_config
 
 
+@pytest.mark.db
+def test_make_dbfacade(test_config):
+    """Test the make_dbfacade function."""
+    facade = make_dbfacade(test_config)
+    assert facade.cache is not None
+    assert facade.cache.max_size == 16
+
+    test_config.db_cache_size = 0
+    assert make_dbfacade(test_config).cache is None
+
+
+def test_make_dbfacade_sqlite(test_config, tmp_path):
+    """Test the make_dbfacade function with an SQLite database."""
+    test_config.sqlite_db = str(tmp_path / 'rocket.db')
+    facade = make_dbfacade(test_config)
+    assert str(facade.ddb) == 'SQLite'
+    assert facade.ddb.check_valid_table('users_test')
+
+    test_config.aws_deliveries_tablename = 'deliveries_test'
+    assert make_delivery_log(test_config, facade).table is None
+
+
 @pytest.mark.db
 def test_make_command_parser(test_config):
     """Test the make_command_parser function."""
@@ -42,3 +80,69 @@ def test_make_slack_events_handler(test_config):
     """Test the make_command_slack_events_handler function."""
     handler = make_slack_events_handler(test_config)
     assert isinstance(handler, SlackEventsHandler)
+
+
+def test_make_with_shared_facade(test_config):
+    """Test that factories reuse the facade they are given."""
+    facade = MagicMock(DBFacade)
+    with patch('factory.make_dbfacade') as make_dbfacade:
+        make_command_parser(test_config, facade=facade)
+        make_github_webhook_handler(test_config, facade=facade)
+        make_slack_events_handler(test_config, facade=facade)
+        make_dbfacade.assert_not_called()
+
+
+def test_make_with_shared_dispatcher(test_config):
+    """Test that every bot made by the factories shares one dispatcher."""
+    dispatcher = make_slack_dispatcher(test_config)
+    facade = MagicMock(DBFacade)
+    with patch('factory.Bot') as bot:
+        make_command_parser(test_config, facade=facade, dispatcher=dispatcher)
+        make_slack_events_handler(test_config, facade=facade,
+                                  dispatcher=dispatcher)
+    assert bot.call_count == 2
+    for call in bot.call_args_list:
+        assert call[0][0] is dispatcher.sc
+        assert call[0][2] is dispatcher
+
+
+def test_make_http_session(test_config):
+    """Test the make_http_session function."""
+    session = make_http_session(test_config)
+    adapter = session.get_adapter('https://hooks.slack.com')
+    assert adapter.timeout == 5.0
+    assert adapter.max_retries.total == 2
+
+
+def test_make_webhook_queue(test_config, tmp_path):
+    """Test the make_webhook_queue function."""
+    assert make_webhook_queue(test_config) is None
+
+    test_config.github_webhook_async = True
+    queue = make_webhook_queue(test_config)
+    assert queue is not None
+    assert queue.workers == 2
+
+    path = str(tmp_path / 'webhooks.db')
+    test_config.github_webhook_queue_db = path
+    queue = make_webhook_queue(test_config)
+    event_id = queue.store.add({'action': 'created'})
+    queue.store.dead(event_id, 'error')
+    queue = make_webhook_queue(test_config)
+    assert queue.store.pending() == []
+    assert queue.store.dead_letters() == \
+        [(event_id, {'action': 'created'}, 'error')]
+
+
+@pytest.mark.db
+def test_make_delivery_log(test_config):
+    """Test the make_delivery_log function."""
+    facade = make_dbfacade(test_config)
+    deliveries = make_delivery_log(test_config, facade)
+    assert deliveries.ttl == 60
+    assert deliveries.table is None
+
+    test_config.aws_deliveries_tablename = 'deliveries_test'
+    deliveries = make_delivery_log(test_config, facade)
+    assert deliveries.table is not None
+    assert facade.ddb.check_valid_table('deliveries_test')
@@ -138,3 +138,58 @@ def test_create_api_token(mock_post, mock_get):
         headers=expected_headers)
     mock_factory.create.assert_called_once()
     mock_auth.is_expired.assert_called_once()
+
+
+def test_get_app_details_with_session():
+    """Test that get_app_details() uses the given session."""
+    mock_auth = MagicMock(GithubAppInterface.GithubAppAuth)
+    mock_auth.is_expired = MagicMock(return_value=False)
+    mock_auth.token = 'token'
+    mock_factory = MagicMock(DefaultGithubAppAuthFactory)
+    mock_factory.create = MagicMock(return_value=mock_auth)
+    mock_session = MagicMock()
+    mock_session.get.return_value.status_code = 200
+    app_interface = GithubAppInterface(mock_factory, mock_session)
+
+    app_interface.get_app_details()
+
+    mock_session.get.assert_called_once()
+
+
+@patch('requests.get')
+@patch('requests.post')
+def test_create_api_token_cached(mock_post, mock_get):
+    """Test that create_api_token() reuses tokens until they expire."""
+    mock_auth = MagicMock(GithubAppInterface.GithubAppAuth)
+    mock_auth.is_expired = MagicMock(return_value=False)
+    mock_auth.token = 'jwt'
+    mock_factory = MagicMock(DefaultGithubAppAuthFactory)
+    mock_factory.create = MagicMock(return_value=mock_auth)
+    app_interface = GithubAppInterface(mock_factory)
+    expiry = datetime.utcnow() + timedelta(hours=1)
+    mock_get.return_value.status_code = 200
+    mock_get.return_value.json.return_value = [{'id': 7}]
+    mock_post.return_value.status_code = 201
+    mock_post.return_value.json.return_value = {
+        'token': 'token',
+        'expires_at': expiry.strftime('%Y-%m-%dT%H:%M:%SZ')
+    }
+
+    assert app_interface.create_api_token() == 'token'
+    assert app_interface.create_api_token() == 'token'
+    assert not app_interface.token_expiring()
+    mock_get.assert_called_once()
+    mock_post.assert_called_once()
+
+    # Token is about to expire, so a new one is made
+    app_interface.token_expiry = datetime.utcnow() + timedelta(minutes=1)
+    assert app_interface.token_expiring()
+    mock_post.return_value.json.return_value = {'token': 'token2'}
+    assert app_interface.create_api_token() == 'token2'
+    assert mock_post.call_count == 2
+
+    # Refreshing makes a new token, but keeps the installation
+    mock_post.return_value.json.return_value = {'token': 'token3'}
+    assert app_interface.create_api_token(refresh=True) == 'token3'
+    assert mock_post.call_count == 3
+    mock_get.assert_called_once()
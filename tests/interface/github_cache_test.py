@@ -0,0 +1,122 @@
+"""Test the Github object cache."""
+from interface.github_cache import GithubObjectCache, revalidate_copy
+from threading import Event, Thread
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+
+class TestGithubObjectCache(TestCase):
+    """Test case for GithubObjectCache class."""
+
+    def setUp(self):
+        """Set up a cache with a controllable clock."""
+        self.now = 0.0
+        self.revalidate = MagicMock(side_effect=lambda obj: obj)
+        self.cache = GithubObjectCache(2, 10.0, lambda: self.now,
+                                       self.revalidate)
+
+    def test_get_fetches_once(self):
+        """Test that objects are only fetched the first time."""
+        obj = MagicMock()
+        fetch = MagicMock(return_value=obj)
+        self.assertIs(self.cache.get('a', fetch), obj)
+        self.assertIs(self.cache.get('a', fetch), obj)
+        fetch.assert_called_once()
+        self.revalidate.assert_not_called()
+
+    def test_get_revalidates_expired(self):
+        """Test that expired objects are revalidated, not refetched."""
+        obj = MagicMock()
+        fetch = MagicMock(return_value=obj)
+        self.cache.get('a', fetch)
+        self.now = 10.0
+        self.assertIs(self.cache.get('a', fetch), obj)
+        fetch.assert_called_once()
+        self.revalidate.assert_called_once_with(obj)
+        self.now = 15.0
+        self.cache.get('a', fetch)
+        self.revalidate.assert_called_once()
+
+    def test_get_replaces_changed(self):
+        """Test that a changed object is replaced by its up-to-date copy."""
+        obj, fresh = MagicMock(), MagicMock()
+        self.cache.get('a', lambda: obj)
+        self.now = 10.0
+        self.revalidate.side_effect = lambda _: fresh
+        self.assertIs(self.cache.get('a', MagicMock()), fresh)
+        self.assertIs(self.cache.get('a', MagicMock()), fresh)
+        self.revalidate.assert_called_once_with(obj)
+
+    def test_revalidated_by_one_thread(self):
+        """Test that other threads get the object while it's revalidated."""
+        obj = MagicMock()
+        self.cache.get('a', lambda: obj)
+        self.now = 10.0
+        started, finish = Event(), Event()
+
+        def revalidate(stale):
+            started.set()
+            finish.wait(5)
+            return MagicMock()
+
+        self.revalidate.side_effect = revalidate
+        thread = Thread(target=self.cache.get, args=('a', MagicMock()))
+        thread.start()
+        self.assertTrue(started.wait(5))
+        self.assertIs(self.cache.get('a', MagicMock()), obj)
+        finish.set()
+        thread.join()
+        self.revalidate.assert_called_once_with(obj)
+        self.assertIsNot(self.cache.get('a', MagicMock()), obj)
+
+    def test_failed_revalidation(self):
+        """Test that an object is revalidated again if revalidating fails."""
+        obj = MagicMock()
+        self.cache.get('a', lambda: obj)
+        self.now = 10.0
+        self.revalidate.side_effect = ValueError
+        with self.assertRaises(ValueError):
+            self.cache.get('a', MagicMock())
+        self.revalidate.side_effect = lambda stale: stale
+        self.assertIs(self.cache.get('a', MagicMock()), obj)
+        self.assertEqual(self.revalidate.call_count, 2)
+
+    def test_revalidate_copy(self):
+        """Test that objects are revalidated without being modified."""
+        class GithubObject:
+            def __init__(self):
+                self.name = 'old'
+
+            def update(self):
+                changed = self.name != 'new'
+                self.name = 'new'
+                return changed
+
+        obj = GithubObject()
+        fresh = revalidate_copy(obj)
+        self.assertEqual(obj.name, 'old')
+        self.assertEqual(fresh.name, 'new')
+        self.assertIs(revalidate_copy(fresh), fresh)
+
+    def test_evicts_least_recently_used(self):
+        """Test that the least recently used object is evicted."""
+        self.cache.get('a', MagicMock)
+        self.cache.get('b', MagicMock)
+        self.cache.get('a', MagicMock)
+        self.cache.get('c', MagicMock)
+        self.assertEqual(len(self.cache), 2)
+        fetch = MagicMock()
+        self.cache.get('a', fetch)
+        fetch.assert_not_called()
+        self.cache.get('b', fetch)
+        fetch.assert_called_once()
+
+    def test_invalidate_and_clear(self):
+        """Test removing objects from the cache."""
+        self.cache.get('a', MagicMock)
+        self.cache.get('b', MagicMock)
+        self.cache.invalidate('a')
+        self.cache.invalidate('not there')
+        self.assertEqual(len(self.cache), 1)
+        self.cache.clear()
+        self.assertEqual(len(self.cache), 0)
@@ -0,0 +1,112 @@
+"""Test the Github rate limit governor."""
+from github import Github
+from interface.exceptions.github import GithubAPIException
+from interface.github_rate_limit import RateLimitGovernor
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+
+class TestRateLimitGovernor(TestCase):
+    """Test case for RateLimitGovernor class."""
+
+    def setUp(self):
+        """Set up a governor with a controllable clock."""
+        self.now = 1000.0
+        self.sleep = MagicMock()
+        self.governor = RateLimitGovernor(reserve=10,
+                                          max_wait=30.0,
+                                          clock=lambda: self.now,
+                                          sleep=self.sleep)
+
+    def test_no_pacing_with_budget(self):
+        """Test that requests aren't paced while budget is plentiful."""
+        self.governor.update(4000, 5000, self.now + 600)
+        for _ in range(5):
+            self.governor.acquire()
+        self.sleep.assert_not_called()
+        self.assertEqual(self.governor.stats()['remaining'], 3995)
+
+    def test_paces_when_low(self):
+        """Test that requests are spaced out once budget runs low."""
+        self.governor.update(5, 5000, self.now + 50)
+        self.governor.acquire()
+        self.governor.acquire()
+        self.sleep.assert_called_once_with(10.0)
+        self.assertEqual(self.governor.stats()['throttled'], 10.0)
+
+    def test_observe(self):
+        """Test recording the rate limit seen by pygithub."""
+        github = Github('token')
+        github.get_rate_limit = MagicMock()
+        self.governor.observe(github)
+        github.get_rate_limit.assert_not_called()
+        self.assertIsNone(self.governor.stats()['remaining'])
+
+        requester = github._Github__requester
+        requester.rate_limiting = (42, 5000)
+        requester.rate_limiting_resettime = 1234
+        self.governor.observe(github)
+        github.get_rate_limit.assert_not_called()
+        self.assertDictEqual(self.governor.stats(),
+                             {'remaining': 42,
+                              'limit': 5000,
+                              'reset': 1234,
+                              'throttled': 0.0})
+
+    def test_slows_down_instead_of_failing(self):
+        """Test that requests near the reserve wait rather than fail."""
+        governor = RateLimitGovernor(reserve=10,
+                                     clock=lambda: self.now,
+                                     sleep=self.sleep)
+        governor.update(2, 5000, self.now + 600)
+        for _ in range(4):
+            governor.acquire()
+        # Paced over what's left of the budget, then at most until the reset
+        self.assertListEqual([c[0][0] for c in self.sleep.call_args_list],
+                             [300.0, 600.0, 600.0])
+        self.assertEqual(governor.stats()['remaining'], 0)
+
+    def test_backoff_retry_after(self):
+        """Test that Retry-After blocks requests."""
+        self.assertEqual(self.governor.backoff({'Retry-After': '7'}), 7.0)
+        self.governor.acquire()
+        self.sleep.assert_called_once_with(7.0)
+
+    def test_backoff_exhausted(self):
+        """Test backing off until the reset time once out of budget."""
+        self.assertEqual(
+            self.governor.backoff({'X-RateLimit-Remaining': '0',
+                                   'X-RateLimit-Reset': '1020'}), 20.0)
+        self.governor.acquire()
+        self.sleep.assert_called_once_with(20.0)
+
+    def test_wait_too_long(self):
+        """Test that requests fail instead of waiting longer than allowed."""
+        self.governor.update(0, 5000, self.now + 100)
+        self.assertEqual(self.governor.backoff(), 100.0)
+        with self.assertRaises(GithubAPIException):
+            self.governor.acquire()
+        self.sleep.assert_not_called()
+        self.assertDictEqual(self.governor.stats(),
+                             {'remaining': 0,
+                              'limit': 5000,
+                              'reset': 1100.0,
+                              'throttled': 0.0})
+
+        self.now = 1075.0
+        self.governor.acquire()
+        self.sleep.assert_called_once_with(25.0)
+
+    def test_backoff_secondary(self):
+        """Test backing off from secondary rate limits."""
+        self.assertEqual(
+            self.governor.backoff(
+                message="You have triggered an abuse detection mechanism"),
+            RateLimitGovernor.SECONDARY_BACKOFF)
+
+    def test_backoff_not_rate_limited(self):
+        """Test that other errors don't cause a backoff."""
+        self.governor.update(100, 5000, self.now + 100)
+        self.assertIsNone(self.governor.backoff({}, "Must be an admin"))
+        self.governor.acquire()
+        self.sleep.assert_not_called()
@@ -2,6 +2,7 @@
 from github import Github, Organization, NamedUser, \
     GithubException, Team, PaginatedList
 from interface.github import GithubInterface, GithubAPIException
+from threading import Thread
 from unittest import TestCase
 from unittest.mock import MagicMock, Mock
 
@@ -12,8 +13,11 @@ class TestGithubInterface(TestCase):
     def setUp(self):
         """Set up testing environment."""
         self.mock_github = MagicMock(Github)
+        self.mock_github.rate_limiting = (5000, 5000)
+        self.mock_github.rate_limiting_resettime = 0
         self.mock_factory = MagicMock()
         self.mock_factory.create.return_value = self.mock_github
+        self.mock_factory.token_expiring.return_value = False
         self.mock_org = MagicMock(Organization.Organization)
         self.mock_github.get_organization.return_value = self.mock_org
         self.test_interface = GithubInterface(self.mock_factory,
@@ -112,6 +116,152 @@ class TestGithubInterface(TestCase):
         self.test_interface.org_get_teams()
         self.mock_org.get_teams.assert_called_once()
 
+    def test_org_get_teams_members(self):
+        """Test that org_get_teams lists members through each team."""
+        teams = []
+        for i in range(12):
+            team = MagicMock(Team.Team)
+            team.id = i
+            team.name = f"team{i}"
+            member = MagicMock(NamedUser.NamedUser)
+            member.id = 100 + i
+            team.get_members.return_value = [member]
+            teams.append(team)
+        self.mock_org.get_teams.return_value = teams
+        worker_github = MagicMock(Github)
+        worker_github.create_from_raw_data.side_effect = \
+            lambda _, data: teams[data['id']]
+        self.mock_factory.create.return_value = worker_github
+        result = self.test_interface.org_get_teams()
+        self.assertEqual([t.github_team_id for t in result],
+                         [str(i) for i in range(12)])
+        self.assertEqual(result[3].github_team_name, "team3")
+        self.assertSetEqual(result[3].members, {"103"})
+        self.mock_org.get_team.assert_not_called()
+
+    def test_org_get_teams_client_per_worker(self):
+        """Test that each worker lists members with its own client."""
+        teams = []
+        for i in range(12):
+            team = MagicMock(Team.Team)
+            team.id = i
+            teams.append(team)
+        self.mock_org.get_teams.return_value = teams
+        self.mock_factory.create.reset_mock()
+        clients = []
+
+        def create():
+            clients.append(MagicMock(Github))
+            return clients[-1]
+
+        self.mock_factory.create.side_effect = create
+        self.test_interface.governor = MagicMock()
+        self.test_interface.org_get_teams()
+        observed = [c[0][0] for c in
+                    self.test_interface.governor.observe.call_args_list]
+        for client in clients:
+            self.assertIn(client, observed)
+        self.assertGreaterEqual(self.mock_factory.create.call_count, 1)
+        self.assertLessEqual(self.mock_factory.create.call_count,
+                             GithubInterface.TEAM_MEMBER_WORKERS)
+        self.mock_github.create_from_raw_data.assert_not_called()
+        for team in teams:
+            team.get_members.assert_not_called()
+
+    def test_users_and_teams_cached(self):
+        """Test that users and teams are only fetched once."""
+        mock_user: MagicMock = MagicMock(NamedUser.NamedUser)
+        self.mock_github.get_user.return_value = mock_user
+        self.mock_org.get_team.return_value = self.mock_team
+        self.test_interface.add_team_member("user", "12345")
+        self.test_interface.has_team_member("User", "12345")
+        self.mock_github.get_user.assert_called_once_with("user")
+        self.mock_org.get_team.assert_called_once_with(12345)
+
+        self.test_interface.org_delete_team(12345)
+        self.test_interface.org_get_team(12345)
+        self.assertEqual(self.mock_org.get_team.call_count, 2)
+
+    def test_revalidate_with_thread_client(self):
+        """Test that cached objects are revalidated by a copy."""
+        cached = MagicMock(Team.Team)
+        fresh = MagicMock(Team.Team)
+        self.mock_github.create_from_raw_data.return_value = fresh
+        fresh.update.return_value = False
+        self.assertIs(self.test_interface._revalidate(cached), cached)
+        self.mock_github.create_from_raw_data.assert_called_once_with(
+            type(cached), cached.raw_data, cached.raw_headers)
+        cached.update.assert_not_called()
+
+        fresh.update.return_value = True
+        self.assertIsNot(self.test_interface._revalidate(cached), cached)
+        self.mock_github.create_from_raw_data.assert_called_with(
+            type(cached), fresh.raw_data, fresh.raw_headers)
+
+    def test_thread_github(self):
+        """Test that each thread gets its own pygithub interface."""
+        self.mock_factory.create.reset_mock()
+        self.mock_factory.create.side_effect = lambda *_: MagicMock(Github)
+        github = self.test_interface._thread_github()
+        self.assertIs(self.test_interface._thread_github(), github)
+        clients = []
+        thread = Thread(target=lambda: clients.append(
+            self.test_interface._thread_github()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(clients[0], github)
+
+        self.test_interface.renew_github(self.mock_github)
+        self.assertIsNot(self.test_interface._thread_github(), github)
+
+    def test_rate_limited_retry(self):
+        """Test that rate limited calls back off and are retried."""
+        self.test_interface.governor = MagicMock()
+        self.test_interface.governor.backoff.return_value = 5.0
+        mock_user: MagicMock = MagicMock(NamedUser.NamedUser)
+        self.mock_github.get_user.side_effect = \
+            [GithubException(403, {"message": "abuse"}), mock_user]
+        self.test_interface.org_add_admin("user@email.com")
+        self.test_interface.governor.backoff. \
+            assert_called_once_with(None, "{'message': 'abuse'}")
+        self.assertEqual(self.test_interface.governor.acquire.call_count, 2)
+        self.mock_org.add_to_members. \
+            assert_called_once_with(mock_user, "admin")
+
+    def test_forbidden_not_retried(self):
+        """Test that 403s not caused by rate limiting aren't retried."""
+        self.mock_github.get_user.side_effect = \
+            GithubException(403, {"message": "Must be an admin"})
+        with self.assertRaises(GithubAPIException):
+            self.test_interface.org_add_admin("user@email.com")
+        self.mock_github.get_user.assert_called_once()
+
+    def test_renew_github_on_401(self):
+        """Test that a 401 renews the pygithub interface once."""
+        mock_user: MagicMock = MagicMock(NamedUser.NamedUser)
+        self.mock_github.get_user.side_effect = \
+            [GithubException(401, "data"), mock_user]
+        self.test_interface.org_add_admin("user@email.com")
+        self.mock_factory.create.assert_called_with(True)
+        self.assertEqual(self.mock_factory.create.call_count, 2)
+        self.mock_org.add_to_members. \
+            assert_called_once_with(mock_user, "admin")
+
+    def test_renew_github_when_expiring(self):
+        """Test that the pygithub interface is renewed before expiry."""
+        self.mock_factory.token_expiring.return_value = True
+        self.test_interface.org_add_admin("user@email.com")
+        self.mock_factory.create.assert_called_with(False)
+        self.assertEqual(self.mock_factory.create.call_count, 2)
+        self.assertEqual(len(self.test_interface.cache), 1)
+
+    def test_renew_github_already_renewed(self):
+        """Test that a stale interface renewed elsewhere isn't renewed."""
+        stale = MagicMock(Github)
+        self.assertIs(self.test_interface.renew_github(stale),
+                      self.mock_github)
+        self.mock_factory.create.assert_called_once_with()
+
     def test_setup_exception(self):
         """Test GithubInterface setup with exception raised."""
         self.mock_github. \
@@ -258,6 +408,54 @@ class TestGithubInterface(TestCase):
                                             '12345')
         self.mock_team.add_membership.assert_called_once_with(self.test_user)
 
+    def test_tmem_add_team_members(self):
+        """Test adding many users, each worker with its own client."""
+        self.mock_team.url = 'https://api.github.com/teams/12345'
+        self.mock_org.get_team.return_value = self.mock_team
+        clients = []
+        added = []
+
+        def add_membership(member):
+            if member.login == 'user3':
+                raise GithubException(404, "Not Found")
+            if member.login == 'user5':
+                raise ConnectionError("reset")
+            added.append(member.login)
+
+        def create_from_raw_data(klass, data):
+            obj = MagicMock(klass)
+            if klass is NamedUser.NamedUser:
+                obj.login = data['login']
+            else:
+                obj.add_membership.side_effect = add_membership
+            return obj
+
+        def create():
+            client = MagicMock(Github)
+            client.create_from_raw_data.side_effect = create_from_raw_data
+            clients.append(client)
+            return client
+
+        self.mock_factory.create.side_effect = create
+        usernames = [f'user{i}' for i in range(20)]
+        done = MagicMock()
+        errors = self.test_interface.add_team_members(usernames, '12345',
+                                                      done)
+        self.assertDictEqual(errors, {'user3': 'Not Found',
+                                      'user5': 'reset'})
+        self.assertEqual(sorted(added),
+                         sorted(set(usernames) - {'user3', 'user5'}))
+        self.assertEqual(done.call_count, 20)
+        done.assert_any_call('user3', 'Not Found')
+        done.assert_any_call('user0', None)
+        self.assertGreaterEqual(len(clients), 1)
+        self.assertLessEqual(len(clients), GithubInterface.ADD_MEMBER_WORKERS)
+        for client in clients:
+            client.create_from_raw_data.assert_any_call(
+                Team.Team, {'id': 12345, 'url': self.mock_team.url})
+        self.mock_team.add_membership.assert_not_called()
+        self.mock_github.get_user.assert_not_called()
+
     def test_tmem_remove_team_member(self):
         """Test if the user removed is no longer in the team."""
         self.mock_github.get_user = MagicMock(return_value=self.test_user)
@@ -0,0 +1,131 @@
+"""Test the Slack API dispatcher."""
+from interface.slack_dispatcher import SlackDispatcher, TokenBucket
+from slack import WebClient
+from slack.errors import SlackApiError
+from threading import Event
+from unittest import mock, TestCase
+
+
+def make_error(status_code, headers=None):
+    """Make a SlackApiError with the given response status and headers."""
+    response = mock.MagicMock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    return SlackApiError("The request to the Slack API failed.", response)
+
+
+class TestTokenBucket(TestCase):
+    """Test case for TokenBucket class."""
+
+    def setUp(self):
+        """Set up a bucket with a controllable clock."""
+        self.now = 0.0
+        self.sleep = mock.MagicMock()
+        self.bucket = TokenBucket(2.0, 2.0, lambda: self.now, self.sleep)
+
+    def test_acquire(self):
+        """Test that callers wait once the bucket is empty."""
+        self.assertEqual(self.bucket.acquire(), 0.0)
+        self.assertEqual(self.bucket.acquire(), 0.0)
+        self.assertEqual(self.bucket.acquire(), 0.5)
+        self.assertEqual(self.bucket.acquire(), 1.0)
+        self.now = 10.0
+        self.assertEqual(self.bucket.acquire(), 0.0)
+
+    def test_pause(self):
+        """Test that pausing holds back the next caller."""
+        self.bucket.pause(3.0)
+        self.assertEqual(self.bucket.acquire(), 3.0)
+        self.sleep.assert_called_once_with(3.0)
+
+
+class TestSlackDispatcher(TestCase):
+    """Test case for SlackDispatcher class."""
+
+    def setUp(self):
+        """Set up the test case environment."""
+        self.mock_sc = mock.MagicMock(WebClient)
+        self.dispatcher = SlackDispatcher(self.mock_sc, window=0.05)
+
+    def test_call(self):
+        """Test that calls are passed to the client."""
+        self.mock_sc.conversations_list.return_value = {'ok': True}
+        self.assertEqual(self.dispatcher.call('conversations_list', limit=5),
+                         {'ok': True})
+        self.mock_sc.conversations_list.assert_called_once_with(limit=5)
+
+    def test_call_retries_rate_limited(self):
+        """Test that rate limited calls are retried."""
+        self.mock_sc.chat_postMessage.side_effect = \
+            [make_error(429, {'Retry-After': '0'}), {'ok': True}]
+        self.assertEqual(self.dispatcher.call('chat_postMessage',
+                                              channel='C1', text='hi'),
+                         {'ok': True})
+        self.assertEqual(self.mock_sc.chat_postMessage.call_count, 2)
+        self.assertEqual(self.dispatcher.stats()['retried'], 1)
+
+    def test_call_raises_other_errors(self):
+        """Test that errors other than rate limiting aren't retried."""
+        self.mock_sc.chat_postMessage.side_effect = make_error(404)
+        with self.assertRaises(SlackApiError):
+            self.dispatcher.call('chat_postMessage', channel='C1', text='hi')
+        self.mock_sc.chat_postMessage.assert_called_once()
+
+    def test_post_coalesces(self):
+        """Test that queued messages to a channel are combined."""
+        self.assertTrue(self.dispatcher.post('C1', 'one'))
+        self.assertTrue(self.dispatcher.post('C2', 'other'))
+        self.assertTrue(self.dispatcher.post('C1', 'two'))
+        self.dispatcher.flush()
+        self.mock_sc.chat_postMessage.assert_any_call(channel='C1',
+                                                      text='one\ntwo')
+        self.mock_sc.chat_postMessage.assert_any_call(channel='C2',
+                                                      text='other')
+        self.assertDictEqual(self.dispatcher.stats(),
+                             {'queued': 0, 'sent': 3, 'coalesced': 1,
+                              'dropped': 0, 'retried': 0})
+
+    def test_post_batches_are_capped(self):
+        """Test that no more than MAX_BATCH messages are combined."""
+        for i in range(SlackDispatcher.MAX_BATCH + 1):
+            self.dispatcher.post('C1', str(i))
+        self.dispatcher.flush()
+        self.assertEqual(self.mock_sc.chat_postMessage.call_count, 2)
+
+    def test_post_queue_full(self):
+        """Test that messages are dropped once the queue is full."""
+        dispatcher = SlackDispatcher(self.mock_sc, max_queue=1, window=0.05)
+        self.assertTrue(dispatcher.post('C1', 'one'))
+        self.assertFalse(dispatcher.post('C1', 'two'))
+        dispatcher.flush()
+        self.mock_sc.chat_postMessage.assert_called_once_with(channel='C1',
+                                                              text='one')
+        self.assertEqual(dispatcher.stats()['dropped'], 1)
+
+    def test_post_send_failure(self):
+        """Test that messages that can't be sent are counted as dropped."""
+        self.mock_sc.chat_postMessage.side_effect = make_error(404)
+        self.dispatcher.post('C1', 'one')
+        self.dispatcher.post('C1', 'two')
+        self.dispatcher.flush()
+        self.assertEqual(self.dispatcher.stats()['dropped'], 2)
+
+    def test_post_survives_other_errors(self):
+        """Test that messages are still sent after an unexpected error."""
+        failed = Event()
+
+        def post_message(channel, text):
+            if not failed.is_set():
+                failed.set()
+                raise ConnectionError("Connection reset by peer")
+
+        self.mock_sc.chat_postMessage.side_effect = post_message
+        self.dispatcher.post('C1', 'one')
+        self.assertTrue(failed.wait(5))
+        self.dispatcher.post('C1', 'two')
+        self.dispatcher.flush()
+        self.mock_sc.chat_postMessage.assert_called_with(channel='C1',
+                                                         text='two')
+        stats = self.dispatcher.stats()
+        self.assertEqual(stats['dropped'], 1)
+        self.assertEqual(stats['sent'], 1)
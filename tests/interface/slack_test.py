@@ -69,7 +69,7 @@ class TestBot(TestCase):
     def test_get_channels(self):
         """Test get_channel_names() method."""
         resp = {'ok': True, 'channels': []}
-        self.mock_sc.conversations_list = mock.MagicMock(return_values=resp)
+        self.mock_sc.conversations_list = mock.MagicMock(return_value=resp)
         names = self.bot.get_channel_names()
 
         assert len(names) == 0
@@ -85,9 +85,44 @@ class TestBot(TestCase):
                                                            ]}
         assert self.bot.get_channel_users("C1234441") == ids
         self.mock_sc.conversations_members.assert_called_with(
-            channel="C1234441"
+            channel="C1234441",
+            limit=Bot.PAGE_SIZE
         )
 
+    def test_get_channel_users_paginated(self):
+        """Test that get_channel_users() follows the cursor."""
+        self.mock_sc.conversations_members.side_effect = [
+            {'ok': True, 'members': ["U1", "U2"],
+             'response_metadata': {'next_cursor': 'abc'}},
+            {'ok': True, 'members': ["U3"],
+             'response_metadata': {'next_cursor': ''}}
+        ]
+        assert self.bot.get_channel_users("C1", limit=2) == \
+            ["U1", "U2", "U3"]
+        self.mock_sc.conversations_members.assert_called_with(
+            channel="C1", limit=2, cursor='abc')
+
+    def test_get_channels_paginated_and_cached(self):
+        """Test that get_channels() follows the cursor and caches results."""
+        self.mock_sc.conversations_list.side_effect = [
+            {'ok': True, 'channels': [{'name': 'a'}],
+             'response_metadata': {'next_cursor': 'abc'}},
+            {'ok': True, 'channels': [{'name': 'b'}]}
+        ]
+        assert self.bot.get_channel_names() == ['a', 'b']
+        assert self.bot.get_channel_names() == ['a', 'b']
+        assert self.mock_sc.conversations_list.call_count == 2
+        self.mock_sc.conversations_list.assert_called_with(
+            limit=Bot.PAGE_SIZE, exclude_archived=False,
+            types='public_channel', cursor='abc')
+
+    def test_send_event_notif(self):
+        """Test that event notifications are queued on the dispatcher."""
+        dispatcher = mock.MagicMock()
+        bot = Bot(self.mock_sc, "#notifs", dispatcher)
+        bot.send_event_notif("Hello")
+        dispatcher.post.assert_called_once_with("#notifs", "Hello")
+
     def test_get_channel_users_failure(self):
         """Test get_channel_users() when Slack API call fails."""
         self.mock_sc.conversations_members =\
@@ -99,7 +134,8 @@ class TestBot(TestCase):
             assert e.error == "Error"
         finally:
             self.mock_sc.conversations_members.assert_called_with(
-                channel="C1234441"
+                channel="C1234441",
+                limit=Bot.PAGE_SIZE
             )
 
     def test_create_same_channel_thrice(self):
@@ -0,0 +1,22 @@
+"""Test the shared HTTP session."""
+from unittest import mock
+from utils.http import make_session, TimeoutHTTPAdapter
+
+
+def test_make_session():
+    """Test that sessions pool connections and retry failures."""
+    session = make_session(8, 3.0, 2)
+    adapter = session.get_adapter('https://api.github.com/app')
+    assert isinstance(adapter, TimeoutHTTPAdapter)
+    assert adapter._pool_maxsize == 8
+    assert adapter.max_retries.total == 2
+
+
+@mock.patch('requests.adapters.HTTPAdapter.send')
+def test_timeout_adapter_default(mock_send):
+    """Test that requests without a timeout get the default one."""
+    adapter = TimeoutHTTPAdapter(3.0)
+    adapter.send('request')
+    mock_send.assert_called_once_with('request', timeout=3.0)
+    adapter.send('request', timeout=1.0)
+    mock_send.assert_called_with('request', timeout=1.0)
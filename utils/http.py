@@ -0,0 +1,56 @@
+"""Shared HTTP session for requests made outside of API client libraries."""
+import requests
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTP adapter that applies a default timeout to every request."""
+
+    def __init__(self, timeout: float, *args, **kwargs) -> None:
+        """
+        Initialize the adapter.
+
+        :param timeout: seconds to wait for a connection or a response, used
+                        unless a request sets its own timeout
+        """
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        """Send a request, using the default timeout if none was given."""
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        return super().send(request, **kwargs)
+
+
+def make_session(pool_size: int,
+                 timeout: float,
+                 retries: int) -> requests.Session:
+    """
+    Make a session that keeps connections alive and reuses them.
+
+    Failed connections are retried for every method, but read errors and
+    server errors are only retried for idempotent methods (i.e. not for
+    ``POST``), so that no request is ever made twice.
+
+    :param pool_size: maximum number of connections kept open per host
+    :param timeout: seconds to wait for a connection or a response
+    :param retries: maximum number of times a request is retried
+    :return: a new ``requests.Session`` object
+    """
+    retry = Retry(total=retries,
+                  connect=retries,
+                  read=retries,
+                  status=retries,
+                  backoff_factor=0.3,
+                  status_forcelist=(500, 502, 503, 504),
+                  raise_on_status=False)
+    adapter = TimeoutHTTPAdapter(timeout,
+                                 pool_maxsize=pool_size,
+                                 max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session